@@ -1,29 +1,288 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, abort, make_response, Response, send_file, send_from_directory, stream_with_context
+from markupsafe import Markup
 import mysql.connector
 from datetime import datetime
+from functools import wraps
+from decimal import Decimal
+import inspect
+import io
+import itertools
 import os
+import time
+import uuid
 from dotenv import load_dotenv
-import base64
+from config import Config
+from db_pool import get_pool, pool_stats, read_connection
+from assets import AssetStore
+import assets
+import audit_feed
+import bulk_import
+from cache import cached_page, make_cache
+import dashboard_stats
+import donation_analytics
+import donations
+import donors
+import efficiency_store
+import event_store
+import exports
+from instrumentation import Instrumentation
+from jobs import JobRunner
+import redistribution_planner
+from pagination import decode_cursor, page_size, split_page
+from search_index import SearchIndex, search_database
+from skill_matching import SkillIndex
+from submission_queue import SubmissionQueue, SubmissionWorkers
+import volunteers
 
 load_dotenv()
 
 app = Flask(__name__)
 app.secret_key = os.getenv('SECRET_KEY', 'fallback-secret-key')
+app.config['USE_X_SENDFILE'] = Config.ASSET_X_SENDFILE
+# asgi.py serves /admin/budget-audit/stream; the sync app has pages poll instead
+app.config['AUDIT_STREAM'] = False
+
+instrumentation = Instrumentation(slow_query_ms=Config.SLOW_QUERY_MS,
+                                  slow_query_log=Config.SLOW_QUERY_LOG,
+                                  n_plus_one_threshold=Config.N_PLUS_ONE_THRESHOLD)
+if Config.INSTRUMENTATION:
+    instrumentation.init_app(app)
+
+asset_store = AssetStore(Config.ASSET_DIR, widths=Config.ASSET_WIDTHS)
+page_cache = make_cache(Config)
+skill_index = SkillIndex(ttl=Config.SKILL_INDEX_TTL)
+search_index = SearchIndex(ttl=Config.SEARCH_INDEX_TTL, refresh=Config.SEARCH_INDEX_REFRESH)
+donation_rollups = donation_analytics.DonationRollups(ttl=Config.DONATION_ANALYTICS_TTL)
+
+def page_cache_metrics():
+    stats = page_cache.stats()
+    return [
+        '# TYPE ngo_page_cache_hits_total counter',
+        f"ngo_page_cache_hits_total {stats['hits']}",
+        '# TYPE ngo_page_cache_misses_total counter',
+        f"ngo_page_cache_misses_total {stats['misses']}",
+        '# TYPE ngo_page_cache_bytes gauge',
+        f"ngo_page_cache_bytes {stats['bytes']}",
+    ]
+
+instrumentation.collectors.append(page_cache_metrics)
+
+def search_index_metrics():
+    stats = search_index.stats()
+    return [
+        '# TYPE ngo_search_index_records gauge',
+        f"ngo_search_index_records {stats['records']}",
+        '# TYPE ngo_search_index_tokens gauge',
+        f"ngo_search_index_tokens {stats['tokens']}",
+    ]
+
+instrumentation.collectors.append(search_index_metrics)
+
+def has_flashes():
+    # Flashed messages are rendered into the page for this visitor only
+    return '_flashes' in session
+
+def register_volunteer(connection, name, email, phone, skills, request_key=None):
+    volunteer_id = volunteers.register_volunteer(connection, name, email, phone, skills, request_key)
+    skill_index.add_volunteer(volunteer_id, name, skills)
+    search_index.add('volunteer', volunteer_id, name, [email], [phone])
+    return volunteer_id
+
+def record_donation(connection, name, email, phone, address, ngo_id, amount, payment_method, request_key=None):
+    recorded = donations.record_donation(connection, name, email, phone, address, ngo_id, amount,
+                                         payment_method, request_key)
+    if recorded:
+        # A returning donor keeps the name on file; only their contacts may be new
+        search_index.add('donor', recorded['Donor_id'], name if recorded['New_donor'] else None,
+                         [email], [phone])
+    return recorded
+
+# Opt-in: queue donations/volunteer sign-ups locally and write them to MySQL in the background
+submission_queue = SubmissionQueue(Config.SUBMISSION_QUEUE_PATH) if Config.ASYNC_SUBMISSIONS else None
+submission_workers = None
+if submission_queue:
+    submission_workers = SubmissionWorkers(
+        submission_queue,
+        lambda: get_db_connection(),
+        {
+            'donation': lambda connection, payload, key: record_donation(
+                connection, request_key=key, **payload),
+            'volunteer': lambda connection, payload, key: register_volunteer(
+                connection, request_key=key, **payload),
+        },
+        threads=Config.SUBMISSION_WORKERS,
+        batch_size=Config.SUBMISSION_BATCH_SIZE,
+        max_attempts=Config.SUBMISSION_MAX_ATTEMPTS,
+    )
+
+def submission_key(value):
+    # Keys come from a hidden form field; anything unexpected gets a fresh one
+    if value and len(value) <= 64 and value.replace('-', '').isalnum():
+        return value
+    return uuid.uuid4().hex
+
+app.jinja_env.globals['new_idempotency_key'] = lambda: uuid.uuid4().hex
+
+# Long admin operations run as background jobs; see jobs.py
+job_runner = JobRunner(lambda: get_db_connection(), workers=Config.JOB_WORKERS, scheduler=Config.JOB_SCHEDULER)
+
+@job_runner.task('redistribution')
+def redistribution_job(job, params):
+    connection = job.get_connection()
+    if not connection:
+        raise RuntimeError('Database connection error')
+    try:
+        job.progress(10, 'Planning transfers')
+        if params.get('engine') == 'procedure':
+            cursor = connection.cursor()
+            cursor.callproc('RedistributeExcessDonations')
+            connection.commit()
+            cursor.close()
+            result = {'engine': 'procedure'}
+        else:
+            run_id, applied = redistribution_planner.apply_plan(
+                connection, Decimal(params['min_transfer']), params.get('fingerprint'))
+            result = {'run_id': run_id, 'transfers': len(applied.transfers), 'total': str(applied.total)}
+    finally:
+        connection.close()
+    page_cache.invalidate('ngo', 'donation')
+    return result
+
+@job_runner.task('export')
+def export_job(job, params):
+    dataset, fmt = params['dataset'], params['fmt']
+    filters = exports.parse_filters(params.get('filters', {}))
+    connection = job.get_connection()
+    if not connection:
+        raise RuntimeError('Database connection error')
+    
+    sql, query_params = exports.build_query(dataset, filters)
+    rows = exports.open_stream(connection, sql, query_params)
+    written = 0
+    
+    def counted():
+        nonlocal written
+        for written, row in enumerate(rows, 1):
+            if written % 5000 == 0:
+                job.progress(None, f'{written} rows written')
+            yield row
+    
+    columns = exports.EXPORTS[dataset]['columns']
+    chunks = exports.to_csv(columns, counted()) if fmt == 'csv' else exports.to_ndjson(columns, counted())
+    filename = f"job-{job.id}-{dataset}.{fmt}"
+    path = os.path.join(Config.JOB_OUTPUT_DIR, filename)
+    os.makedirs(Config.JOB_OUTPUT_DIR, exist_ok=True)
+    try:
+        with open(path + '.part', 'w', encoding='utf-8', newline='') as output:
+            for chunk in chunks:
+                output.write(chunk)
+        os.replace(path + '.part', path)
+    except BaseException:
+        rows.close()
+        # rows.close() does nothing if reading never started
+        connection.discard()
+        if os.path.exists(path + '.part'):
+            os.remove(path + '.part')
+        raise
+    return {'file': filename, 'rows': written, 'dataset': dataset, 'fmt': fmt}
+
+@job_runner.task('dashboard_refresh')
+def dashboard_refresh_job(job, params):
+    connection = job.get_connection()
+    if not connection:
+        raise RuntimeError('Database connection error')
+    try:
+        refreshed = dashboard_stats.refresh_once(connection)
+    finally:
+        connection.close()
+    return {'refreshed': refreshed}
+
+@job_runner.task('efficiency_recompute')
+def efficiency_recompute_job(job, params):
+    connection = job.get_connection()
+    if not connection:
+        raise RuntimeError('Database connection error')
+    try:
+        recomputed = efficiency_store.recompute_stale(connection)
+    finally:
+        connection.close()
+    if recomputed:
+        page_cache.invalidate('ngo')
+    return {'recomputed': recomputed}
+
+@job_runner.task('donation_rollup')
+def donation_rollup_job(job, params):
+    connection = job.get_connection()
+    if not connection:
+        raise RuntimeError('Database connection error')
+    try:
+        added = donation_analytics.update(connection, rebuild=params.get('rebuild', False))
+    finally:
+        connection.close()
+    return {'donations': added}
+
+@job_runner.task('audit_archive')
+def audit_archive_job(job, params):
+    if not Config.AUDIT_RETENTION_DAYS:
+        return {'archived': 0}
+    connection = job.get_connection()
+    if not connection:
+        raise RuntimeError('Database connection error')
+    try:
+        archived = audit_feed.archive(connection, Config.AUDIT_RETENTION_DAYS)
+    finally:
+        connection.close()
+    return {'archived': archived}
+
+job_runner.every('dashboard-stats', Config.STATS_REFRESH_INTERVAL, 'dashboard_refresh')
+job_runner.every('efficiency-recompute', Config.EFFICIENCY_RECOMPUTE_INTERVAL, 'efficiency_recompute')
+job_runner.every('donation-rollup', Config.DONATION_ROLLUP_INTERVAL, 'donation_rollup')
+job_runner.every('audit-archive', Config.AUDIT_ARCHIVE_INTERVAL, 'audit_archive')
+
+@app.before_request
+def start_job_runner():
+    job_runner.ensure_started()
+
+counter_refresh_requested_at = None
+
+def request_counter_refresh():
+    # Called when the dashboard saw stale counters: the recount runs as a
+    # job, queued at most once per DASHBOARD_STATS_MAX_STALENESS per worker
+    global counter_refresh_requested_at
+    now = time.monotonic()
+    if (counter_refresh_requested_at is not None
+            and now - counter_refresh_requested_at < Config.DASHBOARD_STATS_MAX_STALENESS):
+        return
+    counter_refresh_requested_at = now
+    try:
+        job_runner.submit('dashboard_refresh')
+    except Exception as e:
+        print(f"Error queueing dashboard counter refresh: {e}")
 
 def get_db_connection():
     try:
-        connection = mysql.connector.connect(
-            host=os.getenv('MYSQL_HOST', 'localhost'),
-            user=os.getenv('MYSQL_USER', 'root'),
-            password=os.getenv('MYSQL_PASSWORD', ''),
-            database=os.getenv('MYSQL_DB', 'ngo'),
-            port=int(os.getenv('MYSQL_PORT', 3306))
-        )
-        return connection
+        return get_pool().connection()
     except mysql.connector.Error as e:
         print(f"Database connection error: {e}")
         return None
 
+def wrote_recently():
+    return time.time() - session.get('wrote_at', 0) < Config.READ_YOUR_WRITES_SECONDS
+
+def get_read_connection():
+    # Read-only pages use a replica, except for a session that just wrote and
+    # expects to see its own changes
+    if wrote_recently():
+        return get_db_connection()
+    try:
+        return read_connection()
+    except mysql.connector.Error as e:
+        print(f"Database connection error: {e}")
+        return None
+
+def mark_write():
+    session['wrote_at'] = time.time()
+
 # Test database connection
 def test_db_connection():
     connection = get_db_connection()
@@ -35,33 +294,56 @@ def test_db_connection():
         print("❌ Database connection failed!")
         return False
 
+@app.route('/health/db')
+def db_health():
+    return jsonify(pool_stats())
+
 # Public Routes
+@app.route('/metrics')
+def metrics():
+    # Scrapers send METRICS_TOKEN; without it only a logged-in admin may look
+    if not (instrumentation.authorized(Config.METRICS_TOKEN) or session.get('is_admin')):
+        abort(401)
+    return Response(instrumentation.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/')
+@cached_page(page_cache, Config.HERO_IMAGE_CACHE_TTL, tags=('hero',), bypass=has_flashes)
 def home():
-    connection = get_db_connection()
-    hero_image = None
-    
-    if connection:
-        cursor = connection.cursor(dictionary=True)
-        try:
-            cursor.execute("SELECT hero_image FROM website_settings WHERE id = 1")
-            result = cursor.fetchone()
-            if result and result['hero_image']:
-                hero_image = result['hero_image']
-                print(f"✅ Hero image found! Size: {len(hero_image)} bytes")
-                
-                # Convert to base64 for the template
-                hero_image = base64.b64encode(hero_image).decode('utf-8')
-                print(f"✅ Base64 conversion successful! Length: {len(hero_image)}")
-            else:
-                print("❌ No hero image found in database")
-        except Exception as e:
-            print(f"❌ Error fetching hero image: {e}")
-        finally:
-            cursor.close()
-            connection.close()
-    
-    return render_template('public/home.html', hero_image=hero_image)
+    return render_template('public/home.html', hero=hero_digest(), asset_widths=asset_store.widths)
+
+def hero_digest():
+    connection = get_read_connection()
+    if not connection:
+        return None
+    try:
+        return assets.current(connection, 'hero')
+    except Exception as e:
+        print(f"Error loading hero image: {str(e)}")
+        return None
+    finally:
+        connection.close()
+
+@app.route('/media/hero')
+def hero_image():
+    # Old unversioned URL; points at whatever the hero image is now
+    digest = hero_digest()
+    if not digest:
+        abort(404)
+    response = redirect(url_for('media_asset', digest=digest, w=request.args.get('w'), fmt=request.args.get('fmt')))
+    response.headers['Cache-Control'] = 'public, no-cache'
+    return response
+
+@app.route('/media/<digest>')
+def media_asset(digest):
+    located = asset_store.locate(digest, request.args.get('w', type=int), request.args.get('fmt'))
+    if not located:
+        abort(404)
+    path, mimetype = located
+    # The URL names the content, so a response can be cached forever
+    response = send_file(path, mimetype=mimetype, conditional=True, etag=os.path.basename(path),
+                         max_age=Config.ASSET_MAX_AGE)
+    response.headers['Cache-Control'] = f'public, max-age={Config.ASSET_MAX_AGE}, immutable'
+    return response
 
 @app.route('/donate', methods=['GET', 'POST'])
 def donate():
@@ -74,37 +356,25 @@ def donate():
         amount = request.form['amount']
         payment_method = request.form['payment_method']
         
+        if submission_queue:
+            key = submission_key(request.form.get('idempotency_key'))
+            submission_queue.enqueue('donation', key, dict(
+                name=name, email=email, phone=phone, address=address,
+                ngo_id=ngo_id, amount=amount, payment_method=payment_method))
+            submission_workers.ensure_started()
+            submission_workers.notify()
+            mark_write()
+            return redirect(url_for('donation_success', ref=key))
+        
         connection = get_db_connection()
         if not connection:
             flash('Database connection error. Please try again.', 'error')
             return redirect(url_for('donate'))
         
-        cursor = connection.cursor()
-        
         try:
-            # Check if donor exists
-            cursor.execute("SELECT Donor_id FROM donor WHERE Name = %s", (name,))
-            donor = cursor.fetchone()
-            
-            if donor:
-                donor_id = donor[0]
-                cursor.execute("UPDATE donor SET Address = %s WHERE Donor_id = %s", (address, donor_id))
-            else:
-                cursor.execute("INSERT INTO donor (Name, Address) VALUES (%s, %s)", (name, address))
-                donor_id = cursor.lastrowid
-            
-            if phone:
-                cursor.execute("INSERT IGNORE INTO donor_phone (Donor_id, Phone) VALUES (%s, %s)", (donor_id, phone))
-            
-            if email:
-                cursor.execute("INSERT IGNORE INTO donor_email (Donor_id, Email) VALUES (%s, %s)", (donor_id, email))
-            
-            cursor.execute("""
-                INSERT INTO donation (Donor_id, Ngo_id, Amount, Donation_date, Payment_method) 
-                VALUES (%s, %s, %s, CURDATE(), %s)
-            """, (donor_id, ngo_id, amount, payment_method))
-            
-            connection.commit()
+            record_donation(connection, name, email, phone, address,
+                            ngo_id, amount, payment_method)
+            mark_write()
             flash('Thank you for your donation! Your support makes a difference.', 'success')
             return redirect(url_for('donation_success'))
             
@@ -112,7 +382,6 @@ def donate():
             connection.rollback()
             flash(f'Error processing donation: {str(e)}', 'error')
         finally:
-            cursor.close()
             connection.close()
     
     connection = get_db_connection()
@@ -130,58 +399,188 @@ def donate():
 
 @app.route('/donation/success')
 def donation_success():
-    return render_template('public/donation_success.html')
+    submission = None
+    ref = request.args.get('ref')
+    if submission_queue and ref:
+        submission = submission_queue.status(ref)
+    return render_template('public/donation_success.html', submission=submission)
+
+@app.route('/donation/status/<ref>')
+def donation_status(ref):
+    submission = submission_queue.status(ref) if submission_queue else None
+    if not submission or submission['kind'] != 'donation':
+        abort(404)
+    return jsonify(status=submission['status'], error=submission['error'])
+
+# Queries shared with the async handlers in asgi.py
+UPCOMING_EVENTS_SQL = """
+    SELECT e.*, ngo.Ngo_name 
+    FROM event e 
+    JOIN ngo ON e.Ngo_id = ngo.Ngo_id 
+    WHERE e.Event_date >= CURDATE() 
+    ORDER BY e.Event_date ASC
+"""
+
+RECENT_DONATIONS_SQL = """
+    SELECT d.*, donor.Name as donor_name, ngo.Ngo_name 
+    FROM donation d 
+    JOIN donor ON d.Donor_id = donor.Donor_id 
+    JOIN ngo ON d.Ngo_id = ngo.Ngo_id 
+    ORDER BY d.Donation_id DESC LIMIT 5
+"""
+
+def budget_audit_query(after, limit, archived=False):
+    keyset = ""
+    params = []
+    if after:
+        keyset = "WHERE Change_Timestamp < %s OR (Change_Timestamp = %s AND Audit_id < %s)"
+        params = [after[0], after[0], after[1]]
+    return f"""
+        SELECT * FROM {'budget_audit_archive' if archived else 'budget_audit'} 
+        {keyset}
+        ORDER BY Change_Timestamp DESC, Audit_id DESC
+        LIMIT %s
+    """, (*params, limit + 1)
+
+def donation_impact_query(after, limit):
+    keyset = "WHERE d.Donation_id < %s" if after else ""
+    return f"""
+        SELECT
+            d.Donation_id,
+            don.Name AS Donor_Name,
+            d.Amount AS Donation_Amount,
+            d.Donation_date,
+            n.Ngo_id,
+            n.Ngo_name AS NGO_Name
+        FROM donation d
+        JOIN donor don ON d.Donor_id = don.Donor_id
+        JOIN ngo n ON d.Ngo_id = n.Ngo_id
+        {keyset}
+        ORDER BY d.Donation_id DESC
+        LIMIT %s
+    """, (*(after or ()), limit + 1)
+
+def beneficiary_counts_query(ngo_ids):
+    # One grouped count for the NGOs on a page instead of a subquery per row
+    placeholders = ', '.join(['%s'] * len(ngo_ids))
+    return f"""
+        SELECT Ngo_id, COUNT(*) AS total
+        FROM beneficiary
+        WHERE Ngo_id IN ({placeholders})
+        GROUP BY Ngo_id
+    """, ngo_ids
+
+# Shared by the views here and their coroutine versions in asgi.py, which
+# only differ in how the rows are fetched
+
+def admin_only(view):
+    # Sends visitors who aren't logged-in admins to the login page
+    def denied():
+        return 'user_id' not in session or not session.get('is_admin')
+    
+    if inspect.iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(*args, **kwargs):
+            if denied():
+                return redirect(url_for('admin_login'))
+            return await view(*args, **kwargs)
+        return async_wrapper
+    
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if denied():
+            return redirect(url_for('admin_login'))
+        return view(*args, **kwargs)
+    return wrapper
+
+def listing_args(cursor_size):
+    # (limit, keyset values or None) from ?per_page= and ?after=
+    limit = page_size(request.args.get('per_page', type=int), Config.ADMIN_PAGE_SIZE, Config.ADMIN_MAX_PAGE_SIZE)
+    return limit, decode_cursor(request.args.get('after'), cursor_size)
+
+def render_dashboard(counters=None, recent_donations=(), upcoming_events=()):
+    counters = counters or dict.fromkeys(dashboard_stats.COUNTERS, 0)
+    return render_template('admin/dashboard.html',
+                           total_donors=counters['donor'],
+                           total_donations=counters['donation'],
+                           total_events=counters['event'],
+                           total_beneficiaries=counters['beneficiary'],
+                           total_volunteers=counters['volunteer'],
+                           recent_donations=recent_donations,
+                           upcoming_events=upcoming_events)
+
+def render_budget_audit(rows, limit, after, archived):
+    # rows is None when loading failed (already flashed)
+    audits, next_cursor = split_page(rows or [], limit, lambda a: (a['Change_Timestamp'], a['Audit_id']))
+    return render_template('admin/budget_audit.html', audits=audits, next_cursor=next_cursor,
+                           archived=archived, follow=rows is not None and not archived and not after,
+                           poll_interval=Config.AUDIT_FEED_POLL_INTERVAL)
+
+def impact_page(rows, limit):
+    # (impacts, next cursor, NGO ids whose beneficiaries still need counting)
+    impacts, next_cursor = split_page(rows, limit, lambda i: (i['Donation_id'],))
+    return impacts, next_cursor, sorted({impact['Ngo_id'] for impact in impacts})
+
+def add_beneficiaries(impacts, count_rows):
+    beneficiaries = {row['Ngo_id']: row['total'] for row in count_rows}
+    for impact in impacts:
+        impact['Beneficiaries_Supported'] = beneficiaries.get(impact['Ngo_id'], 0)
 
 @app.route('/events')
+@cached_page(page_cache, Config.PAGE_CACHE_TTL, tags=('event', 'ngo'), bypass=has_flashes)
 def public_events():
-    connection = get_db_connection()
+    connection = get_read_connection()
     if not connection:
         return render_template('public/events.html', events=[])
     
     cursor = connection.cursor(dictionary=True)
-    cursor.execute("""
-        SELECT e.*, ngo.Ngo_name 
-        FROM event e 
-        JOIN ngo ON e.Ngo_id = ngo.Ngo_id 
-        WHERE e.Event_date >= CURDATE() 
-        ORDER BY e.Event_date ASC
-    """)
+    cursor.execute(UPCOMING_EVENTS_SQL)
     events = cursor.fetchall()
     cursor.close()
     connection.close()
     
     return render_template('public/events.html', events=events)
 
-@app.route('/ngos')
-def public_ngos():
+def render_ngo_cards():
+    # Stale efficiency scores are recomputed on the primary; the list itself
+    # is read from a replica
     connection = get_db_connection()
     if not connection:
-        return render_template('public/ngos.html', ngos=[])
+        return None
+    try:
+        efficiency_store.recompute_stale(connection)
+    except Exception as e:
+        print(f"Error recomputing NGO efficiency: {str(e)}")
+    finally:
+        connection.close()
     
-    cursor = connection.cursor(dictionary=True)
+    connection = get_read_connection()
+    if not connection:
+        return None
     
     try:
-        cursor.execute("""
-            SELECT n.*, 
-                   CalculateNgoEfficiency(n.Ngo_id) as Efficiency_Score
-            FROM ngo n
-        """)
-        ngos = cursor.fetchall()
-        
+        ngos = efficiency_store.load_ngos(connection, recompute=False)
     except Exception as e:
         print(f"Error loading NGOs: {str(e)}")
-        ngos = []
+        return None
     finally:
-        cursor.close()
         connection.close()
     
-    return render_template('public/ngos.html', ngos=ngos)
+    return Markup(render_template('public/_ngo_cards.html', ngos=ngos, asset_widths=asset_store.widths))
+
+@app.route('/ngos')
+def public_ngos():
+    ngo_cards = page_cache.get_or_set('fragment:ngo_cards', render_ngo_cards,
+                                      Config.NGO_LIST_CACHE_TTL, tags=('ngo', 'event', 'donation'))
+    return render_template('public/ngos.html', ngo_cards=ngo_cards or '')
 
 @app.route('/about')
+@cached_page(page_cache, Config.PAGE_CACHE_TTL, bypass=has_flashes)
 def about():
     return render_template('public/about.html')
 
 @app.route('/contact', methods=['GET', 'POST'])
+@cached_page(page_cache, Config.PAGE_CACHE_TTL, bypass=has_flashes)
 def contact():
     if request.method == 'POST':
         flash('Thank you for your message! We will get back to you soon.', 'success')
@@ -202,54 +601,32 @@ def volunteer_register():
         phone = request.form['phone']
         skills = request.form.getlist('skills')  # Multiple skills
         
+        if submission_queue:
+            key = submission_key(request.form.get('idempotency_key'))
+            submission_queue.enqueue('volunteer', key, dict(name=name, email=email, phone=phone, skills=skills))
+            submission_workers.ensure_started()
+            submission_workers.notify()
+            mark_write()
+            flash('Thank you for registering as a volunteer! We will contact you soon.', 'success')
+            return redirect(url_for('public_volunteers'))
+        
         connection = get_db_connection()
         if not connection:
             flash('Database connection error. Please try again.', 'error')
             return redirect(url_for('volunteer_register'))
         
-        cursor = connection.cursor()
-        
         try:
-            # Check if volunteer already exists with this email
-            cursor.execute("""
-                SELECT v.Volunteer_id 
-                FROM volunteer v
-                JOIN volunteer_email ve ON v.Volunteer_id = ve.Volunteer_id
-                WHERE ve.Email = %s
-            """, (email,))
-            
-            existing_volunteer = cursor.fetchone()
-            
-            if existing_volunteer:
-                flash('A volunteer with this email already exists!', 'error')
-                return redirect(url_for('public_volunteers'))
-            
-            # Insert new volunteer - ONLY Name column
-            cursor.execute("INSERT INTO volunteer (Name) VALUES (%s)", (name,))
-            volunteer_id = cursor.lastrowid
-            
-            # Insert email
-            cursor.execute("INSERT INTO volunteer_email (Volunteer_id, Email) VALUES (%s, %s)", 
-                         (volunteer_id, email))
-            
-            # Insert phone
-            cursor.execute("INSERT INTO volunteer_phone (Volunteer_id, Phone) VALUES (%s, %s)", 
-                         (volunteer_id, phone))
-            
-            # Insert skills
-            for skill in skills:
-                cursor.execute("INSERT INTO volunteer_skill (Volunteer_id, Skill) VALUES (%s, %s)", 
-                             (volunteer_id, skill))
-            
-            connection.commit()
+            register_volunteer(connection, name, email, phone, skills)
+            mark_write()
             flash('Thank you for registering as a volunteer! We will contact you soon.', 'success')
             return redirect(url_for('public_volunteers'))
             
+        except volunteers.DuplicateVolunteerError as e:
+            flash(str(e), 'error')
+            return redirect(url_for('public_volunteers'))
         except Exception as e:
-            connection.rollback()
             flash(f'Error processing registration: {str(e)}', 'error')
         finally:
-            cursor.close()
             connection.close()
     
     # For GET request, show the form
@@ -274,107 +651,100 @@ def admin_login():
     return render_template('admin/login.html')
 
 @app.route('/admin')
+@admin_only
 def admin_dashboard():
-    if 'user_id' not in session or not session.get('is_admin'):
-        return redirect(url_for('admin_login'))
-    
     connection = get_db_connection()
     if not connection:
         flash('Database connection error', 'error')
-        return render_template('admin/dashboard.html', 
-                             total_donors=0, total_donations=0, 
-                             total_events=0, total_beneficiaries=0,
-                             recent_donations=[], upcoming_events=[])
+        return render_dashboard()
     
     cursor = connection.cursor(dictionary=True)
     
     try:
-        cursor.execute("SELECT COUNT(*) as total FROM donor")
-        total_donors = cursor.fetchone()['total']
-        
-        cursor.execute("SELECT COUNT(*) as total FROM donation")
-        total_donations = cursor.fetchone()['total']
-        
-        cursor.execute("SELECT COUNT(*) as total FROM event")
-        total_events = cursor.fetchone()['total']
-        
-        cursor.execute("SELECT COUNT(*) as total FROM beneficiary")
-        total_beneficiaries = cursor.fetchone()['total']
+        counters, stale = dashboard_stats.read_counters(connection, Config.DASHBOARD_STATS_MAX_STALENESS)
+        if stale:
+            request_counter_refresh()
         
-        cursor.execute("""
-    SELECT d.*, donor.Name as donor_name, ngo.Ngo_name 
-    FROM donation d 
-    JOIN donor ON d.Donor_id = donor.Donor_id 
-    JOIN ngo ON d.Ngo_id = ngo.Ngo_id 
-    ORDER BY d.Donation_id DESC LIMIT 5
-""")
+        cursor.execute(RECENT_DONATIONS_SQL)
         recent_donations = cursor.fetchall()
         
-        cursor.execute("""
-            SELECT e.*, ngo.Ngo_name 
-            FROM event e 
-            JOIN ngo ON e.Ngo_id = ngo.Ngo_id 
-            WHERE e.Event_date >= CURDATE() 
-            ORDER BY e.Event_date ASC LIMIT 5
-        """)
+        cursor.execute(UPCOMING_EVENTS_SQL + " LIMIT 5")
         upcoming_events = cursor.fetchall()
         
     except Exception as e:
         flash(f'Database error: {str(e)}', 'error')
-        total_donors = total_donations = total_events = total_beneficiaries = 0
-        recent_donations = upcoming_events = []
-    
-    cursor.close()
-    connection.close()
+        return render_dashboard()
+    finally:
+        cursor.close()
+        connection.close()
     
-    return render_template('admin/dashboard.html', 
-                         total_donors=total_donors,
-                         total_donations=total_donations,
-                         total_events=total_events,
-                         total_beneficiaries=total_beneficiaries,
-                         recent_donations=recent_donations,
-                         upcoming_events=upcoming_events)
+    return render_dashboard(counters, recent_donations, upcoming_events)
 
 @app.route('/admin/volunteers')
 def admin_volunteers():
     if 'user_id' not in session or not session.get('is_admin'):
         return redirect(url_for('admin_login'))
     
+    limit = page_size(request.args.get('per_page', type=int), Config.ADMIN_PAGE_SIZE, Config.ADMIN_MAX_PAGE_SIZE)
+    after = decode_cursor(request.args.get('after'), 2)
+    
     connection = get_db_connection()
     if not connection:
         flash('Database connection error', 'error')
-        return render_template('admin/volunteers.html', volunteers=[])
+        return render_template('admin/volunteers.html', volunteers=[], next_cursor=None)
     
     cursor = connection.cursor(dictionary=True)
     
     try:
-        cursor.execute("""
-            SELECT 
-                v.Volunteer_id,
-                v.Name,
-                GROUP_CONCAT(DISTINCT vs.Skill) as skills,
-                GROUP_CONCAT(DISTINCT ve.Email) as emails,
-                GROUP_CONCAT(DISTINCT vp.Phone) as phones,
-                COUNT(DISTINCT ev.Event_id) as events_count,
-                SUM(ev.Hours_contributed) as total_hours
-            FROM volunteer v
-            LEFT JOIN volunteer_skill vs ON v.Volunteer_id = vs.Volunteer_id
-            LEFT JOIN volunteer_email ve ON v.Volunteer_id = ve.Volunteer_id
-            LEFT JOIN volunteer_phone vp ON v.Volunteer_id = vp.Volunteer_id
-            LEFT JOIN event_volunteer ev ON v.Volunteer_id = ev.Volunteer_id
-            GROUP BY v.Volunteer_id, v.Name
-            ORDER BY total_hours DESC
-        """)
-        volunteers = cursor.fetchall()
+        rows = volunteers.load_profiles(cursor, limit, after)
+        volunteer_rows, next_cursor = split_page(rows, limit,
+                                                 lambda v: (v['total_hours'], v['Volunteer_id']))
+        volunteers.attach_contacts(cursor, volunteer_rows)
         
     except Exception as e:
         flash(f'Error loading volunteers: {str(e)}', 'error')
-        volunteers = []
+        volunteer_rows, next_cursor = [], None
     finally:
         cursor.close()
         connection.close()
     
-    return render_template('admin/volunteers.html', volunteers=volunteers)
+    return render_template('admin/volunteers.html', volunteers=volunteer_rows, next_cursor=next_cursor)
+
+@app.route('/admin/staffing')
+def admin_staffing():
+    if 'user_id' not in session or not session.get('is_admin'):
+        return redirect(url_for('admin_login'))
+    
+    event_id = request.args.get('event_id', type=int)
+    wanted = request.args.getlist('skills')
+    limit = page_size(request.args.get('limit', type=int), 20, Config.ADMIN_MAX_PAGE_SIZE)
+    
+    if not skill_index.ensure_loaded(get_db_connection):
+        flash('Database connection error', 'error')
+        return render_template('admin/staffing.html', events=[], skills=[], wanted=wanted,
+                               event_id=event_id, candidates=None)
+    
+    candidates = skill_index.match(wanted, event_id, limit) if wanted else None
+    
+    events = []
+    connection = get_db_connection()
+    if connection:
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute("""
+                SELECT e.Event_id, e.Event_name, e.Event_date, ngo.Ngo_name
+                FROM event e
+                JOIN ngo ON e.Ngo_id = ngo.Ngo_id
+                WHERE e.Event_date >= CURDATE()
+                ORDER BY e.Event_date ASC
+            """)
+            events = cursor.fetchall()
+        finally:
+            cursor.close()
+            connection.close()
+    
+    return render_template('admin/staffing.html', events=events, skills=skill_index.skills(),
+                           wanted=wanted, event_id=event_id, candidates=candidates)
 
 @app.route('/admin/logout')
 def admin_logout():
@@ -382,26 +752,39 @@ def admin_logout():
     flash('You have been logged out.', 'info')
     return redirect(url_for('admin_login'))
 
-@app.route('/admin/redistribute-funds')
+@app.route('/admin/redistribute-funds', methods=['GET', 'POST'])
 def redistribute_funds():
     if 'user_id' not in session or not session.get('is_admin'):
         return redirect(url_for('admin_login'))
     
+    min_transfer = Config.REDISTRIBUTION_MIN_TRANSFER
+    if request.method == 'POST':
+        try:
+            job_id = job_runner.submit('redistribution', {
+                'engine': Config.REDISTRIBUTION_ENGINE,
+                'min_transfer': str(min_transfer),
+                'fingerprint': request.form.get('fingerprint'),
+            }, created_by=session.get('username'))
+        except Exception as e:
+            flash(f'Error redistributing funds: {str(e)}', 'error')
+            return redirect(url_for('redistribute_funds'))
+        return redirect(url_for('admin_job', job_id=job_id))
+    
     connection = get_db_connection()
     if not connection:
         flash('Database connection error', 'error')
         return redirect(url_for('admin_dashboard'))
     
+    plan = None
     try:
-        # First cursor for calling procedure
-        cursor1 = connection.cursor()
-        cursor1.callproc('RedistributeExcessDonations')
-        connection.commit()
-        cursor1.close()
+        plan = redistribution_planner.plan(connection, min_transfer)
         
-        # Second cursor for fetching results (with dictionary=True)
-        cursor2 = connection.cursor(dictionary=True)
-        cursor2.execute("""
+    except Exception as e:
+        flash(f'Error planning redistribution: {str(e)}', 'error')
+    
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute("""
             SELECT
                 s.Ngo_name as from_ngo,
                 t.Ngo_name as to_ngo,
@@ -411,84 +794,666 @@ def redistribute_funds():
             JOIN ngo s ON fr.Source_Ngo_id = s.Ngo_id
             JOIN ngo t ON fr.Target_Ngo_id = t.Ngo_id
             ORDER BY fr.Redistribution_date DESC
-        """)
-        redistributions = cursor2.fetchall()
-        cursor2.close()
-        
-        flash('Funds redistributed successfully!', 'success')
-        
+            LIMIT %s
+        """, (Config.ADMIN_PAGE_SIZE,))
+        redistributions = cursor.fetchall()
+        runs = redistribution_planner.recent_runs(cursor)
     except Exception as e:
-        connection.rollback()
-        flash(f'Error redistributing funds: {str(e)}', 'error')
-        redistributions = []
+        flash(f'Error loading redistributions: {str(e)}', 'error')
+        redistributions, runs = [], []
     finally:
+        cursor.close()
         connection.close()
     
-    return render_template('admin/redistribution_results.html', redistributions=redistributions)
+    return render_template('admin/redistribution_results.html', plan=plan,
+                           redistributions=redistributions, runs=runs)
 
 @app.route('/admin/budget-audit')
+@admin_only
 def budget_audit():
-    if 'user_id' not in session or not session.get('is_admin'):
-        return redirect(url_for('admin_login'))
+    limit, after = listing_args(2)
+    archived = request.args.get('archived') == '1'
     
-    connection = get_db_connection()
+    connection = get_read_connection()
     if not connection:
         flash('Database connection error', 'error')
-        return render_template('admin/budget_audit.html', audits=[])
+        return render_budget_audit(None, limit, after, archived)
     
     cursor = connection.cursor(dictionary=True)
     
     try:
-        cursor.execute("""
-            SELECT * FROM budget_audit 
-            ORDER BY Change_Timestamp DESC
-        """)
-        audits = cursor.fetchall()
+        cursor.execute(*budget_audit_query(after, limit, archived))
+        rows = cursor.fetchall()
         
     except Exception as e:
         flash(f'Error loading budget audit: {str(e)}', 'error')
-        audits = []
+        rows = None
     finally:
         cursor.close()
         connection.close()
     
-    return render_template('admin/budget_audit.html', audits=audits)
+    return render_budget_audit(rows, limit, after, archived)
+
+@app.route('/admin/budget-audit/since')
+def budget_audit_since():
+    if 'user_id' not in session or not session.get('is_admin'):
+        abort(403)
+    
+    after_id = request.args.get('after_id', 0, type=int)
+    limit = page_size(request.args.get('per_page', type=int), Config.ADMIN_PAGE_SIZE, Config.ADMIN_MAX_PAGE_SIZE)
+    
+    connection = get_read_connection()
+    if not connection:
+        abort(503, description='Database connection error')
+    try:
+        entries = audit_feed.fetch_since(connection, after_id, limit + 1)
+    finally:
+        connection.close()
+    
+    more = len(entries) > limit
+    entries = entries[:limit]
+    return jsonify(entries=entries, last_id=entries[-1]['Audit_id'] if entries else after_id, more=more)
+
+@app.route('/admin/budget-audit/stream')
+def budget_audit_stream():
+    # The event stream is a coroutine in asgi.py; a sync worker would hold a
+    # thread per open tab, so here the page polls budget_audit_since instead
+    abort(404)
 
 @app.route('/admin/donation-impact')
+@admin_only
 def donation_impact():
+    limit, after = listing_args(1)
+    
+    connection = get_read_connection()
+    if not connection:
+        flash('Database connection error', 'error')
+        return render_template('admin/donation_impact.html', impacts=[], next_cursor=None)
+    
+    cursor = connection.cursor(dictionary=True)
+    
+    try:
+        cursor.execute(*donation_impact_query(after, limit))
+        impacts, next_cursor, ngo_ids = impact_page(cursor.fetchall(), limit)
+        if ngo_ids:
+            cursor.execute(*beneficiary_counts_query(ngo_ids))
+            add_beneficiaries(impacts, cursor.fetchall())
+        
+    except Exception as e:
+        flash(f'Error loading impact data: {str(e)}', 'error')
+        impacts, next_cursor = [], None
+    finally:
+        cursor.close()
+        connection.close()
+    
+    return render_template('admin/donation_impact.html', impacts=impacts, next_cursor=next_cursor)
+
+# Multi-row add forms: rows shown by default and the most one submit may add
+ADD_FORM_ROWS = 5
+MAX_ADD_FORM_ROWS = 50
+
+def form_rows(fields):
+    # The add forms repeat every field once per row
+    columns = [request.form.getlist(field)[:MAX_ADD_FORM_ROWS] for field in fields]
+    return [dict(zip(fields, (value.strip() for value in values)))
+            for values in itertools.zip_longest(*columns, fillvalue='')]
+
+def filled_rows(rows, required):
+    # (row number, row) for the rows where any of `required` was filled in
+    return [(number, row) for number, row in enumerate(rows, 1) if any(row[field] for field in required)]
+
+def blank_form_rows():
+    return [{}] * page_size(request.args.get('rows', type=int), ADD_FORM_ROWS, MAX_ADD_FORM_ROWS)
+
+def ngo_options(cursor):
+    cursor.execute("SELECT Ngo_id, Ngo_name FROM ngo ORDER BY Ngo_name")
+    return cursor.fetchall()
+
+def listing_filters():
+    # ?start=&end=&ngo_id= as on the exports
+    try:
+        return exports.parse_filters(request.args)
+    except ValueError as e:
+        flash(str(e), 'error')
+        return {}
+
+@app.route('/admin/donations', endpoint='donations')
+def admin_donations():
+    if 'user_id' not in session or not session.get('is_admin'):
+        return redirect(url_for('admin_login'))
+    
+    limit = page_size(request.args.get('per_page', type=int), Config.ADMIN_PAGE_SIZE, Config.ADMIN_MAX_PAGE_SIZE)
+    after = decode_cursor(request.args.get('after'), 1)
+    filters = listing_filters()
+    if request.args.get('donor_id', type=int):
+        filters['donor_id'] = request.args.get('donor_id', type=int)
+    if request.args.get('payment_method') in bulk_import.PAYMENT_METHODS:
+        filters['payment_method'] = request.args['payment_method']
+    
+    connection = get_read_connection()
+    if not connection:
+        flash('Database connection error', 'error')
+        return render_template('admin/donations.html', donations=[], next_cursor=None, ngos=[],
+                               payment_methods=bulk_import.PAYMENT_METHODS)
+    
+    cursor = connection.cursor(dictionary=True)
+    
+    try:
+        rows = donations.load_donations(cursor, limit, after, filters)
+        donation_rows, next_cursor = split_page(rows, limit, lambda d: (d['Donation_id'],))
+        ngos = ngo_options(cursor)
+        
+    except Exception as e:
+        flash(f'Error loading donations: {str(e)}', 'error')
+        donation_rows, next_cursor, ngos = [], None, []
+    finally:
+        cursor.close()
+        connection.close()
+    
+    return render_template('admin/donations.html', donations=donation_rows, next_cursor=next_cursor,
+                           ngos=ngos, payment_methods=bulk_import.PAYMENT_METHODS)
+
+@app.route('/admin/donations/add', methods=['GET', 'POST'])
+def add_donation():
     if 'user_id' not in session or not session.get('is_admin'):
         return redirect(url_for('admin_login'))
     
     connection = get_db_connection()
     if not connection:
         flash('Database connection error', 'error')
-        return render_template('admin/donation_impact.html', impacts=[])
+        return redirect(url_for('donations'))
+    
+    rows = blank_form_rows()
+    try:
+        if request.method == 'POST':
+            rows = form_rows(('donor_id', 'ngo_id', 'amount', 'donation_date', 'payment_method'))
+            entered = filled_rows(rows, ('donor_id', 'amount'))
+            errors = donations.add_donations(connection, entered) if entered else [(None, 'Fill in at least one row.')]
+            if not errors:
+                page_cache.invalidate('donation')
+                mark_write()
+                flash(f'Added {len(entered)} donation(s).', 'success')
+                return redirect(url_for('donations'))
+            for number, message in errors:
+                flash(f'Row {number}: {message}' if number else message, 'error')
+        
+        cursor = connection.cursor(dictionary=True)
+        ngos = ngo_options(cursor)
+        cursor.close()
+        
+    except Exception as e:
+        flash(f'Error adding donations: {str(e)}', 'error')
+        ngos = []
+    finally:
+        connection.close()
+    
+    return render_template('admin/add_donations.html', rows=rows, ngos=ngos,
+                           payment_methods=bulk_import.PAYMENT_METHODS)
+
+@app.route('/admin/donors', endpoint='donors')
+def admin_donors():
+    if 'user_id' not in session or not session.get('is_admin'):
+        return redirect(url_for('admin_login'))
+    
+    search = request.args.get('q', '').strip()
+    limit = page_size(request.args.get('per_page', type=int), Config.ADMIN_PAGE_SIZE, Config.ADMIN_MAX_PAGE_SIZE)
+    after = decode_cursor(request.args.get('after'), 2 if search else 1)
+    
+    connection = get_read_connection()
+    if not connection:
+        flash('Database connection error', 'error')
+        return render_template('admin/donors.html', donors=[], next_cursor=None, search=search)
     
     cursor = connection.cursor(dictionary=True)
     
     try:
-        cursor.execute("""
-            SELECT
-                don.Name AS Donor_Name,
-                d.Amount AS Donation_Amount,
-                d.Donation_date,
-                n.Ngo_name AS NGO_Name,
-                (SELECT COUNT(*) FROM beneficiary WHERE Ngo_id = n.Ngo_id) AS Beneficiaries_Supported
-            FROM donation d
-            JOIN donor don ON d.Donor_id = don.Donor_id
-            JOIN ngo n ON d.Ngo_id = n.Ngo_id
-            ORDER BY d.Donation_id DESC, d.Donation_date DESC
-        """)
-        impacts = cursor.fetchall()
+        rows = donors.load_donors(cursor, limit, after, search)
+        donor_rows, next_cursor = split_page(rows, limit, donors.page_key(search))
+        donors.attach_contacts(cursor, donor_rows)
         
     except Exception as e:
-        flash(f'Error loading impact data: {str(e)}', 'error')
-        impacts = []
+        flash(f'Error loading donors: {str(e)}', 'error')
+        donor_rows, next_cursor = [], None
     finally:
         cursor.close()
         connection.close()
     
-    return render_template('admin/donation_impact.html', impacts=impacts)
+    return render_template('admin/donors.html', donors=donor_rows, next_cursor=next_cursor, search=search)
+
+@app.route('/admin/donors/lookup')
+def donor_lookup():
+    if 'user_id' not in session or not session.get('is_admin'):
+        abort(403)
+    
+    prefix = request.args.get('q', '').strip()
+    if not prefix:
+        return jsonify(donors=[])
+    
+    connection = get_read_connection()
+    if not connection:
+        abort(503)
+    cursor = connection.cursor(dictionary=True)
+    try:
+        matches = donors.lookup(cursor, prefix)
+    finally:
+        cursor.close()
+        connection.close()
+    return jsonify(donors=[{'id': d['Donor_id'], 'name': d['Name']} for d in matches])
+
+@app.route('/admin/donors/add', methods=['GET', 'POST'])
+def add_donor():
+    if 'user_id' not in session or not session.get('is_admin'):
+        return redirect(url_for('admin_login'))
+    
+    rows = blank_form_rows()
+    if request.method == 'POST':
+        rows = form_rows(('name', 'address', 'phone', 'email'))
+        entered = filled_rows(rows, ('name', 'address', 'phone', 'email'))
+        connection = get_db_connection()
+        if not connection:
+            flash('Database connection error', 'error')
+            return render_template('admin/add_donor.html', rows=rows)
+        
+        try:
+            errors = donors.add_donors(connection, entered) if entered else [(None, 'Fill in at least one row.')]
+            if not errors:
+                search_index.catch_up(get_db_connection, force=True)
+                mark_write()
+                flash(f'Added {len(entered)} donor(s).', 'success')
+                return redirect(url_for('donors'))
+            for number, message in errors:
+                flash(f'Row {number}: {message}' if number else message, 'error')
+        except Exception as e:
+            flash(f'Error adding donors: {str(e)}', 'error')
+        finally:
+            connection.close()
+    
+    return render_template('admin/add_donor.html', rows=rows)
+
+@app.route('/admin/events', endpoint='events')
+def admin_events():
+    if 'user_id' not in session or not session.get('is_admin'):
+        return redirect(url_for('admin_login'))
+    
+    limit = page_size(request.args.get('per_page', type=int), Config.ADMIN_PAGE_SIZE, Config.ADMIN_MAX_PAGE_SIZE)
+    after = decode_cursor(request.args.get('after'), 2)
+    filters = listing_filters()
+    
+    connection = get_read_connection()
+    if not connection:
+        flash('Database connection error', 'error')
+        return render_template('admin/events.html', events=[], next_cursor=None, ngos=[])
+    
+    cursor = connection.cursor(dictionary=True)
+    
+    try:
+        rows = event_store.load_events(cursor, limit, after, filters)
+        event_rows, next_cursor = split_page(rows, limit, lambda e: (e['Event_date'], e['Event_id']))
+        ngos = ngo_options(cursor)
+        
+    except Exception as e:
+        flash(f'Error loading events: {str(e)}', 'error')
+        event_rows, next_cursor, ngos = [], None, []
+    finally:
+        cursor.close()
+        connection.close()
+    
+    return render_template('admin/events.html', events=event_rows, next_cursor=next_cursor, ngos=ngos)
+
+@app.route('/admin/events/add', methods=['GET', 'POST'])
+def add_event():
+    if 'user_id' not in session or not session.get('is_admin'):
+        return redirect(url_for('admin_login'))
+    
+    connection = get_db_connection()
+    if not connection:
+        flash('Database connection error', 'error')
+        return redirect(url_for('events'))
+    
+    rows = blank_form_rows()
+    try:
+        if request.method == 'POST':
+            rows = form_rows(('ngo_id', 'event_name', 'description', 'venue', 'event_date', 'budget'))
+            entered = filled_rows(rows, ('event_name', 'event_date'))
+            errors = event_store.add_events(connection, entered) if entered else [(None, 'Fill in at least one row.')]
+            if not errors:
+                page_cache.invalidate('event')
+                mark_write()
+                flash(f'Added {len(entered)} event(s).', 'success')
+                return redirect(url_for('events'))
+            for number, message in errors:
+                flash(f'Row {number}: {message}' if number else message, 'error')
+        
+        cursor = connection.cursor(dictionary=True)
+        ngos = ngo_options(cursor)
+        cursor.close()
+        
+    except Exception as e:
+        flash(f'Error adding events: {str(e)}', 'error')
+        ngos = []
+    finally:
+        connection.close()
+    
+    return render_template('admin/add_event.html', rows=rows, ngos=ngos)
+
+def search_people(query, kind, limit):
+    # From the in-memory index, or from MySQL while it is still loading
+    if search_index.ensure_loaded(get_db_connection):
+        return search_index.search(query, kind, limit), 'index'
+    connection = get_read_connection()
+    if not connection:
+        raise RuntimeError('Database connection error')
+    cursor = connection.cursor(dictionary=True)
+    try:
+        return search_database(cursor, query, kind, limit), 'database'
+    finally:
+        cursor.close()
+        connection.close()
+
+def search_args():
+    query = request.args.get('q', '').strip()[:100]
+    kind = request.args.get('kind', '')
+    return query, kind if kind in ('donor', 'volunteer') else ''
+
+@app.route('/admin/search')
+def admin_search():
+    if 'user_id' not in session or not session.get('is_admin'):
+        return redirect(url_for('admin_login'))
+    
+    query, kind = search_args()
+    limit = page_size(request.args.get('limit', type=int), Config.ADMIN_PAGE_SIZE, Config.ADMIN_MAX_PAGE_SIZE)
+    results, source = [], None
+    if query:
+        try:
+            results, source = search_people(query, kind, limit)
+        except Exception as e:
+            flash(f'Error searching: {str(e)}', 'error')
+    
+    return render_template('admin/search.html', query=query, kind=kind, results=results, source=source)
+
+@app.route('/admin/search/suggest')
+def search_suggest():
+    if 'user_id' not in session or not session.get('is_admin'):
+        abort(403)
+    
+    query, kind = search_args()
+    if not query:
+        return jsonify(results=[], source=None)
+    try:
+        results, source = search_people(query, kind, 10)
+    except RuntimeError:
+        abort(503)
+    return jsonify(results=results, source=source)
+
+@app.route('/admin/assets')
+def admin_assets():
+    if 'user_id' not in session or not session.get('is_admin'):
+        return redirect(url_for('admin_login'))
+    
+    connection = get_read_connection()
+    if not connection:
+        flash('Database connection error', 'error')
+        return render_template('admin/assets.html', hero=None, ngos=[])
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT Ngo_id, Ngo_name, Image_digest FROM ngo ORDER BY Ngo_name")
+        ngos = cursor.fetchall()
+        hero = assets.current(connection, 'hero')
+    except Exception as e:
+        flash(f'Error loading images: {str(e)}', 'error')
+        hero, ngos = None, []
+    finally:
+        cursor.close()
+        connection.close()
+    return render_template('admin/assets.html', hero=hero, ngos=ngos)
+
+@app.route('/admin/assets', methods=['POST'])
+def upload_asset():
+    if 'user_id' not in session or not session.get('is_admin'):
+        return redirect(url_for('admin_login'))
+    
+    upload = request.files.get('image')
+    if not upload or not upload.filename:
+        flash('Please choose an image to upload.', 'error')
+        return redirect(url_for('admin_assets'))
+    data = upload.read(Config.ASSET_MAX_BYTES + 1)
+    if len(data) > Config.ASSET_MAX_BYTES:
+        flash(f'Images must be under {Config.ASSET_MAX_BYTES // (1024 * 1024)} MB.', 'error')
+        return redirect(url_for('admin_assets'))
+    
+    try:
+        digest = asset_store.put(data)
+    except ValueError as e:
+        flash(str(e), 'error')
+        return redirect(url_for('admin_assets'))
+    
+    connection = get_db_connection()
+    if not connection:
+        flash('Database connection error', 'error')
+        return redirect(url_for('admin_assets'))
+    try:
+        ngo_id = request.form.get('ngo_id', type=int)
+        if ngo_id:
+            if assets.assign_ngo(connection, ngo_id, digest):
+                page_cache.invalidate('ngo')
+                flash('NGO image updated.', 'success')
+            else:
+                flash('NGO not found.', 'error')
+        else:
+            assets.assign(connection, 'hero', digest)
+            page_cache.invalidate('hero')
+            flash('Hero image updated.', 'success')
+        mark_write()
+    except Exception as e:
+        flash(f'Error saving image: {str(e)}', 'error')
+    finally:
+        connection.close()
+    return redirect(url_for('admin_assets'))
+
+@app.route('/admin/analytics')
+def admin_analytics():
+    if 'user_id' not in session or not session.get('is_admin'):
+        return redirect(url_for('admin_login'))
+    
+    connection = get_read_connection()
+    if not connection:
+        flash('Database connection error', 'error')
+        return render_template('admin/analytics.html', ngos=[], periods=donation_analytics.PERIODS)
+    cursor = connection.cursor(dictionary=True)
+    try:
+        ngos = ngo_options(cursor)
+    finally:
+        cursor.close()
+        connection.close()
+    return render_template('admin/analytics.html', ngos=ngos, periods=donation_analytics.PERIODS)
+
+@app.route('/admin/analytics/donations.json')
+def donation_analytics_data():
+    if 'user_id' not in session or not session.get('is_admin'):
+        abort(403)
+    
+    period = request.args.get('period', 'month')
+    group_by = request.args.get('group_by', 'bucket')
+    if period not in donation_analytics.PERIODS or group_by not in donation_analytics.GROUPS:
+        abort(400, description="'period' must be day or month and 'group_by' one of bucket, ngo, method")
+    try:
+        filters = exports.parse_filters(request.args)
+    except ValueError as e:
+        abort(400, description=str(e))
+    
+    try:
+        columns = donation_rollups.columns(period, get_read_connection)
+    except RuntimeError:
+        abort(503)
+    rows = donation_analytics.summarize(columns, period, group_by,
+                                        start=filters.get('start'), end=filters.get('end'),
+                                        ngo_id=filters.get('ngo_id'),
+                                        payment_method=request.args.get('payment_method') or None)
+    return jsonify(period=period, group_by=group_by, rows=rows)
+
+@app.route('/admin/analytics/rebuild', methods=['POST'])
+def rebuild_donation_rollups():
+    if 'user_id' not in session or not session.get('is_admin'):
+        return redirect(url_for('admin_login'))
+    
+    job_id = job_runner.submit('donation_rollup', {'rebuild': True}, created_by=session.get('username'))
+    return redirect(url_for('admin_job', job_id=job_id))
+
+@app.route('/admin/import/donations', methods=['GET', 'POST'])
+def import_donations():
+    if 'user_id' not in session or not session.get('is_admin'):
+        return redirect(url_for('admin_login'))
+    
+    report = None
+    if request.method == 'POST':
+        upload = request.files.get('file')
+        if not upload or not upload.filename:
+            flash('Please choose a CSV file to import.', 'error')
+            return redirect(url_for('import_donations'))
+        
+        connection = get_db_connection()
+        if not connection:
+            flash('Database connection error', 'error')
+            return redirect(url_for('import_donations'))
+        
+        try:
+            lines = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline='')
+            report = bulk_import.import_donations(connection, lines, dry_run='dry_run' in request.form)
+            if report.donations_created:
+                page_cache.invalidate('donation')
+                search_index.catch_up(get_db_connection, force=True)
+                mark_write()
+        except Exception as e:
+            flash(f'Error importing donations: {str(e)}', 'error')
+        finally:
+            connection.close()
+    
+    return render_template('admin/import_donations.html', report=report)
+
+@app.route('/admin/cache-stats')
+def cache_stats():
+    if 'user_id' not in session or not session.get('is_admin'):
+        return redirect(url_for('admin_login'))
+    
+    return jsonify(page_cache.stats())
+
+@app.route('/admin/export/<dataset>.<fmt>')
+def export_data(dataset, fmt):
+    if 'user_id' not in session or not session.get('is_admin'):
+        return redirect(url_for('admin_login'))
+    
+    if dataset not in exports.EXPORTS or fmt not in exports.FORMATS:
+        abort(404)
+    
+    try:
+        filters = exports.parse_filters(request.args)
+    except ValueError as e:
+        abort(400, description=str(e))
+    
+    connection = get_read_connection()
+    if not connection:
+        abort(503, description='Database connection error')
+    
+    sql, params = exports.build_query(dataset, filters)
+    rows = exports.open_stream(connection, sql, params)
+    columns = exports.EXPORTS[dataset]['columns']
+    body = exports.to_csv(columns, rows) if fmt == 'csv' else exports.to_ndjson(columns, rows)
+    
+    filename = f"{dataset}-{datetime.now():%Y%m%d-%H%M%S}.{fmt}"
+    return Response(stream_with_context(body), mimetype=exports.FORMATS[fmt],
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+
+@app.route('/admin/jobs/export/<dataset>.<fmt>', methods=['POST'])
+def submit_export_job(dataset, fmt):
+    if 'user_id' not in session or not session.get('is_admin'):
+        return redirect(url_for('admin_login'))
+    
+    if dataset not in exports.EXPORTS or fmt not in exports.FORMATS:
+        abort(404)
+    
+    filters = {name: request.form.get(name, '') for name in ('start', 'end', 'ngo_id')}
+    try:
+        exports.parse_filters(filters)
+    except ValueError as e:
+        abort(400, description=str(e))
+    
+    job_id = job_runner.submit('export', {'dataset': dataset, 'fmt': fmt, 'filters': filters},
+                               created_by=session.get('username'))
+    return redirect(url_for('admin_job', job_id=job_id))
+
+@app.route('/admin/jobs')
+def admin_jobs():
+    if 'user_id' not in session or not session.get('is_admin'):
+        return redirect(url_for('admin_login'))
+    
+    try:
+        jobs = job_runner.recent()
+    except Exception as e:
+        flash(f'Error loading jobs: {str(e)}', 'error')
+        jobs = []
+    return render_template('admin/jobs.html', jobs=jobs)
+
+@app.route('/admin/jobs/<int:job_id>')
+def admin_job(job_id):
+    if 'user_id' not in session or not session.get('is_admin'):
+        return redirect(url_for('admin_login'))
+    
+    job = job_runner.get(job_id)
+    if not job:
+        abort(404)
+    return render_template('admin/job.html', job=job)
+
+@app.route('/admin/jobs/<int:job_id>/status')
+def admin_job_status(job_id):
+    if 'user_id' not in session or not session.get('is_admin'):
+        abort(403)
+    
+    job = job_runner.get(job_id)
+    if not job:
+        abort(404)
+    return jsonify(status=job['Status'], progress=job['Progress'], message=job['Message'],
+                   error=job['Error'], result=job['Result'])
+
+@app.route('/admin/jobs/<int:job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    if 'user_id' not in session or not session.get('is_admin'):
+        return redirect(url_for('admin_login'))
+    
+    if job_runner.cancel(job_id):
+        flash('Cancellation requested.', 'success')
+    else:
+        flash('The job has already finished.', 'error')
+    return redirect(url_for('admin_job', job_id=job_id))
+
+@app.route('/admin/jobs/<int:job_id>/download')
+def download_job_result(job_id):
+    if 'user_id' not in session or not session.get('is_admin'):
+        return redirect(url_for('admin_login'))
+    
+    job = job_runner.get(job_id)
+    if not job or job['Status'] != 'succeeded' or not (job['Result'] or {}).get('file'):
+        abort(404)
+    result = job['Result']
+    return send_from_directory(Config.JOB_OUTPUT_DIR, result['file'], as_attachment=True,
+                               mimetype=exports.FORMATS.get(result['fmt']))
+
+def warm_up():
+    # Run in each server worker before it takes traffic (gunicorn.conf.py):
+    # compiles every template, fills the pool and the page and NGO list caches
+    # and starts loading the search index, so the first visitors to a fresh
+    # worker don't pay for them
+    started = time.perf_counter()
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
+    if not test_db_connection():
+        return
+    search_index.start_loading(get_db_connection)  # in the background
+    client = app.test_client()
+    for path in ('/', '/ngos', '/events'):
+        response = client.get(path)
+        if response.status_code != 200:
+            print(f"⚠️  Warm-up request to {path} returned {response.status_code}")
+    print(f"🔥 Worker {os.getpid()} warmed up in {time.perf_counter() - started:.2f}s")
 
 if __name__ == '__main__':
     print("🚀 Starting NGO Management System...")
@@ -0,0 +1,338 @@
+import asyncio
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import abort, flash, render_template, request, session
+from werkzeug.exceptions import HTTPException
+
+from app import (app as flask_app, Config, page_cache, instrumentation, has_flashes, wrote_recently, request_counter_refresh,
+                 UPCOMING_EVENTS_SQL, RECENT_DONATIONS_SQL, budget_audit_query, donation_impact_query,
+                 beneficiary_counts_query, admin_only, listing_args, render_dashboard, render_budget_audit,
+                 impact_page, add_beneficiaries)
+from async_db import AsyncDatabase
+from audit_feed import AuditFeed
+import audit_feed
+from cache import cached_async_page
+import dashboard_stats
+
+# ASGI entry point: `uvicorn asgi:app --workers 4`. The read-heavy pages
+# below are coroutines on an aiomysql pool, so a worker waiting on MySQL for
+# them holds no thread. Every other route is the sync Flask app from app.py,
+# run on a small thread pool. `python app.py` still serves everything sync.
+
+db = AsyncDatabase(on_query=instrumentation.record_query if Config.INSTRUMENTATION else None)
+sync_executor = ThreadPoolExecutor(max_workers=Config.ASGI_SYNC_THREADS, thread_name_prefix='asgi-sync')
+audit_events = AuditFeed(db.fetch_all, poll_interval=Config.AUDIT_FEED_POLL_INTERVAL)
+flask_app.config['AUDIT_STREAM'] = True
+
+# Flask endpoint -> coroutine serving it; URLs and methods come from app.url_map
+async_views = {}
+
+
+def async_view(endpoint):
+    def decorator(view):
+        async_views[endpoint] = view
+        return view
+    return decorator
+
+
+async def run_sync(function, *args):
+    return await asyncio.get_running_loop().run_in_executor(sync_executor, function, *args)
+
+
+async def read_counters():
+    rows = await db.fetch_all(dashboard_stats.COUNTER_AGES_SQL)
+    if dashboard_stats.is_stale(rows, Config.DASHBOARD_STATS_MAX_STALENESS):
+        # Only queues the recount job; the stored values are served meanwhile
+        await run_sync(request_counter_refresh)
+    return dashboard_stats.counter_values(rows)
+
+
+@async_view('public_events')
+@cached_async_page(page_cache, Config.PAGE_CACHE_TTL, tags=('event', 'ngo'), bypass=has_flashes)
+async def public_events():
+    try:
+        events = await db.fetch_all(UPCOMING_EVENTS_SQL, read_only=not wrote_recently())
+    except Exception as e:
+        print(f"Database error: {e}")
+        events = []
+    return render_template('public/events.html', events=events)
+
+
+@async_view('admin_dashboard')
+@admin_only
+async def admin_dashboard():
+    try:
+        # Independent queries, each on its own pooled connection
+        counters, recent_donations, upcoming_events = await asyncio.gather(
+            read_counters(),
+            db.fetch_all(RECENT_DONATIONS_SQL),
+            db.fetch_all(UPCOMING_EVENTS_SQL + " LIMIT 5"))
+    except Exception as e:
+        flash(f'Database error: {str(e)}', 'error')
+        return render_dashboard()
+    return render_dashboard(counters, recent_donations, upcoming_events)
+
+
+@async_view('budget_audit')
+@admin_only
+async def budget_audit():
+    limit, after = listing_args(2)
+    archived = request.args.get('archived') == '1'
+
+    try:
+        rows = await db.fetch_all(*budget_audit_query(after, limit, archived), read_only=not wrote_recently())
+    except Exception as e:
+        flash(f'Error loading budget audit: {str(e)}', 'error')
+        rows = None
+    return render_budget_audit(rows, limit, after, archived)
+
+
+class EventStream:
+    # Returned by an async view to answer with Server-Sent Events from an
+    # async generator of str chunks
+    def __init__(self, events):
+        self.events = events
+
+
+@async_view('budget_audit_stream')
+async def budget_audit_stream():
+    if 'user_id' not in session or not session.get('is_admin'):
+        abort(403)
+
+    # EventSource sends the last id it received when it reconnects
+    after_id = request.headers.get('Last-Event-ID', type=int)
+    if after_id is None:
+        after_id = request.args.get('after_id', 0, type=int)
+
+    try:
+        # Subscribes before the response starts, so a database error is a 503
+        subscription = await audit_events.subscribe()
+    except Exception as e:
+        abort(503, description=f'Database error: {e}')
+    return EventStream(audit_feed.event_stream(audit_events, subscription, after_id,
+                                               duration=Config.AUDIT_FEED_STREAM_SECONDS))
+
+
+@async_view('donation_impact')
+@admin_only
+async def donation_impact():
+    limit, after = listing_args(1)
+    read_only = not wrote_recently()
+
+    try:
+        rows = await db.fetch_all(*donation_impact_query(after, limit), read_only=read_only)
+        impacts, next_cursor, ngo_ids = impact_page(rows, limit)
+        if ngo_ids:
+            add_beneficiaries(impacts, await db.fetch_all(*beneficiary_counts_query(ngo_ids), read_only=read_only))
+    except Exception as e:
+        flash(f'Error loading impact data: {str(e)}', 'error')
+        impacts, next_cursor = [], None
+
+    return render_template('admin/donation_impact.html', impacts=impacts, next_cursor=next_cursor)
+
+
+# ASGI <-> WSGI plumbing
+
+async def read_body(receive):
+    # Spools large uploads (e.g. CSV imports) to disk
+    body = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        body.write(message.get('body', b''))
+        if not message.get('more_body'):
+            break
+    body.seek(0)
+    return body
+
+
+def wsgi_environ(scope, body):
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1] or 80),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        'wsgi.input_terminated': True,  # read in full, so no Content-Length is needed
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'], environ['REMOTE_PORT'] = scope['client'][0], str(scope['client'][1])
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        key = name if name in ('CONTENT_TYPE', 'CONTENT_LENGTH') else 'HTTP_' + name
+        value = value.decode('latin-1')
+        if key in environ:
+            value = environ[key] + ('; ' if key == 'HTTP_COOKIE' else ',') + value
+        environ[key] = value
+    return environ
+
+
+class ResponseStart:
+    # start_response() for a WSGI app, kept as the ASGI response start message
+    def __init__(self):
+        self.message = None
+
+    def __call__(self, status, headers, exc_info=None):
+        self.message = {
+            'type': 'http.response.start',
+            'status': int(status.split(' ', 1)[0]),
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+        }
+
+
+class AsgiApp:
+    def __init__(self, flask_app, database):
+        self.flask_app = flask_app
+        self.database = database
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] != 'http':
+            return
+
+        environ = wsgi_environ(scope, await read_body(receive))
+        try:
+            endpoint, _ = self.flask_app.url_map.bind_to_environ(environ).match()
+        except HTTPException:
+            endpoint = None
+        if endpoint in async_views:
+            await self.call_async(async_views[endpoint], environ, receive, send)
+        else:
+            await self.call_sync(environ, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    await self.database.start()
+                except Exception as e:
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.database.close()
+                sync_executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def call_async(self, view, environ, receive, send):
+        # What Flask.wsgi_app() does for a sync view, with the view awaited
+        app = self.flask_app
+        stream = None
+        with app.request_context(environ):
+            try:
+                try:
+                    rv = app.preprocess_request()
+                    if rv is None:
+                        rv = await view(**request.view_args)
+                except Exception as e:
+                    rv = app.handle_user_exception(e)
+                if isinstance(rv, EventStream):
+                    stream = rv
+                else:
+                    response = app.finalize_request(rv)
+            except Exception as e:
+                response = app.handle_exception(e)
+
+        if stream is not None:
+            return await self.send_events(stream, receive, send)
+        start = ResponseStart()
+        body = b''.join(response(environ, start))
+        await send(start.message)
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def send_events(self, stream, receive, send):
+        # Sends the stream until it ends or the client disconnects; either
+        # way the generator is closed so it unsubscribes
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [(b'content-type', b'text/event-stream; charset=utf-8'),
+                        (b'cache-control', b'no-cache'),
+                        (b'x-accel-buffering', b'no')],
+        })
+
+        async def pump():
+            async for chunk in stream.events:
+                await send({'type': 'http.response.body', 'body': chunk.encode('utf-8'), 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+
+        async def disconnected():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+
+        sending = asyncio.ensure_future(pump())
+        watching = asyncio.ensure_future(disconnected())
+        try:
+            await asyncio.wait((sending, watching), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in (sending, watching):
+                task.cancel()
+            results = await asyncio.gather(sending, watching, return_exceptions=True)
+            await stream.events.aclose()
+        if isinstance(results[0], Exception) and not isinstance(results[0], OSError):
+            print(f"Event stream error: {results[0]}")
+
+    async def call_sync(self, environ, send):
+        # The WSGI app runs, and its response is iterated, on one executor
+        # thread (streamed responses keep their request context there).
+        # Chunks are handed over through a small queue so a slow client
+        # holds back a streamed export instead of buffering it in memory.
+        loop = asyncio.get_running_loop()
+        chunks = asyncio.Queue(maxsize=8)
+        abandoned = threading.Event()
+        start = ResponseStart()
+
+        def handover(item):
+            if not abandoned.is_set():
+                asyncio.run_coroutine_threadsafe(chunks.put(item), loop).result()
+
+        def run():
+            try:
+                iterable = self.flask_app(environ, start)
+                try:
+                    for chunk in iterable:
+                        if abandoned.is_set():
+                            break
+                        if chunk:
+                            handover(chunk)
+                finally:
+                    if hasattr(iterable, 'close'):
+                        iterable.close()
+            finally:
+                handover(None)
+
+        worker = loop.run_in_executor(sync_executor, run)
+        try:
+            chunk = await chunks.get()
+            if start.message is None:
+                await worker  # the app failed before responding; re-raises
+            await send(start.message)
+            while chunk is not None:
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+                chunk = await chunks.get()
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            abandoned.set()
+            while not chunks.empty():
+                chunks.get_nowait()
+        await worker
+
+
+app = AsgiApp(flask_app, db)
@@ -0,0 +1,218 @@
+import hashlib
+import io
+import os
+import re
+import sys
+import tempfile
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+from config import Config
+from database_connector import DatabaseConnector
+
+# fmt -> Pillow format, mimetype and file extension of a resized variant
+FORMATS = {
+    'webp': ('WEBP', 'image/webp', 'webp'),
+    'jpeg': ('JPEG', 'image/jpeg', 'jpg'),
+}
+EXTENSIONS = {
+    'image/jpeg': 'jpg',
+    'image/png': 'png',
+    'image/gif': 'gif',
+    'image/webp': 'webp',
+}
+DIGEST = re.compile(r'[0-9a-f]{64}$')
+
+
+def sniff_mimetype(data):
+    if data.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if data.startswith(b'\x89PNG'):
+        return 'image/png'
+    if data.startswith(b'GIF8'):
+        return 'image/gif'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'image/webp'
+    return None
+
+
+class AssetStore:
+    # Images on local disk, named by the SHA-256 of their bytes, so a file
+    # never changes once written and the database only keeps the digest:
+    #   <root>/ab/<digest>.<ext>            the upload as-is
+    #   <root>/ab/<digest>-<width>.<ext>    resized variants per width and format
+    # Variants are made when an image is stored; one missing later (say the
+    # widths changed) is made on first request.
+    def __init__(self, root, widths=(480, 960, 1600), quality=80):
+        self.root = root
+        self.widths = tuple(sorted(widths))
+        self.quality = quality
+
+    def _path(self, digest, suffix, extension):
+        return os.path.join(self.root, digest[:2], f"{digest}{suffix}.{extension}")
+
+    def _write(self, path, data):
+        # Written under a temporary name and renamed, so a reader (or another
+        # worker storing the same image) never sees a partial file
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                file.write(data)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    def put(self, data):
+        # Stores an uploaded image with all its variants and returns its digest.
+        # Raises ValueError if the data isn't an image we can serve.
+        mimetype = sniff_mimetype(data)
+        if mimetype is None:
+            raise ValueError('Not a JPEG, PNG, GIF or WebP image')
+        if Image is not None:
+            try:
+                with Image.open(io.BytesIO(data)) as picture:
+                    picture.load()
+            except Exception:
+                raise ValueError('The image file is damaged or incomplete')
+
+        digest = hashlib.sha256(data).hexdigest()
+        original = self._path(digest, '', EXTENSIONS[mimetype])
+        if not os.path.exists(original):
+            self._write(original, data)
+        if Image is not None:
+            for width in self.widths:
+                for fmt in FORMATS:
+                    self._variant(digest, original, width, fmt)
+        return digest
+
+    def _original(self, digest):
+        for mimetype, extension in EXTENSIONS.items():
+            path = self._path(digest, '', extension)
+            if os.path.exists(path):
+                return path, mimetype
+        return None
+
+    def _variant(self, digest, original, width, fmt):
+        pil_format, mimetype, extension = FORMATS[fmt]
+        path = self._path(digest, f"-{width or 'full'}", extension)
+        if os.path.exists(path):
+            return path, mimetype
+
+        with Image.open(original) as source:
+            picture = source.convert('RGB')
+            if width and picture.width > width:
+                height = round(picture.height * width / picture.width)
+                picture = picture.resize((width, height), Image.LANCZOS)
+            buffer = io.BytesIO()
+            picture.save(buffer, pil_format, quality=self.quality, optimize=True)
+        self._write(path, buffer.getvalue())
+        return path, mimetype
+
+    def locate(self, digest, width=None, fmt=None):
+        # (path, mimetype) of an image or one of its variants, or None if the
+        # digest isn't in the store. Unknown widths snap to the nearest
+        # configured one so the number of variant files stays bounded.
+        if not DIGEST.match(digest):
+            return None
+        original = self._original(digest)
+        if original is None:
+            return None
+        if Image is None or (width is None and fmt is None) or fmt not in (None, *FORMATS):
+            return original
+
+        if width is not None:
+            width = min(self.widths, key=lambda w: abs(w - width))
+        return self._variant(digest, original[0], width, fmt or 'jpeg')
+
+
+def current(connection, name):
+    # Digest of a named site image such as 'hero', or None
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT Digest FROM site_asset WHERE Name = %s", (name,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+    finally:
+        cursor.close()
+
+
+def assign(connection, name, digest):
+    cursor = connection.cursor()
+    try:
+        cursor.execute("""
+            INSERT INTO site_asset (Name, Digest, Updated_at) VALUES (%s, %s, NOW())
+            ON DUPLICATE KEY UPDATE Digest = VALUES(Digest), Updated_at = VALUES(Updated_at)
+        """, (name, digest))
+        connection.commit()
+    finally:
+        cursor.close()
+
+
+def assign_ngo(connection, ngo_id, digest):
+    # Returns False if there is no such NGO
+    cursor = connection.cursor()
+    try:
+        cursor.execute("UPDATE ngo SET Image_digest = %s WHERE Ngo_id = %s", (digest, ngo_id))
+        connection.commit()
+        return cursor.rowcount > 0
+    finally:
+        cursor.close()
+
+
+def import_blob(connection, store):
+    # Moves a hero image stored the old way, as a BLOB in website_settings,
+    # into the store. Returns its digest, or None if there was none.
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT hero_image FROM website_settings WHERE id = 1")
+        row = cursor.fetchone()
+        if not row or not row[0]:
+            return None
+        digest = store.put(bytes(row[0]))
+        assign(connection, 'hero', digest)
+        cursor.execute("UPDATE website_settings SET hero_image = NULL WHERE id = 1")
+        connection.commit()
+        return digest
+    finally:
+        cursor.close()
+
+
+USAGE = """Usage:
+  python assets.py hero <image>          set the landing page hero image
+  python assets.py ngo <ngo_id> <image>  set an NGO's image
+  python assets.py import-blob           move the hero image out of website_settings"""
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    if not (args == ['import-blob'] or (args[:1] == ['hero'] and len(args) == 2)
+            or (args[:1] == ['ngo'] and len(args) == 3 and args[1].isdigit())):
+        print(USAGE)
+        sys.exit(1)
+
+    store = AssetStore(Config.ASSET_DIR, widths=Config.ASSET_WIDTHS)
+    connection = DatabaseConnector().get_connection()
+    if not connection:
+        sys.exit("Could not connect to the database")
+    try:
+        if args[0] == 'import-blob':
+            digest = import_blob(connection, store)
+            if digest is None:
+                sys.exit("No hero image in website_settings")
+            print(f"✅ Moved the hero image to {store.locate(digest)[0]}")
+        else:
+            with open(args[-1], 'rb') as file:
+                digest = store.put(file.read())
+            if args[0] == 'hero':
+                assign(connection, 'hero', digest)
+            elif not assign_ngo(connection, int(args[1]), digest):
+                sys.exit(f"No NGO with id {args[1]}")
+            print(f"✅ Stored {args[-1]} as {digest[:12]} with {len(store.widths)} resized widths")
+    except (OSError, ValueError) as e:
+        sys.exit(f"❌ {e}")
+    finally:
+        connection.close()
@@ -0,0 +1,93 @@
+import asyncio
+import itertools
+import time
+
+import aiomysql
+
+from config import Config
+from db_pool import mysql_connect_kwargs, parse_dsn
+
+
+def _pool_kwargs(kwargs):
+    # aiomysql takes the database as `db`
+    kwargs = dict(kwargs)
+    kwargs['db'] = kwargs.pop('database')
+    return kwargs
+
+
+class AsyncDatabase:
+    # aiomysql pools for the ASGI app: the primary plus one per MYSQL_REPLICAS
+    # entry, chosen the same way db_pool.read_connection() does. Created on
+    # the event loop by start() (or the first query) and shared by every
+    # request that worker serves, so how many queries run at once is bounded
+    # by ASYNC_DB_POOL_SIZE rather than by threads.
+    def __init__(self, config=None, on_query=None):
+        self.config = config or Config()
+        self.on_query = on_query  # on_query(sql, elapsed), e.g. Instrumentation.record_query
+        self.primary = None
+        self.replicas = []
+        self._down_until = {}
+        self._round_robin = itertools.count()
+        self._start_lock = asyncio.Lock()
+
+    async def _create_pool(self, kwargs, minsize):
+        return await aiomysql.create_pool(minsize=minsize, maxsize=self.config.ASYNC_DB_POOL_SIZE,
+                                          autocommit=True, **_pool_kwargs(kwargs))
+
+    async def start(self):
+        async with self._start_lock:
+            if self.primary is not None:
+                return
+            # Replicas connect on first use so one that is down does not stop startup
+            self.replicas = [await self._create_pool(parse_dsn(dsn, self.config), 0)
+                             for dsn in self.config.MYSQL_REPLICAS]
+            self.primary = await self._create_pool(mysql_connect_kwargs(self.config), 1)
+
+    async def close(self):
+        pools = [pool for pool in (self.primary, *self.replicas) if pool is not None]
+        self.primary, self.replicas = None, []
+        for pool in pools:
+            pool.close()
+        for pool in pools:
+            await pool.wait_closed()
+
+    def _replica_order(self):
+        now = time.monotonic()
+        replicas = [pool for pool in self.replicas if self._down_until.get(pool, 0) <= now]
+        if len(replicas) < 2:
+            return replicas
+        start = next(self._round_robin) % len(replicas)
+        replicas = replicas[start:] + replicas[:start]
+        if self.config.REPLICA_SELECTION == 'least_loaded':
+            replicas.sort(key=lambda pool: (pool.size - pool.freesize) / pool.maxsize)
+        return replicas
+
+    async def _run(self, pool, sql, params):
+        connection = await asyncio.wait_for(pool.acquire(), self.config.DB_POOL_TIMEOUT)
+        try:
+            started = time.perf_counter()
+            async with connection.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(sql, params)
+                rows = await cursor.fetchall()
+            if self.on_query:
+                self.on_query(sql, time.perf_counter() - started)
+            return list(rows)
+        finally:
+            pool.release(connection)
+
+    async def fetch_all(self, sql, params=(), read_only=False):
+        # read_only=True lets a replica answer. A replica with no free
+        # connection is passed over; one that fails is skipped for
+        # REPLICA_RETRY_AFTER and the query goes to the next, then the primary.
+        if self.primary is None:
+            await self.start()
+        if read_only:
+            for pool in self._replica_order():
+                if pool.freesize == 0 and pool.size >= pool.maxsize:
+                    continue
+                try:
+                    return await self._run(pool, sql, params)
+                except (OSError, aiomysql.OperationalError) as e:
+                    self._down_until[pool] = time.monotonic() + self.config.REPLICA_RETRY_AFTER
+                    print(f"Replica unavailable, skipping it for {self.config.REPLICA_RETRY_AFTER:.0f}s: {e}")
+        return await self._run(self.primary, sql, params)
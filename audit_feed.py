@@ -0,0 +1,188 @@
+import asyncio
+import json
+import time
+from datetime import datetime
+from decimal import Decimal
+
+COLUMNS = ('Audit_id', 'Event_id', 'Event_name', 'Old_Budget', 'New_Budget',
+           'Budget_Change', 'Updated_By', 'Change_Timestamp')
+BACKFILL_LIMIT = 500
+ARCHIVE_LOCK = 'budget_audit_archive'
+
+
+def since_query(after_id, limit):
+    # Entries newer than a watermark, oldest first, straight off the primary key
+    return f"""
+        SELECT {', '.join(COLUMNS)}
+        FROM budget_audit
+        WHERE Audit_id > %s
+        ORDER BY Audit_id
+        LIMIT %s
+    """, (after_id, limit)
+
+
+def feed_entry(row):
+    return {column: str(value) if isinstance(value, (Decimal, datetime)) else value
+            for column, value in row.items()}
+
+
+def fetch_since(connection, after_id, limit):
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute(*since_query(after_id, limit))
+        return [feed_entry(row) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+class Subscription:
+    def __init__(self, backlog):
+        self.queue = asyncio.Queue(maxsize=backlog)
+        self.overflowed = False
+
+
+class AuditFeed:
+    # Fans new budget_audit entries out to the event streams open in one ASGI
+    # worker (asgi.py). A single task polls the table while anyone is
+    # subscribed and exits when the last stream closes; streams are
+    # coroutines, so an open audit tab holds no thread. A subscriber that
+    # falls `backlog` entries behind is dropped; its stream ends and the
+    # browser reconnects from the last id it received.
+    #
+    # Ids are taken in order, so an entry whose transaction commits after a
+    # later one's has been published is only seen on the next page load.
+    def __init__(self, fetch_all, poll_interval=2, backlog=200):
+        self.fetch_all = fetch_all  # async (sql, params) -> rows as dicts
+        self.poll_interval = poll_interval
+        self.backlog = backlog
+        self.high_water = 0
+        self._subscribers = set()
+        self._task = None
+
+    async def since(self, after_id, limit):
+        rows = await self.fetch_all(*since_query(after_id, limit))
+        return [feed_entry(row) for row in rows]
+
+    async def subscribe(self):
+        if self._task is None:
+            # Nobody was following, so start from the current end rather
+            # than replaying everything written while idle
+            rows = await self.fetch_all("SELECT COALESCE(MAX(Audit_id), 0) AS max_id FROM budget_audit")
+            if self._task is None:
+                self.high_water = rows[0]['max_id']
+                self._task = asyncio.get_running_loop().create_task(self._run())
+        subscription = Subscription(self.backlog)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self._subscribers.discard(subscription)
+
+    def subscribers(self):
+        return len(self._subscribers)
+
+    async def _run(self):
+        try:
+            while self._subscribers:
+                try:
+                    await self.poll_once()
+                except Exception as e:
+                    print(f"Audit feed error: {e}")
+                await asyncio.sleep(self.poll_interval)
+        finally:
+            self._task = None
+
+    async def poll_once(self):
+        while True:
+            entries = await self.since(self.high_water, BACKFILL_LIMIT)
+            if entries:
+                self.high_water = entries[-1]['Audit_id']
+                self._publish(entries)
+            if len(entries) < BACKFILL_LIMIT:
+                return
+
+    def _publish(self, entries):
+        for subscription in list(self._subscribers):
+            try:
+                for entry in entries:
+                    subscription.queue.put_nowait(entry)
+            except asyncio.QueueFull:
+                subscription.overflowed = True
+                self._subscribers.discard(subscription)
+
+
+def _event(entry):
+    return f"id: {entry['Audit_id']}\nevent: audit\ndata: {json.dumps(entry)}\n\n"
+
+
+async def event_stream(feed, subscription, after_id, heartbeat=15, duration=300):
+    # Server-Sent Events for entries after `after_id`: first the ones already
+    # written, from the database, then the feed's. The stream ends after
+    # `duration` seconds and EventSource reconnects with the last id.
+    try:
+        yield "retry: 3000\n\n"
+        last_id = after_id
+        backlog = await feed.since(after_id, BACKFILL_LIMIT)
+        if len(backlog) == BACKFILL_LIMIT:
+            # Too far behind to catch up entry by entry; the page reloads
+            yield "event: reset\ndata: {}\n\n"
+            return
+        for entry in backlog:
+            yield _event(entry)
+            last_id = entry['Audit_id']
+
+        deadline = time.monotonic() + duration
+        while not subscription.overflowed and time.monotonic() < deadline:
+            try:
+                entry = await asyncio.wait_for(subscription.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if entry['Audit_id'] > last_id:
+                yield _event(entry)
+                last_id = entry['Audit_id']
+    finally:
+        feed.unsubscribe(subscription)
+
+
+def archive(connection, older_than_days, batch_size=1000):
+    # Moves entries older than `older_than_days` into budget_audit_archive,
+    # oldest first, one committed batch at a time, so budget_audit only
+    # holds recent history. Returns the number moved, or None when another
+    # process is already archiving.
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT GET_LOCK(%s, 0)", (ARCHIVE_LOCK,))
+        if cursor.fetchall()[0][0] != 1:
+            return None
+        try:
+            moved = 0
+            columns = ', '.join(COLUMNS)
+            while True:
+                cursor.execute("""
+                    SELECT Audit_id FROM budget_audit
+                    WHERE Change_Timestamp < NOW() - INTERVAL %s SECOND
+                    ORDER BY Change_Timestamp, Audit_id
+                    LIMIT %s
+                """, (older_than_days * 86400, batch_size))
+                ids = [row[0] for row in cursor.fetchall()]
+                if not ids:
+                    return moved
+                placeholders = ', '.join(['%s'] * len(ids))
+                cursor.execute(f"""
+                    INSERT IGNORE INTO budget_audit_archive ({columns})
+                    SELECT {columns} FROM budget_audit WHERE Audit_id IN ({placeholders})
+                """, ids)
+                cursor.execute(f"DELETE FROM budget_audit WHERE Audit_id IN ({placeholders})", ids)
+                connection.commit()
+                moved += len(ids)
+                if len(ids) < batch_size:
+                    return moved
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (ARCHIVE_LOCK,))
+            cursor.fetchall()
+    finally:
+        cursor.close()
@@ -0,0 +1,245 @@
+"""Fails when a route's query needs a full table scan or a sort.
+
+    python benchmarks/explain_check.py                 # seeded SQLite stand-in, benchmark scale
+    python benchmarks/explain_check.py --scale 10
+    python benchmarks/explain_check.py --mysql         # the database in .env / Config
+
+Each GET route from run.py (plus a few admin pages that are not load
+tested) is requested once with the page caches off. Every SELECT the route
+runs is captured from the connection pool with its parameters and
+EXPLAINed. A plan fails the check when it
+
+- reads a whole table without an index: MySQL type=ALL, SQLite "SCAN t"
+  (SQLite also shows a scan that walks an index in ORDER BY order and
+  stops at LIMIT this way, so that case is accepted), or
+- sorts: MySQL "Using filesort", SQLite "USE TEMP B-TREE".
+
+Tables in ALLOWED_SCANS and statements in BULK_READS are read in full on
+purpose and exempt. The SQLite
+mode uses the indexes declared in migrations/ (see sqlite_backend.py), so a
+missing migration index shows up here without a MySQL server; --mysql
+checks the optimizer's real choices on whatever data that database holds.
+Exit status is 1 when any plan fails.
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+import threading
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.dirname(HERE))
+
+import run  # noqa: E402
+import seed  # noqa: E402
+
+# table -> why reading all of it is intended
+ALLOWED_SCANS = {
+    'ngo': 'every NGO is listed on /ngos and in the donate form',
+    'ngo_efficiency': 'one row per NGO, read alongside it',
+    'dashboard_counter': 'one row per dashboard counter',
+}
+
+# Statements that read whole tables by design, matched on the start of their
+# fingerprint (instrumentation.fingerprint)
+BULK_READS = {
+    'SELECT v.Volunteer_id, v.Name, COALESCE(p.Total_hours, ?) FROM volunteer v':
+        'skill index rebuild, every SKILL_INDEX_TTL seconds',
+    'SELECT Volunteer_id, Skill FROM volunteer_skill': 'skill index rebuild',
+    'SELECT Event_id, Volunteer_id FROM event_volunteer': 'skill index rebuild',
+    'SELECT ev.Event_id, e.Event_name, e.Event_date, e.Ngo_id, v.Volunteer_id':
+        'volunteer export: sorts only the filtered NGO\'s rows, or streams event_volunteer in key order',
+}
+
+EXTRA_ROUTES = {
+    'admin_redistribute_preview': ('GET', '/admin/redistribute-funds', None, True),
+    'admin_jobs': ('GET', '/admin/jobs', None, True),
+    'admin_export_volunteers': ('GET', '/admin/export/volunteers.csv?ngo_id=1', None, True),
+    'admin_export_audit': ('GET', '/admin/export/audit.csv?start=2020-01-01', None, True),
+    'admin_donations_filtered': ('GET', '/admin/donations?ngo_id=1&start=2020-01-01', None, True),
+    'admin_donations_by_donor': ('GET', '/admin/donations?donor_id=5', None, True),
+    'admin_donors_search': ('GET', '/admin/donors?q=Donor+12', None, True),
+    'admin_donors_email': ('GET', '/admin/donors?q=donor7@example.com', None, True),
+    'admin_donor_lookup': ('GET', '/admin/donors/lookup?q=Donor+9', None, True),
+    'admin_events_ngo': ('GET', '/admin/events?ngo_id=1', None, True),
+    # The first search is answered from the database while the index loads
+    'admin_search': ('GET', '/admin/search?q=Donor+12', None, True),
+    'admin_search_email': ('GET', '/admin/search/suggest?q=donor7@', None, True),
+    'admin_search_phone': ('GET', '/admin/search/suggest?q=90000001&kind=volunteer', None, True),
+    'admin_analytics_day': ('GET', '/admin/analytics/donations.json?period=day&group_by=ngo', None, True),
+    'admin_budget_audit_since': ('GET', '/admin/budget-audit/since?after_id=100', None, True),
+    'admin_budget_audit_archive': ('GET', '/admin/budget-audit?archived=1', None, True),
+}
+
+_TABLE_REF = re.compile(
+    r'\b(?:FROM|JOIN)\s+(\w+)(?:\s+(?:AS\s+)?(?!(?:ON|WHERE|JOIN|LEFT|RIGHT|INNER|CROSS|GROUP|ORDER|LIMIT|USING)\b)(\w+))?',
+    re.I)
+
+
+def table_aliases(sql):
+    aliases = {}
+    for table, alias in _TABLE_REF.findall(sql):
+        aliases[table] = table
+        if alias:
+            aliases[alias] = table
+    return aliases
+
+
+class CapturingCursor:
+    def __init__(self, cursor, capture):
+        self._cursor = cursor
+        self._capture = capture
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._cursor.close()
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def execute(self, operation, params=None, **kwargs):
+        self._capture.record(operation, params)
+        return self._cursor.execute(operation, params, **kwargs)
+
+
+class Capture:
+    def __init__(self):
+        self.route = None
+        self.statements = {}  # fingerprint -> [sql, params, routes]
+        self._lock = threading.Lock()
+
+    def record(self, operation, params):
+        from instrumentation import fingerprint
+        if self.route is None or not operation.lstrip().upper().startswith('SELECT'):
+            return
+        shape = fingerprint(operation)
+        with self._lock:
+            entry = self.statements.setdefault(shape, [operation, tuple(params or ()), []])
+            if self.route not in entry[2]:
+                entry[2].append(self.route)
+
+
+def explain_sqlite(connection, sql, params):
+    import sqlite_backend
+    rows = connection.execute('EXPLAIN QUERY PLAN ' + sqlite_backend.translate(sql), params).fetchall()
+    aliases = table_aliases(sql)
+    bounded = re.search(r'\bORDER BY\b', sql, re.I) and re.search(r'\bLIMIT\b', sql, re.I)
+    plan, problems = [], []
+    for row in rows:
+        detail = row[-1]
+        plan.append(detail)
+        scan = re.match(r'SCAN (\w+)$', detail)
+        if scan:
+            table = aliases.get(scan.group(1), scan.group(1))
+            if table not in ALLOWED_SCANS and not bounded:
+                problems.append(f"full scan of {table}")
+        elif detail.startswith('USE TEMP B-TREE'):
+            if not set(aliases.values()) <= set(ALLOWED_SCANS):
+                problems.append(detail.lower().replace('use temp b-tree', 'sort'))
+    return plan, problems
+
+
+def explain_mysql(connection, sql, params):
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute('EXPLAIN ' + sql, params)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    aliases = table_aliases(sql)
+    plan, problems = [], []
+    for row in rows:
+        table = aliases.get(row['table'] or '', row['table'])
+        extra = row.get('Extra') or ''
+        plan.append(f"{row['table']}: type={row['type']} key={row['key']} rows={row['rows']} {extra}".strip())
+        if row['type'] == 'ALL' and table not in ALLOWED_SCANS and not (table or '').startswith('<'):
+            problems.append(f"full scan of {table}")
+        if 'Using filesort' in extra and table not in ALLOWED_SCANS:
+            problems.append(f"filesort on {table}")
+    return plan, problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN every SELECT the routes run")
+    parser.add_argument('--mysql', action='store_true', help="check the configured MySQL database instead")
+    parser.add_argument('--db', help="SQLite file to seed (default: a temporary file)")
+    parser.add_argument('--scale', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--routes', help="comma-separated subset of the routes")
+    parser.add_argument('-v', '--verbose', action='store_true', help="print every plan, not only failing ones")
+    for name in seed.SIZES:
+        parser.add_argument(f'--{name}', type=int)
+    args = parser.parse_args()
+
+    routes = {name: route for name, route in {**run.ROUTES, **EXTRA_ROUTES}.items() if route[0] == 'GET'}
+    if args.routes:
+        routes = {name: routes[name] for name in args.routes.split(',')}
+
+    settings = argparse.Namespace(concurrency=1, no_cache=True)
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix='ngo-explain-'), 'bench.db')
+    run.configure_environment(settings, db_path)
+    if args.mysql:
+        from app import app
+        from db_pool import get_pool
+
+        def explain_connection():
+            return get_pool().connection()
+        explain = explain_mysql
+    else:
+        counts = seed.volumes(args.scale, **{name: getattr(args, name) for name in seed.SIZES})
+        seed.seed(db_path, counts, args.seed)
+        print(f"✅ Seeded {db_path}: " + ', '.join(f"{v} {k}" for k, v in counts.items()))
+        app = run.load_app(db_path)
+        import sqlite_backend
+
+        def explain_connection():
+            return sqlite_backend.Connection(db_path)._db
+        explain = explain_sqlite
+
+    import db_pool
+    capture = Capture()
+    db_pool.add_cursor_hook(lambda cursor: CapturingCursor(cursor, capture))
+
+    driver = run.ClientDriver(app)
+    for name, (method, path, form, admin) in routes.items():
+        capture.route = name
+        status = driver.request(method, path, form, admin)
+        if status >= 400:
+            print(f"⚠️  {name}: HTTP {status}")
+    capture.route = None
+
+    failures = 0
+    connection = explain_connection()
+    try:
+        for shape, (sql, params, names) in capture.statements.items():
+            plan, problems = explain(connection, sql, params)
+            if any(shape.startswith(prefix) for prefix in BULK_READS):
+                problems = []
+            if problems:
+                failures += 1
+            if problems or args.verbose:
+                print(f"\n{'❌' if problems else '✅'} {', '.join(names)}: {shape[:160]}")
+                for line in plan:
+                    print(f"     {line}")
+                for problem in problems:
+                    print(f"   → {problem}")
+    finally:
+        connection.close()
+
+    total = len(capture.statements)
+    if failures:
+        print(f"\n❌ {failures} of {total} queries scan or sort")
+        return 1
+    print(f"\n✅ All {total} queries from {len(routes)} routes use indexes")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
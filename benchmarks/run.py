@@ -0,0 +1,393 @@
+"""Latency/throughput benchmark for the public and admin routes.
+
+    python benchmarks/run.py                          # test client, small data set
+    python benchmarks/run.py --mode http -c 16 -n 500 # real sockets, 16 threads
+    python benchmarks/run.py --scale 5 --save client-large
+    python benchmarks/run.py --compare client-small   # exit status 1 on regression
+
+The app runs against a seeded SQLite stand-in for MySQL (sqlite_backend.py,
+seed.py) unless --url points at an already running server, in which case
+nothing is seeded and whatever database that server uses is measured.
+
+--mode client calls the app through Flask's test client from -c threads,
+which isolates Python-side cost (SQL, templates, caching). --mode http
+serves it with Werkzeug's threaded server and drives it over keep-alive
+HTTP connections, adding socket and WSGI overhead.
+
+Each route gets its own phase: a few warm-up requests, then -n measured
+requests spread over the threads. Results are p50/p95/p99 latency in ms
+and requests/second; --save writes them to baselines/<name>.json and
+--compare fails when a route's p95 latency or throughput is worse than the
+baseline by more than --tolerance. Baselines are only comparable on the
+same machine with the same data volumes and options, which are stored
+with them and checked.
+"""
+import argparse
+import http.client
+import itertools
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINES = os.path.join(HERE, 'baselines')
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.dirname(HERE))
+
+import seed  # noqa: E402
+
+_counter = itertools.count()
+
+
+def donation_form():
+    n = next(_counter)
+    return {'name': f'Bench Donor {n}', 'email': f'bench{n}-{os.getpid()}@example.com',
+            'phone': f'7{n:09d}', 'address': 'Benchmark Lane', 'ngo_id': str(n % 50 + 1),
+            'amount': '500', 'payment_method': 'UPI'}
+
+
+# name -> (method, path, form factory, needs admin session)
+ROUTES = {
+    'home': ('GET', '/', None, False),
+    'events': ('GET', '/events', None, False),
+    'ngos': ('GET', '/ngos', None, False),
+    'about': ('GET', '/about', None, False),
+    'donate_form': ('GET', '/donate', None, False),
+    'donate_submit': ('POST', '/donate', donation_form, False),
+    'volunteers_form': ('GET', '/volunteers', None, False),
+    'admin_dashboard': ('GET', '/admin', None, True),
+    'admin_volunteers': ('GET', '/admin/volunteers', None, True),
+    'admin_donation_impact': ('GET', '/admin/donation-impact', None, True),
+    'admin_budget_audit': ('GET', '/admin/budget-audit', None, True),
+    'admin_staffing': ('GET', '/admin/staffing?skills=Teaching&skills=Medical', None, True),
+    'admin_export_csv': ('GET', '/admin/export/donations.csv?ngo_id=1', None, True),
+    'admin_donations': ('GET', '/admin/donations', None, True),
+    'admin_donors': ('GET', '/admin/donors', None, True),
+    'admin_events': ('GET', '/admin/events', None, True),
+    'admin_search_suggest': ('GET', '/admin/search/suggest?q=Donor+12', None, True),
+    'admin_analytics_json': ('GET', '/admin/analytics/donations.json?group_by=method', None, True),
+}
+
+
+def configure_environment(args, db_path):
+    # Must run before anything imports config: Config reads the environment once
+    os.environ.setdefault('JOB_SCHEDULER', 'false')
+    os.environ.setdefault('ASYNC_SUBMISSIONS', 'false')
+    os.environ.setdefault('CACHE_BACKEND', 'memory')
+    os.environ.setdefault('DB_POOL_SIZE', str(max(args.concurrency, 4)))
+    # The seeded counters are fresh; this keeps the MySQL-only recount out of the run
+    os.environ.setdefault('DASHBOARD_STATS_MAX_STALENESS', str(365 * 86400))
+    os.environ.setdefault('SUBMISSION_QUEUE_PATH', db_path + '.queue')
+    os.environ.setdefault('JOB_OUTPUT_DIR', os.path.join(os.path.dirname(db_path), 'exports'))
+    if args.no_cache:
+        for name in ('PAGE_CACHE_TTL', 'NGO_LIST_CACHE_TTL', 'HERO_IMAGE_CACHE_TTL'):
+            os.environ[name] = '0'
+
+
+def load_app(db_path, replicas=0):
+    import sqlite_backend
+    sqlite_backend.install(db_path, pool_size=int(os.environ['DB_POOL_SIZE']))
+    if replicas:
+        sqlite_backend.install_replicas(db_path, replicas, pool_size=int(os.environ['DB_POOL_SIZE']))
+    from app import app
+    return app
+
+
+class ClientDriver:
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def _client(self, admin):
+        clients = getattr(self._local, 'clients', None)
+        if clients is None:
+            clients = self._local.clients = {}
+        if admin not in clients:
+            client = self.app.test_client()
+            if admin:
+                with client.session_transaction() as session:
+                    session['user_id'] = 1
+                    session['username'] = 'admin'
+                    session['is_admin'] = True
+            clients[admin] = client
+        return clients[admin]
+
+    def request(self, method, path, form, admin):
+        response = self._client(admin).open(path, method=method, data=form)
+        response.get_data()  # drain streamed bodies so the whole response is timed
+        status = response.status_code
+        response.close()
+        return status
+
+
+class HttpDriver:
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip('/')
+        self._local = threading.local()
+        self._cookie = None
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        return connection
+
+    def _send(self, method, path, form, headers):
+        body = urlencode(form) if form else None
+        if body:
+            headers = dict(headers, **{'Content-Type': 'application/x-www-form-urlencoded'})
+        for attempt in (1, 2):
+            connection = self._connection()
+            try:
+                connection.request(method, self.prefix + path, body=body, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                if response.will_close:
+                    self._drop()
+                return response
+            except (http.client.HTTPException, OSError):
+                # Server closed an idle keep-alive connection; retry once on a fresh one
+                self._drop()
+                if attempt == 2:
+                    raise
+
+    def _drop(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def login(self):
+        response = self._send('POST', '/admin/login', {'username': 'admin', 'password': 'admin123'}, {})
+        cookie = response.getheader('Set-Cookie')
+        if response.status != 302 or not cookie:
+            raise RuntimeError(f"Admin login failed with HTTP {response.status}")
+        self._cookie = cookie.split(';', 1)[0]
+
+    def request(self, method, path, form, admin):
+        headers = {'Cookie': self._cookie} if admin and self._cookie else {}
+        return self._send(method, path, form, headers).status
+
+
+def start_server(app):
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, name='bench-server', daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    # Nearest-rank: the smallest sample with at least `fraction` of samples at or below it
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run_route(driver, route, requests, concurrency, warmup):
+    method, path, form_factory, admin = route
+    for _ in range(warmup):
+        driver.request(method, path, form_factory() if form_factory else None, admin)
+
+    latencies = []
+    errors = []
+    remaining = itertools.count()
+    lock = threading.Lock()
+
+    def worker():
+        while next(remaining) < requests:
+            form = form_factory() if form_factory else None
+            started = time.perf_counter()
+            try:
+                status = driver.request(method, path, form, admin)
+            except Exception as e:
+                status = repr(e)
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                if not isinstance(status, int) or status >= 400:
+                    errors.append(status)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'count': len(latencies),
+        'errors': len(errors),
+        'first_error': str(errors[0]) if errors else None,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        'rps': round(len(latencies) / wall, 1) if wall else 0.0,
+    }
+
+
+def print_table(results, baseline=None):
+    header = f"{'route':<24}{'n':>6}{'err':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}"
+    if baseline:
+        header += f"{'p95 vs base':>14}{'req/s vs base':>15}"
+    print(header)
+    print('-' * len(header))
+    for name, result in results.items():
+        line = (f"{name:<24}{result['count']:>6}{result['errors']:>5}{result['p50_ms']:>10.2f}"
+                f"{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}{result['rps']:>10.1f}")
+        base = (baseline or {}).get(name)
+        if base:
+            line += f"{_change(result['p95_ms'], base['p95_ms']):>14}{_change(result['rps'], base['rps']):>15}"
+        print(line)
+
+
+def _change(current, base):
+    if not base:
+        return 'n/a'
+    return f"{(current - base) / base * 100:+.1f}%"
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if result['p95_ms'] > base['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']:.2f} -> {result['p95_ms']:.2f} ms")
+        if result['rps'] < base['rps'] / (1 + tolerance):
+            regressions.append(f"{name}: throughput {base['rps']:.1f} -> {result['rps']:.1f} req/s")
+        if result['errors'] > base['errors']:
+            regressions.append(f"{name}: {result['errors']} errors (baseline {base['errors']})")
+    return regressions
+
+
+def baseline_path(name):
+    return name if name.endswith('.json') else os.path.join(BASELINES, f'{name}.json')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the public and admin routes")
+    parser.add_argument('--mode', choices=('client', 'http'), default='client')
+    parser.add_argument('--url', help="benchmark an already running server instead (implies --mode http)")
+    parser.add_argument('--db', help="SQLite file to seed (default: a temporary file)")
+    parser.add_argument('--reuse-db', action='store_true', help="use --db as is instead of reseeding it")
+    parser.add_argument('-n', '--requests', type=int, default=200, help="measured requests per route")
+    parser.add_argument('-c', '--concurrency', type=int, default=4)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--routes', help="comma-separated subset of: " + ', '.join(ROUTES))
+    parser.add_argument('--no-cache', action='store_true', help="disable the page, fragment and hero caches")
+    parser.add_argument('--replicas', type=int, default=0,
+                        help="serve read-only routes from this many read-only copies of the database")
+    parser.add_argument('--scale', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=42)
+    for name in seed.SIZES:
+        parser.add_argument(f'--{name}', type=int)
+    parser.add_argument('--save', metavar='NAME', help="write results to baselines/NAME.json")
+    parser.add_argument('--compare', metavar='NAME', help="compare with baselines/NAME.json")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed p95/throughput slowdown against the baseline (default 0.25)")
+    args = parser.parse_args()
+
+    names = args.routes.split(',') if args.routes else list(ROUTES)
+    unknown = [name for name in names if name not in ROUTES]
+    if unknown:
+        parser.error(f"unknown route(s): {', '.join(unknown)}")
+
+    counts = seed.volumes(args.scale, **{name: getattr(args, name) for name in seed.SIZES})
+    mode = 'http' if args.url else args.mode
+    meta = {
+        'mode': mode,
+        'url': args.url,
+        'counts': None if args.url else counts,
+        'seed': args.seed,
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'cache': not args.no_cache,
+        'replicas': args.replicas,
+        'python': platform.python_version(),
+        'machine': platform.node(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+    server = None
+    if args.url:
+        driver = HttpDriver(args.url)
+    else:
+        db_path = args.db or os.path.join(tempfile.mkdtemp(prefix='ngo-bench-'), 'bench.db')
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        configure_environment(args, db_path)
+        if not (args.reuse_db and os.path.exists(db_path)):
+            elapsed = seed.seed(db_path, counts, args.seed)
+            print(f"✅ Seeded {db_path} in {elapsed:.1f}s: " + ', '.join(f"{v} {k}" for k, v in counts.items()))
+        app = load_app(db_path, args.replicas)
+        if mode == 'http':
+            server, url = start_server(app)
+            driver = HttpDriver(url)
+        else:
+            driver = ClientDriver(app)
+    if isinstance(driver, HttpDriver) and any(ROUTES[name][3] for name in names):
+        driver.login()
+
+    print(f"🚀 {mode} mode, {args.requests} requests per route, concurrency {args.concurrency}")
+    results = {}
+    try:
+        for name in names:
+            results[name] = run_route(driver, ROUTES[name], args.requests, args.concurrency, args.warmup)
+            if results[name]['errors']:
+                print(f"⚠️  {name}: {results[name]['errors']} failed requests, first: {results[name]['first_error']}")
+    finally:
+        if server:
+            server.shutdown()
+
+    baseline = None
+    if args.compare:
+        with open(baseline_path(args.compare)) as f:
+            saved = json.load(f)
+        baseline = saved['routes']
+        differing = [key for key in ('mode', 'counts', 'seed', 'concurrency', 'cache', 'replicas', 'machine')
+                     if saved['meta'].get(key, 0 if key == 'replicas' else None) != meta[key]]
+        if differing:
+            print(f"⚠️  Baseline was recorded with different {', '.join(differing)}; deltas are not like for like")
+
+    print()
+    print_table(results, baseline)
+
+    if args.save:
+        path = baseline_path(args.save)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({'meta': meta, 'routes': results}, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"\n💾 Saved baseline to {path}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for regression in regressions:
+                print(f"   {regression}")
+            return 1
+        print(f"\n✅ No regressions beyond {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
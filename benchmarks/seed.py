@@ -0,0 +1,160 @@
+"""Deterministic bulk data for the benchmark database.
+
+    python benchmarks/seed.py instance/bench.db --scale 2
+    python benchmarks/seed.py instance/bench.db --donations 500000 --events 2000
+
+Volumes default to SIZES multiplied by --scale; any explicit count
+overrides it. The same seed always produces the same rows, so runs against
+two revisions of the app see identical data. Derived tables
+(volunteer_profile, ngo_efficiency, dashboard_counter, donation_rollup) are
+filled the way the migrations' triggers and jobs would leave them.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import sqlite_backend  # noqa: E402
+
+SIZES = {
+    'ngos': 50,
+    'donors': 5000,
+    'donations': 20000,
+    'events': 500,
+    'volunteers': 3000,
+    'beneficiaries': 10000,
+}
+
+SKILLS = ['Teaching', 'Medical', 'Cooking', 'Driving', 'Fundraising', 'Counseling',
+          'Construction', 'Photography', 'Translation', 'IT Support', 'First Aid', 'Event Planning']
+PAYMENT_METHODS = ['Credit Card', 'Debit Card', 'UPI', 'Net Banking', 'Cash']
+CITIES = ['Bengaluru', 'Mysuru', 'Chennai', 'Hyderabad', 'Pune', 'Mumbai', 'Delhi', 'Kochi']
+
+
+def volumes(scale=1.0, **overrides):
+    counts = {name: max(1, int(size * scale)) for name, size in SIZES.items()}
+    counts.update((name, value) for name, value in overrides.items() if value is not None)
+    return counts
+
+
+def seed(path, counts, seed=42):
+    rng = random.Random(seed)
+    today = date.today()
+    started = time.perf_counter()
+
+    for stale in (path, path + '-wal', path + '-shm'):
+        if os.path.exists(stale):
+            os.remove(stale)
+    sqlite_backend.create_schema(path)
+    db = sqlite3.connect(path)
+    try:
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=OFF")
+
+        db.executemany("INSERT INTO ngo (Ngo_id, Ngo_name, Address, Phone, Email, Description) VALUES (?, ?, ?, ?, ?, ?)",
+                       ((i, f"NGO {i}", f"{i} Main Road, {rng.choice(CITIES)}", f"080{i:07d}",
+                         f"contact{i}@ngo{i}.org", f"Community programme run by NGO {i}")
+                        for i in range(1, counts['ngos'] + 1)))
+        ngo_ids = range(1, counts['ngos'] + 1)
+
+        db.executemany("INSERT INTO donor (Donor_id, Name, Address) VALUES (?, ?, ?)",
+                       ((i, f"Donor {i}", f"{i} Park Street, {rng.choice(CITIES)}")
+                        for i in range(1, counts['donors'] + 1)))
+        db.executemany("INSERT INTO donor_email (Donor_id, Email) VALUES (?, ?)",
+                       ((i, f"donor{i}@example.com") for i in range(1, counts['donors'] + 1)))
+        db.executemany("INSERT INTO donor_phone (Donor_id, Phone) VALUES (?, ?)",
+                       ((i, f"9{i:09d}") for i in range(1, counts['donors'] + 1)))
+
+        db.executemany("INSERT INTO donation (Donor_id, Ngo_id, Amount, Donation_date, Payment_method) "
+                       "VALUES (?, ?, ?, ?, ?)",
+                       ((rng.randint(1, counts['donors']), rng.choice(ngo_ids),
+                         round(rng.lognormvariate(7, 1), 2),
+                         (today - timedelta(days=rng.randint(0, 730))).isoformat(),
+                         rng.choice(PAYMENT_METHODS))
+                        for _ in range(counts['donations'])))
+
+        # A third of the events lie ahead, which is what /events and the dashboard list
+        db.executemany("INSERT INTO event (Event_id, Ngo_id, Event_name, Description, Venue, Event_date, Budget) "
+                       "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                       ((i, rng.choice(ngo_ids), f"Event {i}", f"Outreach event {i}",
+                         f"{rng.choice(CITIES)} Community Hall",
+                         (today + timedelta(days=rng.randint(-480, 240))).isoformat(),
+                         rng.randint(10, 500) * 1000)
+                        for i in range(1, counts['events'] + 1)))
+
+        db.executemany("INSERT INTO beneficiary (Ngo_id, Name) VALUES (?, ?)",
+                       ((rng.choice(ngo_ids), f"Beneficiary {i}") for i in range(1, counts['beneficiaries'] + 1)))
+
+        db.executemany("INSERT INTO volunteer (Volunteer_id, Name) VALUES (?, ?)",
+                       ((i, f"Volunteer {i}") for i in range(1, counts['volunteers'] + 1)))
+        db.executemany("INSERT INTO volunteer_email (Volunteer_id, Email) VALUES (?, ?)",
+                       ((i, f"volunteer{i}@example.com") for i in range(1, counts['volunteers'] + 1)))
+        db.executemany("INSERT INTO volunteer_phone (Volunteer_id, Phone) VALUES (?, ?)",
+                       ((i, f"8{i:09d}") for i in range(1, counts['volunteers'] + 1)))
+        db.executemany("INSERT INTO volunteer_skill (Volunteer_id, Skill) VALUES (?, ?)",
+                       ((i, skill) for i in range(1, counts['volunteers'] + 1)
+                        for skill in rng.sample(SKILLS, rng.randint(1, 4))))
+
+        # Per-row triggers are far too slow for bulk loads; fill the read
+        # model in one statement afterwards
+        db.execute("DROP TRIGGER IF EXISTS volunteer_profile_hours_insert")
+        db.executemany("INSERT INTO event_volunteer (Event_id, Volunteer_id, Hours_contributed) VALUES (?, ?, ?)",
+                       ((event_id, i, rng.randint(1, 8))
+                        for i in range(1, counts['volunteers'] + 1)
+                        for event_id in rng.sample(range(1, counts['events'] + 1),
+                                                   min(counts['events'], rng.randint(0, 6)))))
+        db.execute("""
+            INSERT OR REPLACE INTO volunteer_profile (Volunteer_id, Events_count, Total_hours)
+            SELECT v.Volunteer_id, COUNT(DISTINCT ev.Event_id), COALESCE(SUM(ev.Hours_contributed), 0)
+            FROM volunteer v LEFT JOIN event_volunteer ev ON ev.Volunteer_id = v.Volunteer_id
+            GROUP BY v.Volunteer_id
+        """)
+
+        db.executemany("INSERT INTO budget_audit (Event_id, Event_name, Old_Budget, New_Budget, Budget_Change, "
+                       "Updated_By, Change_Timestamp) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                       ((event_id, f"Event {event_id}", old, old + change, change, 'admin',
+                         f"{today - timedelta(days=rng.randint(0, 365))} {rng.randint(0, 23):02d}:00:00")
+                        for event_id, old, change in
+                        ((rng.randint(1, counts['events']), rng.randint(10, 500) * 1000,
+                          rng.randint(-50, 50) * 1000) for _ in range(counts['events'] * 2))))
+
+        for period, bucket in (('day', 'Donation_date'), ('month', "strftime('%Y-%m-01', Donation_date)")):
+            db.execute(f"""
+                INSERT INTO donation_rollup (Period, Bucket, Ngo_id, Payment_method, Donation_count, Amount_total)
+                SELECT '{period}', {bucket}, Ngo_id, COALESCE(Payment_method, ''), COUNT(*), SUM(Amount)
+                FROM donation GROUP BY 2, 3, 4
+            """)
+        db.execute("UPDATE donation_rollup_state SET Last_id = ?, Seen_id = ?", (counts['donations'],) * 2)
+
+        db.execute("INSERT INTO ngo_efficiency (Ngo_id, Efficiency_Score, Is_stale, Computed_at) "
+                   "SELECT Ngo_id, CASE Ngo_id % 3 WHEN 0 THEN 'High Impact' WHEN 1 THEN 'Growing Impact' "
+                   "ELSE 'Needs Support' END, 0, datetime('now') FROM ngo")
+        db.executemany("INSERT INTO dashboard_counter (Counter_name, Counter_value, Refreshed_at) "
+                       "VALUES (?, ?, datetime('now'))",
+                       ((name, counts[key]) for name, key in
+                        (('donor', 'donors'), ('donation', 'donations'), ('event', 'events'),
+                         ('beneficiary', 'beneficiaries'), ('volunteer', 'volunteers'))))
+        db.commit()
+    finally:
+        db.close()
+    sqlite_backend.create_schema(path)  # puts the dropped trigger back
+    return time.perf_counter() - started
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Seed the SQLite benchmark database")
+    parser.add_argument('path')
+    parser.add_argument('--scale', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=42)
+    for name in SIZES:
+        parser.add_argument(f'--{name}', type=int)
+    args = parser.parse_args()
+
+    counts = volumes(args.scale, **{name: getattr(args, name) for name in SIZES})
+    elapsed = seed(args.path, counts, args.seed)
+    print(f"✅ Seeded {args.path} in {elapsed:.1f}s: " + ', '.join(f"{v} {k}" for k, v in counts.items()))
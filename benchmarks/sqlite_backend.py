@@ -0,0 +1,398 @@
+"""SQLite stand-in for the MySQL schema, used by the benchmark suite.
+
+Implements just enough of the mysql.connector connection/cursor API for the
+app's queries: %s placeholders, dictionary cursors, CURDATE()/NOW(),
+INSERT IGNORE, TIMESTAMPDIFF(SECOND, ..., NOW()), NOW() +/- INTERVAL n
+SECOND, GET_LOCK/RELEASE_LOCK, MD5 and CalculateNgoEfficiency as SQL
+functions, and CALL RecordDonation(...) in Python. install() swaps the
+app's primary connection pool over to it.
+
+Timings measured against SQLite are for comparing one revision of the app
+with another, not for predicting MySQL latency.
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+import threading
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+sqlite3.register_adapter(Decimal, str)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ngo (Ngo_id INTEGER PRIMARY KEY AUTOINCREMENT, Ngo_name TEXT, Address TEXT,
+    Phone TEXT, Email TEXT, Description TEXT, Image_digest TEXT);
+CREATE TABLE IF NOT EXISTS donor (Donor_id INTEGER PRIMARY KEY AUTOINCREMENT, Name TEXT, Address TEXT);
+CREATE TABLE IF NOT EXISTS donor_phone (Donor_id INT, Phone TEXT, PRIMARY KEY (Donor_id, Phone));
+CREATE TABLE IF NOT EXISTS donor_email (Donor_id INT, Email TEXT, PRIMARY KEY (Donor_id, Email));
+CREATE TABLE IF NOT EXISTS donation (Donation_id INTEGER PRIMARY KEY AUTOINCREMENT, Donor_id INT, Ngo_id INT,
+    Amount REAL, Donation_date TEXT, Payment_method TEXT);
+CREATE TABLE IF NOT EXISTS event (Event_id INTEGER PRIMARY KEY AUTOINCREMENT, Ngo_id INT, Event_name TEXT,
+    Description TEXT, Venue TEXT, Event_date TEXT, Budget REAL);
+CREATE TABLE IF NOT EXISTS beneficiary (Beneficiary_id INTEGER PRIMARY KEY AUTOINCREMENT, Ngo_id INT, Name TEXT);
+CREATE TABLE IF NOT EXISTS volunteer (Volunteer_id INTEGER PRIMARY KEY AUTOINCREMENT, Name TEXT);
+CREATE TABLE IF NOT EXISTS volunteer_email (Volunteer_id INT, Email TEXT);
+CREATE TABLE IF NOT EXISTS volunteer_phone (Volunteer_id INT, Phone TEXT);
+CREATE TABLE IF NOT EXISTS volunteer_skill (Volunteer_id INT, Skill TEXT);
+CREATE TABLE IF NOT EXISTS event_volunteer (Event_id INT, Volunteer_id INT, Hours_contributed REAL,
+    PRIMARY KEY (Event_id, Volunteer_id));
+CREATE TABLE IF NOT EXISTS fund_redistribution (Redistribution_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    Source_Ngo_id INT, Target_Ngo_id INT, Amount REAL, Redistribution_date TEXT, Run_id INT);
+CREATE TABLE IF NOT EXISTS budget_audit (Audit_id INTEGER PRIMARY KEY AUTOINCREMENT, Event_id INT,
+    Event_name TEXT, Old_Budget REAL, New_Budget REAL, Budget_Change REAL, Updated_By TEXT, Change_Timestamp TEXT);
+CREATE TABLE IF NOT EXISTS budget_audit_archive (Audit_id INTEGER PRIMARY KEY, Event_id INT,
+    Event_name TEXT, Old_Budget REAL, New_Budget REAL, Budget_Change REAL, Updated_By TEXT, Change_Timestamp TEXT);
+CREATE TABLE IF NOT EXISTS website_settings (id INTEGER PRIMARY KEY, hero_image BLOB);
+CREATE TABLE IF NOT EXISTS site_asset (Name TEXT PRIMARY KEY, Digest TEXT, Updated_at TEXT);
+
+CREATE TABLE IF NOT EXISTS dashboard_counter (Counter_name TEXT PRIMARY KEY, Counter_value INT,
+    Refreshed_at TEXT DEFAULT CURRENT_TIMESTAMP);
+CREATE TABLE IF NOT EXISTS ngo_efficiency (Ngo_id INTEGER PRIMARY KEY, Efficiency_Score TEXT,
+    Is_stale INT DEFAULT 1, Computed_at TEXT);
+CREATE TABLE IF NOT EXISTS submission_receipt (Idempotency_key TEXT PRIMARY KEY, Kind TEXT, Record_id INT,
+    Created_at TEXT DEFAULT CURRENT_TIMESTAMP);
+CREATE TABLE IF NOT EXISTS volunteer_profile (Volunteer_id INTEGER PRIMARY KEY, Events_count INT DEFAULT 0,
+    Total_hours REAL DEFAULT 0);
+CREATE TABLE IF NOT EXISTS redistribution_run (Run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    Started_at TEXT DEFAULT CURRENT_TIMESTAMP, Ngo_count INT, Transfer_count INT, Total_amount REAL,
+    Target_balance REAL, Planning_ms REAL, Apply_ms REAL);
+CREATE TABLE IF NOT EXISTS background_job (Job_id INTEGER PRIMARY KEY AUTOINCREMENT, Kind TEXT,
+    Status TEXT DEFAULT 'queued', Params TEXT, Progress INT DEFAULT 0, Message TEXT, Result TEXT, Error TEXT,
+    Cancel_requested INT DEFAULT 0, Created_by TEXT, Worker TEXT, Created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    Started_at TEXT, Finished_at TEXT, Updated_at TEXT DEFAULT CURRENT_TIMESTAMP);
+CREATE TABLE IF NOT EXISTS job_schedule (Name TEXT PRIMARY KEY, Last_run_at TEXT,
+    Next_run_at TEXT DEFAULT CURRENT_TIMESTAMP);
+CREATE TABLE IF NOT EXISTS donation_rollup (Period TEXT, Bucket TEXT, Ngo_id INT, Payment_method TEXT,
+    Donation_count INT DEFAULT 0, Amount_total REAL DEFAULT 0, PRIMARY KEY (Period, Bucket, Ngo_id, Payment_method));
+CREATE TABLE IF NOT EXISTS donation_rollup_state (Id INTEGER PRIMARY KEY, Last_id INT DEFAULT 0,
+    Seen_id INT DEFAULT 0, Updated_at TEXT);
+INSERT OR IGNORE INTO donation_rollup_state (Id) VALUES (1);
+
+CREATE TRIGGER IF NOT EXISTS volunteer_profile_volunteer_insert AFTER INSERT ON volunteer BEGIN
+    INSERT OR IGNORE INTO volunteer_profile (Volunteer_id) VALUES (NEW.Volunteer_id);
+END;
+CREATE TRIGGER IF NOT EXISTS volunteer_profile_hours_insert AFTER INSERT ON event_volunteer BEGIN
+    INSERT OR REPLACE INTO volunteer_profile (Volunteer_id, Events_count, Total_hours)
+    SELECT NEW.Volunteer_id, COUNT(DISTINCT Event_id), COALESCE(SUM(Hours_contributed), 0)
+    FROM event_volunteer WHERE Volunteer_id = NEW.Volunteer_id;
+END;
+CREATE TRIGGER IF NOT EXISTS ngo_efficiency_donation_insert AFTER INSERT ON donation BEGIN
+    UPDATE ngo_efficiency SET Is_stale = 1 WHERE Ngo_id = NEW.Ngo_id;
+END;
+"""
+
+RULES = [
+    (re.compile(r'TIMESTAMPDIFF\(SECOND,\s*([\w.]+),\s*NOW\(\)\)', re.I),
+     r"CAST((julianday('now') - julianday(\1)) * 86400 AS INTEGER)"),
+    (re.compile(r'NOW\(\)\s*([+-])\s*INTERVAL\s+%s\s+SECOND', re.I), r"datetime('now', '\1' || ? || ' seconds')"),
+    (re.compile(r'MATCH\((\w+)\)\s*AGAINST\s*\(%s IN BOOLEAN MODE\)', re.I), r'FULLTEXT_MATCH(\1, %s)'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'CURDATE\(\)', re.I), "date('now')"),
+    (re.compile(r'NOW\(\)', re.I), "datetime('now')"),
+    (re.compile(r'INSERT IGNORE', re.I), 'INSERT OR IGNORE'),
+    # An upsert from a subquery needs a WHERE for SQLite to parse its ON CONFLICT
+    (re.compile(r'(\)\s*AS\s+\w+)\s*ON DUPLICATE KEY UPDATE', re.I), r'\1 WHERE true ON DUPLICATE KEY UPDATE'),
+    (re.compile(r'ON DUPLICATE KEY UPDATE', re.I), 'ON CONFLICT DO UPDATE SET'),
+    (re.compile(r'\bVALUES\((\w+)\)', re.I), r'excluded.\1'),
+]
+CALL = re.compile(r'\s*CALL\s+(\w+)', re.I)
+
+_translated = {}
+
+
+def translate(sql):
+    result = _translated.get(sql)
+    if result is None:
+        result = sql
+        for pattern, replacement in RULES:
+            result = pattern.sub(replacement, result)
+        _translated[sql] = result
+    return result
+
+
+def _md5(value):
+    if value is None:
+        return None
+    return hashlib.md5(value if isinstance(value, bytes) else str(value).encode()).hexdigest()
+
+
+def _fulltext_match(text, query):
+    # MATCH ... AGAINST in boolean mode for '+word*' terms: every term must
+    # prefix a word of the text. SQLite has no FULLTEXT index, so it scans.
+    words = re.findall(r'[^\W_]+', (text or '').lower())
+    terms = [term.strip('+*').lower() for term in query.split()]
+    return all(any(word.startswith(term) for word in words) for term in terms)
+
+
+def _efficiency(ngo_id):
+    return ('High Impact', 'Growing Impact', 'Needs Support')[ngo_id % 3]
+
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _get_lock(name, timeout):
+    with _locks_guard:
+        lock = _locks.setdefault(name, threading.Lock())
+    return 1 if lock.acquire(blocking=False) else 0
+
+
+def _release_lock(name):
+    lock = _locks.get(name)
+    if lock is not None and lock.locked():
+        lock.release()
+        return 1
+    return 0
+
+
+class _Result:
+    def __init__(self, row, columns):
+        self.with_rows = row is not None
+        self._row = row
+        self._columns = columns
+
+    def fetchone(self):
+        return dict(zip(self._columns, self._row)) if self._row else None
+
+
+def record_donation(cursor, name, email, phone, address, ngo_id, amount, payment_method, request_key=None):
+    # Python version of the RecordDonation procedure (migrations 0004/0005/0015)
+    c = cursor._cursor
+    if request_key is not None:
+        c.execute("INSERT INTO submission_receipt (Idempotency_key, Kind) VALUES (?, 'donation')", (request_key,))
+    donor_id = None
+    if email:
+        row = c.execute("SELECT Donor_id FROM donor_email WHERE Email = ?", (email,)).fetchone()
+        donor_id = row and row[0]
+    if donor_id is None and not email and phone:
+        row = c.execute("SELECT dp.Donor_id FROM donor_phone dp JOIN donor d ON d.Donor_id = dp.Donor_id "
+                        "WHERE dp.Phone = ? AND d.Name = ? ORDER BY dp.Donor_id LIMIT 1",
+                        (phone, name)).fetchone()
+        donor_id = row and row[0]
+    new_donor = 0
+    if donor_id is None:
+        c.execute("INSERT INTO donor (Name, Address) VALUES (?, ?)", (name, address))
+        donor_id, new_donor = c.lastrowid, 1
+    elif address:
+        c.execute("UPDATE donor SET Address = ? WHERE Donor_id = ?", (address, donor_id))
+    if email:
+        c.execute("INSERT OR IGNORE INTO donor_email VALUES (?, ?)", (donor_id, email))
+    if phone:
+        c.execute("INSERT OR IGNORE INTO donor_phone VALUES (?, ?)", (donor_id, phone))
+    c.execute("INSERT INTO donation (Donor_id, Ngo_id, Amount, Donation_date, Payment_method) "
+              "VALUES (?, ?, ?, date('now'), ?)", (donor_id, ngo_id, amount, payment_method))
+    donation_id = c.lastrowid
+    c.execute("UPDATE dashboard_counter SET Counter_value = Counter_value + 1 "
+              "WHERE Counter_name = 'donation' OR (? = 1 AND Counter_name = 'donor')", (new_donor,))
+    cursor._connection.commit()
+    return [_Result((donor_id, donation_id, new_donor), ('Donor_id', 'Donation_id', 'New_donor'))]
+
+
+PROCEDURES = {'RecordDonation': record_donation}
+
+
+class Cursor:
+    def __init__(self, connection, dictionary=False):
+        self._connection = connection
+        self._cursor = connection._db.cursor()
+        self._dictionary = dictionary
+        self._first_id = None
+
+    def execute(self, operation, params=None, multi=False):
+        self._first_id = None
+        call = CALL.match(operation)
+        if call:
+            results = PROCEDURES[call.group(1)](self, *(params or ()))
+            return iter(results) if multi else None
+        self._cursor.execute(translate(operation), tuple(params or ()))
+
+    def executemany(self, operation, seq_params):
+        self._first_id = None
+        sql = translate(operation)
+        for params in seq_params:
+            self._cursor.execute(sql, tuple(params))
+            if self._first_id is None:
+                self._first_id = self._cursor.lastrowid
+
+    def callproc(self, name, args=()):
+        return PROCEDURES[name](self, *args)
+
+    def _row(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return {column[0]: value for column, value in zip(self._cursor.description, row)}
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchmany(self, size=1):
+        return [self._row(row) for row in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    def __iter__(self):
+        for row in self._cursor:
+            yield self._row(row)
+
+    @property
+    def lastrowid(self):
+        return self._first_id if self._first_id is not None else self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def column_names(self):
+        return tuple(column[0] for column in self._cursor.description or ())
+
+    def close(self):
+        self._cursor.close()
+
+
+class Connection:
+    def __init__(self, path, read_only=False):
+        if read_only:
+            self._db = sqlite3.connect(f'file:{path}?mode=ro', uri=True, check_same_thread=False, timeout=30)
+        else:
+            self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.create_function('MD5', 1, _md5, deterministic=True)
+        self._db.create_function('FULLTEXT_MATCH', 2, _fulltext_match, deterministic=True)
+        self._db.create_function('CalculateNgoEfficiency', 1, _efficiency, deterministic=True)
+        self._db.create_function('GET_LOCK', 2, _get_lock)
+        self._db.create_function('RELEASE_LOCK', 1, _release_lock)
+
+    @property
+    def in_transaction(self):
+        return self._db.in_transaction
+
+    def cursor(self, dictionary=False, buffered=None, **kwargs):
+        return Cursor(self, dictionary)
+
+    def commit(self):
+        self._db.commit()
+
+    def rollback(self):
+        self._db.rollback()
+
+    def ping(self, reconnect=False, attempts=1, delay=0):
+        self._db.execute("SELECT 1")
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        self._db.close()
+
+
+_COLUMNS = r'((?:[^()]|\(\d+\))*)'  # column list, allowing prefix lengths such as Name(20)
+_CREATE_TABLE = re.compile(r'^CREATE TABLE (?:IF NOT EXISTS )?(\w+)\s*\((.*)\)\s*$', re.I | re.S)
+_INLINE_INDEX = re.compile(r'^\s*(UNIQUE\s+)?(?:INDEX|KEY)\s+(\w+)\s*\(' + _COLUMNS + r'\)', re.I | re.M)
+_PRIMARY_KEY = re.compile(r'^\s*(?:PRIMARY KEY\s*\((\w+)|(\w+)\s[^,\n]*PRIMARY KEY)', re.I | re.M)
+_FOREIGN_KEY = re.compile(r'FOREIGN KEY\s*\((\w+)\)', re.I)
+_CREATE_INDEX = re.compile(r'^CREATE (UNIQUE )?INDEX (\w+) ON (\w+)\s*\(' + _COLUMNS + r'\)', re.I)
+_ADD_INDEX = re.compile(r'^ALTER TABLE (\w+) ADD (UNIQUE )?(?:INDEX|KEY) (\w+)\s*\(' + _COLUMNS + r'\)', re.I)
+_DROP_INDEX = re.compile(r'^(?:DROP INDEX (\w+) ON \w+|ALTER TABLE \w+ DROP (?:INDEX|KEY) (\w+))', re.I)
+
+
+def _columns(text):
+    return [re.sub(r'\(\d+\)', '', column).strip() for column in text.split(',')]
+
+
+def migration_indexes():
+    # name -> (table, columns, unique) as the migrations leave a MySQL database.
+    # Imported here because migrate pulls in config, which must not be read
+    # before run.py has set up the environment.
+    import migrate
+
+    indexes = {}
+    primary = {}
+    foreign = []
+    for _, path in migrate.discover():
+        with open(path, encoding='utf-8') as f:
+            statements = migrate.split_statements(f.read())
+        for statement in statements:
+            table = _CREATE_TABLE.match(statement)
+            if table:
+                name, body = table.groups()
+                for unique, index, columns in _INLINE_INDEX.findall(body):
+                    indexes[index] = (name, _columns(columns), bool(unique))
+                key = _PRIMARY_KEY.search(body)
+                if key:
+                    primary[name] = key.group(1) or key.group(2)
+                foreign.extend((name, column) for column in _FOREIGN_KEY.findall(body))
+                continue
+            match = _CREATE_INDEX.match(statement)
+            if match:
+                unique, index, name, columns = match.groups()
+                indexes[index] = (name, _columns(columns), bool(unique))
+                continue
+            match = _ADD_INDEX.match(statement)
+            if match:
+                name, unique, index, columns = match.groups()
+                indexes[index] = (name, _columns(columns), bool(unique))
+                continue
+            match = _DROP_INDEX.match(statement)
+            if match:
+                indexes.pop(match.group(1) or match.group(2), None)
+
+    # InnoDB only keeps its own foreign key index while no other index starts
+    # with the column
+    for name, column in foreign:
+        if primary.get(name) == column:
+            continue
+        if any(table == name and columns[0] == column for table, columns, _ in indexes.values()):
+            continue
+        indexes.setdefault(f'fk_{name}_{column}', (name, [column], False))
+    return indexes
+
+
+def create_schema(path):
+    db = sqlite3.connect(path)
+    try:
+        db.executescript(SCHEMA)
+        for index, (table, columns, unique) in migration_indexes().items():
+            db.execute(f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {index} "
+                       f"ON {table} ({', '.join(columns)})")
+        db.commit()
+    finally:
+        db.close()
+
+
+def install(path, pool_size=8):
+    import db_pool
+    db_pool._pools['primary'] = db_pool.ConnectionPool(
+        lambda: Connection(path), size=pool_size, name='primary')
+
+
+def install_replicas(path, count, pool_size=8):
+    # Read-only snapshots of the primary file standing in for MySQL replicas.
+    # Nothing is copied over afterwards, so writes never reach them; that is
+    # maximal replica lag, which makes read-your-writes routing easy to see.
+    import db_pool
+    source = sqlite3.connect(path)
+    try:
+        for index in range(1, count + 1):
+            replica_path = f'{path}.replica{index}'
+            target = sqlite3.connect(replica_path)
+            try:
+                source.backup(target)
+                target.execute("PRAGMA journal_mode=WAL")
+            finally:
+                target.close()
+            db_pool.add_replica(db_pool.ConnectionPool(
+                lambda replica_path=replica_path: Connection(replica_path, read_only=True),
+                size=pool_size, name=f'replica{index}'))
+    finally:
+        source.close()
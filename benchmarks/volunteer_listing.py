@@ -0,0 +1,147 @@
+"""Volunteer roster: four-way LEFT JOIN vs. the volunteer_profile read model.
+
+Runs against an in-memory SQLite database so it needs no MySQL server:
+
+    python benchmarks/volunteer_listing.py [--volunteers 2000] [--pages 5]
+
+For each events-per-volunteer setting it times the original query (every
+volunteer, fan-out then GROUP_CONCAT(DISTINCT)) and the paginated read
+model (volunteers.load_profiles + attach_contacts), and checks the hour
+totals of both against a direct SUM.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import volunteers  # noqa: E402
+
+SCHEMA = """
+CREATE TABLE volunteer (Volunteer_id INTEGER PRIMARY KEY, Name TEXT);
+CREATE TABLE volunteer_skill (Volunteer_id INT, Skill TEXT);
+CREATE TABLE volunteer_email (Volunteer_id INT, Email TEXT);
+CREATE TABLE volunteer_phone (Volunteer_id INT, Phone TEXT);
+CREATE TABLE event_volunteer (Event_id INT, Volunteer_id INT, Hours_contributed REAL);
+CREATE INDEX idx_event_volunteer_hours ON event_volunteer (Volunteer_id, Hours_contributed, Event_id);
+CREATE INDEX idx_volunteer_skill_volunteer ON volunteer_skill (Volunteer_id);
+CREATE INDEX idx_volunteer_email_volunteer ON volunteer_email (Volunteer_id);
+CREATE INDEX idx_volunteer_phone_volunteer ON volunteer_phone (Volunteer_id);
+CREATE TABLE volunteer_profile (
+    Volunteer_id INTEGER PRIMARY KEY,
+    Events_count INT NOT NULL DEFAULT 0,
+    Total_hours REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX idx_volunteer_profile_hours ON volunteer_profile (Total_hours, Volunteer_id);
+"""
+
+FAN_OUT = """
+    SELECT
+        v.Volunteer_id,
+        v.Name,
+        GROUP_CONCAT(DISTINCT vs.Skill) as skills,
+        GROUP_CONCAT(DISTINCT ve.Email) as emails,
+        GROUP_CONCAT(DISTINCT vp.Phone) as phones,
+        COUNT(DISTINCT ev.Event_id) as events_count,
+        SUM(ev.Hours_contributed) as total_hours
+    FROM volunteer v
+    LEFT JOIN volunteer_skill vs ON v.Volunteer_id = vs.Volunteer_id
+    LEFT JOIN volunteer_email ve ON v.Volunteer_id = ve.Volunteer_id
+    LEFT JOIN volunteer_phone vp ON v.Volunteer_id = vp.Volunteer_id
+    LEFT JOIN event_volunteer ev ON v.Volunteer_id = ev.Volunteer_id
+    GROUP BY v.Volunteer_id, v.Name
+    ORDER BY total_hours DESC
+"""
+
+
+class DictCursor:
+    # Just enough of a mysql.connector dictionary cursor for volunteers.py
+    def __init__(self, db):
+        self._cursor = db.cursor()
+
+    def execute(self, sql, params=()):
+        self._cursor.execute(sql.replace('%s', '?'), params)
+
+    def fetchall(self):
+        columns = [c[0] for c in self._cursor.description]
+        return [dict(zip(columns, row)) for row in self._cursor.fetchall()]
+
+
+def build(count, events, skills=3, contacts=2, seed=1):
+    rng = random.Random(seed)
+    db = sqlite3.connect(':memory:')
+    db.executescript(SCHEMA)
+    ids = range(1, count + 1)
+    db.executemany("INSERT INTO volunteer VALUES (?, ?)", [(i, f'Volunteer {i}') for i in ids])
+    db.executemany("INSERT INTO volunteer_skill VALUES (?, ?)",
+                   [(i, f'skill-{s}') for i in ids for s in range(skills)])
+    db.executemany("INSERT INTO volunteer_email VALUES (?, ?)",
+                   [(i, f'v{i}.{c}@example.org') for i in ids for c in range(contacts)])
+    db.executemany("INSERT INTO volunteer_phone VALUES (?, ?)",
+                   [(i, f'555-{i:05d}-{c}') for i in ids for c in range(contacts)])
+    db.executemany("INSERT INTO event_volunteer VALUES (?, ?, ?)",
+                   [(e, i, rng.randint(1, 8)) for i in ids for e in range(events)])
+    db.execute("""
+        INSERT INTO volunteer_profile (Volunteer_id, Events_count, Total_hours)
+        SELECT v.Volunteer_id, COUNT(DISTINCT ev.Event_id), COALESCE(SUM(ev.Hours_contributed), 0)
+        FROM volunteer v
+        LEFT JOIN event_volunteer ev ON ev.Volunteer_id = v.Volunteer_id
+        GROUP BY v.Volunteer_id
+    """)
+    db.commit()
+    return db
+
+
+def timed(fn, repeat=3):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def read_model_pages(db, pages, per_page):
+    cursor = DictCursor(db)
+    rows, after = [], None
+    for _ in range(pages):
+        page = volunteers.load_profiles(cursor, per_page, after)
+        page, more = page[:per_page], len(page) > per_page
+        volunteers.attach_contacts(cursor, page)
+        rows.extend(page)
+        if not more:
+            break
+        after = (page[-1]['total_hours'], page[-1]['Volunteer_id'])
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--volunteers', type=int, default=2000)
+    parser.add_argument('--pages', type=int, default=5)
+    parser.add_argument('--per-page', type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{args.volunteers} volunteers, 3 skills, 2 emails, 2 phones each; "
+          f"read model walks {args.pages} pages of {args.per_page}")
+    print(f"{'events/vol':>10} {'fan-out ms':>11} {'read model ms':>14} {'hours inflated':>15}")
+    for events in (5, 10, 20, 40):
+        db = build(args.volunteers, events)
+        expected = dict(db.execute(
+            "SELECT Volunteer_id, SUM(Hours_contributed) FROM event_volunteer GROUP BY Volunteer_id"))
+
+        fan_out_time, fan_out_rows = timed(lambda: db.execute(FAN_OUT).fetchall())
+        read_time, read_rows = timed(lambda: read_model_pages(db, args.pages, args.per_page))
+
+        inflation = fan_out_rows[0][6] / expected[fan_out_rows[0][0]]
+        assert all(row['total_hours'] == expected[row['Volunteer_id']] for row in read_rows)
+        print(f"{events:>10} {fan_out_time * 1000:>11.1f} {read_time * 1000:>14.1f} {inflation:>14.0f}x")
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
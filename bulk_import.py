@@ -0,0 +1,224 @@
+import csv
+import sys
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+import mysql.connector
+
+import dashboard_stats
+import donors
+from database_connector import DatabaseConnector
+
+REQUIRED_COLUMNS = ('name', 'ngo_id', 'amount', 'payment_method')
+PAYMENT_METHODS = ('Online', 'Bank_Transfer', 'UPI', 'Cash', 'Check')
+MIN_AMOUNT = Decimal('10')
+MAX_AMOUNT = Decimal('1000000')
+
+
+class ImportReport:
+    def __init__(self):
+        self.rows_read = 0
+        self.donors_created = 0
+        self.donations_created = 0
+        self.errors = []
+
+    def add_error(self, line, message):
+        self.errors.append((line, message))
+
+
+class DonorIndex:
+    # Loaded once per import; donors are matched on email first and fall
+    # back to the exact name only for rows that carry no email.
+    def __init__(self, cursor):
+        self.by_email = {}
+        self.by_name = {}
+        cursor.execute("""
+            SELECT d.Donor_id, d.Name, e.Email
+            FROM donor d
+            LEFT JOIN donor_email e ON e.Donor_id = d.Donor_id
+        """)
+        for donor_id, name, email in cursor:
+            if email:
+                self.by_email.setdefault(email.strip().lower(), donor_id)
+            self.by_name.setdefault(name.strip().lower(), donor_id)
+
+    @staticmethod
+    def key(row):
+        return ('email', row['email']) if row['email'] else ('name', row['name'].lower())
+
+    def lookup(self, key):
+        kind, value = key
+        return (self.by_email if kind == 'email' else self.by_name).get(value)
+
+    def add(self, key, name, donor_id):
+        kind, value = key
+        if kind == 'email':
+            self.by_email[value] = donor_id
+        self.by_name.setdefault(name.lower(), donor_id)
+
+
+def parse_row(raw, ngo_ids):
+    row = {k.strip().lower(): (v or '').strip() for k, v in raw.items() if k}
+    missing = [c for c in REQUIRED_COLUMNS if not row.get(c)]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+
+    if not row['ngo_id'].isdigit() or int(row['ngo_id']) not in ngo_ids:
+        raise ValueError(f"unknown ngo_id {row['ngo_id']!r}")
+
+    try:
+        amount = Decimal(row['amount'])
+    except InvalidOperation:
+        raise ValueError(f"invalid amount {row['amount']!r}")
+    if not MIN_AMOUNT <= amount <= MAX_AMOUNT:
+        raise ValueError(f"amount must be between {MIN_AMOUNT} and {MAX_AMOUNT}")
+
+    if row['payment_method'] not in PAYMENT_METHODS:
+        raise ValueError(f"invalid payment_method {row['payment_method']!r}")
+
+    donation_date = date.today()
+    if row.get('donation_date'):
+        try:
+            donation_date = datetime.strptime(row['donation_date'], '%Y-%m-%d').date()
+        except ValueError:
+            raise ValueError(f"invalid donation_date {row['donation_date']!r}")
+
+    return {
+        'name': row['name'],
+        'email': row.get('email', '').lower(),
+        'phone': row.get('phone', ''),
+        'address': row.get('address', ''),
+        'ngo_id': int(row['ngo_id']),
+        'amount': amount,
+        'payment_method': row['payment_method'],
+        'donation_date': donation_date,
+    }
+
+
+def _write_chunk(connection, index, rows, row_by_row=False):
+    cursor = connection.cursor()
+    try:
+        new_donors = {}
+        for line, row in rows:
+            key = DonorIndex.key(row)
+            if index.lookup(key) is None and key not in new_donors:
+                new_donors[key] = row
+
+        keys = list(new_donors)
+        ids = None
+        if keys and not row_by_row:
+            ids = donors.insert_donors(cursor, [new_donors[k] for k in keys])
+            if ids is None:
+                connection.rollback()
+                return _write_chunk(connection, index, rows, row_by_row=True)
+        elif keys:
+            ids = []
+            for k in keys:
+                cursor.execute("INSERT INTO donor (Name, Address) VALUES (%s, %s)",
+                               (new_donors[k]['name'], new_donors[k]['address']))
+                ids.append(cursor.lastrowid)
+        created = dict(zip(keys, ids or []))
+
+        def donor_id_for(row):
+            key = DonorIndex.key(row)
+            return created.get(key) or index.lookup(key)
+
+        emails = {(donor_id_for(r), r['email']) for _, r in rows if r['email']}
+        phones = {(donor_id_for(r), r['phone']) for _, r in rows if r['phone']}
+        if emails:
+            cursor.executemany("INSERT IGNORE INTO donor_email (Donor_id, Email) VALUES (%s, %s)", sorted(emails))
+        if phones:
+            cursor.executemany("INSERT IGNORE INTO donor_phone (Donor_id, Phone) VALUES (%s, %s)", sorted(phones))
+
+        cursor.executemany("""
+            INSERT INTO donation (Donor_id, Ngo_id, Amount, Donation_date, Payment_method)
+            VALUES (%s, %s, %s, %s, %s)
+        """, [(donor_id_for(r), r['ngo_id'], r['amount'], r['donation_date'], r['payment_method'])
+              for _, r in rows])
+
+        if created:
+            dashboard_stats.increment(cursor, 'donor', len(created))
+        dashboard_stats.increment(cursor, 'donation', len(rows))
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    # Only publish new donors to the index once they are committed
+    for key, donor_id in created.items():
+        index.add(key, new_donors[key]['name'], donor_id)
+    return len(created)
+
+
+def import_donations(connection, lines, chunk_size=1000, dry_run=False):
+    report = ImportReport()
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT Ngo_id FROM ngo")
+        ngo_ids = {ngo_id for (ngo_id,) in cursor.fetchall()}
+        index = DonorIndex(cursor)
+    finally:
+        cursor.close()
+
+    reader = csv.DictReader(lines)
+    columns = {c.strip().lower() for c in reader.fieldnames or ()}
+    missing = [c for c in REQUIRED_COLUMNS if c not in columns]
+    if missing:
+        report.add_error(1, f"missing column(s): {', '.join(missing)}")
+        return report
+
+    def flush(chunk):
+        if dry_run or not chunk:
+            return
+        try:
+            report.donors_created += _write_chunk(connection, index, chunk)
+            report.donations_created += len(chunk)
+        except mysql.connector.Error:
+            # Isolate the failing row(s) by retrying the chunk one row at a time
+            for line, row in chunk:
+                try:
+                    report.donors_created += _write_chunk(connection, index, [(line, row)])
+                    report.donations_created += 1
+                except mysql.connector.Error as e:
+                    report.add_error(line, e.msg)
+
+    chunk = []
+    for raw in reader:
+        report.rows_read += 1
+        line = reader.line_num
+        try:
+            chunk.append((line, parse_row(raw, ngo_ids)))
+        except ValueError as e:
+            report.add_error(line, str(e))
+            continue
+        if len(chunk) >= chunk_size:
+            flush(chunk)
+            chunk = []
+    flush(chunk)
+    return report
+
+
+if __name__ == '__main__':
+    args = [a for a in sys.argv[1:] if a != '--dry-run']
+    if len(args) != 1:
+        print("Usage: python bulk_import.py donations.csv [--dry-run]")
+        sys.exit(1)
+
+    connection = DatabaseConnector().get_connection()
+    if not connection:
+        sys.exit("Could not connect to the database")
+
+    started = datetime.now()
+    try:
+        with open(args[0], newline='', encoding='utf-8-sig') as f:
+            report = import_donations(connection, f, dry_run='--dry-run' in sys.argv)
+    finally:
+        connection.close()
+
+    elapsed = (datetime.now() - started).total_seconds()
+    print(f"📊 Read {report.rows_read} row(s) in {elapsed:.1f}s")
+    print(f"✅ Created {report.donations_created} donation(s) and {report.donors_created} donor(s)")
+    for line, message in report.errors:
+        print(f"❌ Line {line}: {message}")
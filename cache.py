@@ -0,0 +1,283 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import make_response, request
+
+
+def _size_of(value):
+    if isinstance(value, (bytes, str)):
+        return len(value)
+    if isinstance(value, tuple):
+        return sum(_size_of(item) for item in value)
+    return len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+
+class MemoryBackend:
+    # Per-process LRU bounded by the approximate size of the stored values.
+    # Least recently used entries are evicted once max_bytes is exceeded.
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._tags = {}
+        self._bytes = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, tags, expires_at, size = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl, tags=()):
+        size = _size_of(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (value, tuple(tags), time.monotonic() + ttl, size)
+            self._bytes += size
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry[3]
+        for tag in entry[1]:
+            keys = self._tags.get(tag)
+            if keys:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def invalidate_tags(self, tags):
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {'backend': 'memory', 'entries': len(self._entries), 'bytes': self._bytes,
+                    'max_bytes': self.max_bytes, 'evictions': self.evictions}
+
+
+class SQLiteBackend:
+    # Shared by every worker process on the host, so an invalidation in one
+    # gunicorn worker is seen by all of them.
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS cache_entry (
+        cache_key TEXT PRIMARY KEY,
+        value BLOB NOT NULL,
+        expires_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS cache_tag (
+        tag TEXT NOT NULL,
+        cache_key TEXT NOT NULL,
+        PRIMARY KEY (tag, cache_key)
+    );
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db().executescript(self.SCHEMA)
+
+    def _db(self):
+        db = getattr(self._local, 'db', None)
+        if db is None or self._local.pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+            self._local.pid = os.getpid()
+        return db
+
+    def get(self, key):
+        row = self._db().execute(
+            "SELECT value FROM cache_entry WHERE cache_key = ? AND expires_at > ?",
+            (key, time.time())).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def set(self, key, value, ttl, tags=()):
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute("INSERT OR REPLACE INTO cache_entry (cache_key, value, expires_at) VALUES (?, ?, ?)",
+                       (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), time.time() + ttl))
+            db.executemany("INSERT OR IGNORE INTO cache_tag (tag, cache_key) VALUES (?, ?)",
+                           [(tag, key) for tag in tags])
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+
+    def invalidate_tags(self, tags):
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            for tag in tags:
+                db.execute("DELETE FROM cache_entry WHERE cache_key IN "
+                           "(SELECT cache_key FROM cache_tag WHERE tag = ?)", (tag,))
+                db.execute("DELETE FROM cache_tag WHERE tag = ?", (tag,))
+            db.execute("DELETE FROM cache_entry WHERE expires_at <= ?", (time.time(),))
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+
+    def clear(self):
+        self._db().executescript("DELETE FROM cache_entry; DELETE FROM cache_tag;")
+
+    def stats(self):
+        entries, size = self._db().execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM cache_entry WHERE expires_at > ?",
+            (time.time(),)).fetchone()
+        return {'backend': 'sqlite', 'path': self.path, 'entries': entries, 'bytes': size}
+
+
+class Cache:
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+        self._build_locks = [threading.Lock() for _ in range(32)]
+
+    def get(self, key):
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            print(f"Cache read error: {e}")
+            value = None
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value, ttl, tags=()):
+        try:
+            self.backend.set(key, value, ttl, tags)
+        except Exception as e:
+            print(f"Cache write error: {e}")
+
+    def get_or_set(self, key, build, ttl, tags=()):
+        # Only one thread per process rebuilds a missing key; the others wait
+        # for it and then read its result instead of hitting the database too.
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._build_locks[hash(key) % len(self._build_locks)]:
+            try:
+                value = self.backend.get(key)
+            except Exception:
+                value = None
+            if value is None:
+                value = build()
+                if value is not None:
+                    self.set(key, value, ttl, tags)
+        return value
+
+    def invalidate(self, *tags):
+        try:
+            self.backend.invalidate_tags(tags)
+        except Exception as e:
+            print(f"Cache invalidation error: {e}")
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        stats = dict(self.backend.stats())
+        stats.update(pid=os.getpid(), hits=hits, misses=misses,
+                     hit_ratio=round(hits / lookups, 4) if lookups else None)
+        return stats
+
+
+def make_cache(config):
+    if config.CACHE_BACKEND == 'sqlite':
+        return Cache(SQLiteBackend(config.CACHE_PATH))
+    return Cache(MemoryBackend(config.CACHE_MAX_BYTES))
+
+
+def cached_response(cache):
+    # The cached page for this request, or None
+    cached = cache.get('page:' + request.path)
+    if cached is None:
+        return None
+    body, mimetype = cached
+    response = make_response(body)
+    response.mimetype = mimetype
+    response.headers['X-Cache'] = 'HIT'
+    return response
+
+
+def store_response(cache, response, ttl, tags=()):
+    if response.status_code == 200 and not response.direct_passthrough:
+        cache.set('page:' + request.path, (response.get_data(), response.mimetype), ttl, tags)
+    response.headers['X-Cache'] = 'MISS'
+    return response
+
+
+def cached_page(cache, ttl, tags=(), bypass=None):
+    # Caches the body of a successful GET response keyed by path (query
+    # strings are ignored, so they cannot be used to flood the cache).
+    # `bypass()` returning True skips the cache for that request (e.g. when
+    # there are flashed messages that belong to this visitor only).
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method != 'GET' or (bypass and bypass()):
+                return view(*args, **kwargs)
+            cached = cached_response(cache)
+            if cached is not None:
+                return cached
+            return store_response(cache, make_response(view(*args, **kwargs)), ttl, tags)
+        return wrapper
+    return decorator
+
+
+def cached_async_page(cache, ttl, tags=(), bypass=None):
+    # cached_page for the coroutine handlers in asgi.py
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(*args, **kwargs):
+            if request.method != 'GET' or (bypass and bypass()):
+                return await view(*args, **kwargs)
+            cached = cached_response(cache)
+            if cached is not None:
+                return cached
+            return store_response(cache, make_response(await view(*args, **kwargs)), ttl, tags)
+        return wrapper
+    return decorator
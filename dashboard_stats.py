@@ -0,0 +1,99 @@
+import sys
+
+from database_connector import DatabaseConnector
+
+# Counter name -> table it counts
+COUNTERS = {
+    'donor': 'donor',
+    'donation': 'donation',
+    'event': 'event',
+    'beneficiary': 'beneficiary',
+    'volunteer': 'volunteer',
+}
+
+REFRESH_LOCK = 'dashboard_counter_refresh'
+
+COUNTER_AGES_SQL = """
+    SELECT Counter_name, Counter_value,
+           TIMESTAMPDIFF(SECOND, Refreshed_at, NOW()) AS age
+    FROM dashboard_counter
+"""
+
+
+def increment(cursor, name, delta=1):
+    # Call inside the same transaction as the row write so both commit together
+    cursor.execute(
+        "UPDATE dashboard_counter SET Counter_value = Counter_value + %s WHERE Counter_name = %s",
+        (delta, name))
+
+
+def refresh(connection):
+    counts = '\n                UNION ALL '.join(
+        f"SELECT '{name}' AS name, COUNT(*) AS total FROM {table}" for name, table in COUNTERS.items())
+    cursor = connection.cursor()
+    try:
+        cursor.execute(f"""
+            INSERT INTO dashboard_counter (Counter_name, Counter_value, Refreshed_at)
+            SELECT name, total, NOW() FROM (
+                {counts}
+            ) AS counts
+            ON DUPLICATE KEY UPDATE Counter_value = VALUES(Counter_value), Refreshed_at = VALUES(Refreshed_at)
+        """)
+        connection.commit()
+    finally:
+        cursor.close()
+
+
+def refresh_once(connection):
+    # refresh() unless another process is already recounting. Returns
+    # whether this call did the recount.
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT GET_LOCK(%s, 0)", (REFRESH_LOCK,))
+        if cursor.fetchall()[0][0] != 1:
+            return False
+        try:
+            refresh(connection)
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (REFRESH_LOCK,))
+            cursor.fetchall()
+        return True
+    finally:
+        cursor.close()
+
+
+def is_stale(rows, max_staleness):
+    return len(rows) < len(COUNTERS) or any(row['age'] > max_staleness for row in rows)
+
+
+def counter_values(rows):
+    counters = dict.fromkeys(COUNTERS, 0)
+    counters.update((row['Counter_name'], row['Counter_value']) for row in rows)
+    return counters
+
+
+def read_counters(connection, max_staleness):
+    # The stored counters in one round trip, and whether they are older than
+    # max_staleness seconds (or missing). Recounting is left to the caller to
+    # schedule; it is five full-table counts, too slow for a page view.
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute(COUNTER_AGES_SQL)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    return counter_values(rows), is_stale(rows, max_staleness)
+
+if __name__ == '__main__':
+    # Intended for cron: `python dashboard_stats.py refresh`
+    if sys.argv[1:] != ['refresh']:
+        print("Usage: python dashboard_stats.py refresh")
+        sys.exit(1)
+    connection = DatabaseConnector().get_connection()
+    if not connection:
+        sys.exit("Could not connect to the database")
+    try:
+        refresh(connection)
+        print("✅ Dashboard counters refreshed")
+    finally:
+        connection.close()
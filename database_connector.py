@@ -1,5 +1,6 @@
 import mysql.connector
 from config import Config
+from db_pool import get_pool, read_connection
 
 class DatabaseConnector:
     def __init__(self):
@@ -7,31 +8,33 @@ class DatabaseConnector:
     
     def get_connection(self):
         try:
-            connection = mysql.connector.connect(
-                host=self.config.MYSQL_HOST,
-                user=self.config.MYSQL_USER,
-                password=self.config.MYSQL_PASSWORD,
-                database=self.config.MYSQL_DB,
-                port=self.config.MYSQL_PORT
-            )
-            return connection
+            return get_pool().connection()
+        except mysql.connector.Error as e:
+            print(f"Error connecting to MySQL: {e}")
+            return None
+    
+    def get_read_connection(self):
+        # Replica when MYSQL_REPLICAS is set, otherwise the primary
+        try:
+            return read_connection()
         except mysql.connector.Error as e:
             print(f"Error connecting to MySQL: {e}")
             return None
     
     def execute_query(self, query, params=None):
-        connection = self.get_connection()
+        connection = self.get_read_connection()
         if connection:
             try:
                 cursor = connection.cursor(dictionary=True)
                 cursor.execute(query, params or ())
                 result = cursor.fetchall()
                 cursor.close()
-                connection.close()
                 return result
             except mysql.connector.Error as e:
                 print(f"Error executing query: {e}")
                 return None
+            finally:
+                connection.close()
         return None
     
     def execute_insert(self, query, params=None):
@@ -43,10 +46,11 @@ class DatabaseConnector:
                 connection.commit()
                 last_id = cursor.lastrowid
                 cursor.close()
-                connection.close()
                 return last_id
             except mysql.connector.Error as e:
                 print(f"Error executing insert: {e}")
                 connection.rollback()
                 return None
+            finally:
+                connection.close()
         return None
\ No newline at end of file
@@ -0,0 +1,127 @@
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+import dashboard_stats
+from bulk_import import MAX_AMOUNT, MIN_AMOUNT, PAYMENT_METHODS
+
+
+def record_donation(connection, name, email, phone, address, ngo_id, amount, payment_method,
+                    request_key=None):
+    # A single CALL round trip. RecordDonation commits (or rolls back) its own
+    # transaction, so there is no separate COMMIT and nothing left open for
+    # the pool to roll back. multi=True is required because a CALL that
+    # returns a result set is followed by a status result.
+    email = (email or '').strip().lower()
+    phone = (phone or '').strip()
+    cursor = connection.cursor(dictionary=True)
+    try:
+        recorded = None
+        for result in cursor.execute(
+                "CALL RecordDonation(%s, %s, %s, %s, %s, %s, %s, %s)",
+                (name, email, phone, address, ngo_id, amount, payment_method, request_key),
+                multi=True):
+            if result.with_rows:
+                recorded = result.fetchone()
+        return recorded
+    finally:
+        cursor.close()
+
+
+def load_donations(cursor, limit, after=None, filters=None):
+    # Keyset page of donations, newest first, for /admin/donations. An NGO
+    # filter reads idx_donation_ngo_amount and a donor filter the donor foreign
+    # key index, both already in Donation_id order; dates and payment method
+    # only narrow that walk. Fetches limit + 1 rows for split_page().
+    filters = filters or {}
+    conditions = []
+    params = []
+    if after:
+        conditions.append("d.Donation_id < %s")
+        params.append(after[0])
+    for name, condition in (('ngo_id', "d.Ngo_id = %s"), ('donor_id', "d.Donor_id = %s"),
+                            ('payment_method', "d.Payment_method = %s"),
+                            ('start', "d.Donation_date >= %s"), ('end', "d.Donation_date <= %s")):
+        if name in filters:
+            conditions.append(condition)
+            params.append(filters[name])
+    where = "WHERE " + " AND ".join(conditions) if conditions else ""
+    cursor.execute(f"""
+        SELECT d.Donation_id, d.Amount, d.Donation_date, d.Payment_method,
+               donor.Name as donor_name, ngo.Ngo_name
+        FROM donation d
+        JOIN donor ON d.Donor_id = donor.Donor_id
+        JOIN ngo ON d.Ngo_id = ngo.Ngo_id
+        {where}
+        ORDER BY d.Donation_id DESC
+        LIMIT %s
+    """, (*params, limit + 1))
+    return cursor.fetchall()
+
+
+def parse_row(row, ngo_ids):
+    # Same rules as a bulk import row, but for an existing donor
+    if not row['donor_id'].isdigit():
+        raise ValueError("choose a donor")
+    if not row['ngo_id'].isdigit() or int(row['ngo_id']) not in ngo_ids:
+        raise ValueError("choose an NGO")
+    try:
+        amount = Decimal(row['amount'])
+    except InvalidOperation:
+        raise ValueError(f"invalid amount {row['amount']!r}")
+    if not MIN_AMOUNT <= amount <= MAX_AMOUNT:
+        raise ValueError(f"amount must be between {MIN_AMOUNT} and {MAX_AMOUNT}")
+    if row['payment_method'] not in PAYMENT_METHODS:
+        raise ValueError(f"invalid payment method {row['payment_method']!r}")
+    try:
+        donation_date = datetime.strptime(row['donation_date'], '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError("donation date must be in YYYY-MM-DD format")
+    return {
+        'donor_id': int(row['donor_id']),
+        'ngo_id': int(row['ngo_id']),
+        'amount': amount,
+        'donation_date': donation_date,
+        'payment_method': row['payment_method'],
+    }
+
+
+def add_donations(connection, rows):
+    # rows: [(row number, form row)] from the add donations form. Either every
+    # row is written with one multi-row INSERT in one transaction, or none is
+    # and the row errors are returned as [(row number, message)].
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT Ngo_id FROM ngo")
+        ngo_ids = {ngo_id for (ngo_id,) in cursor.fetchall()}
+
+        errors = []
+        parsed = []
+        for number, row in rows:
+            try:
+                parsed.append((number, parse_row(row, ngo_ids)))
+            except ValueError as e:
+                errors.append((number, str(e)))
+
+        donor_ids = sorted({d['donor_id'] for _, d in parsed})
+        if donor_ids:
+            placeholders = ', '.join(['%s'] * len(donor_ids))
+            cursor.execute(f"SELECT Donor_id FROM donor WHERE Donor_id IN ({placeholders})", donor_ids)
+            known = {donor_id for (donor_id,) in cursor.fetchall()}
+            errors += [(number, f"unknown donor {d['donor_id']}") for number, d in parsed
+                       if d['donor_id'] not in known]
+        if errors or not parsed:
+            return sorted(errors)
+
+        cursor.executemany("""
+            INSERT INTO donation (Donor_id, Ngo_id, Amount, Donation_date, Payment_method)
+            VALUES (%s, %s, %s, %s, %s)
+        """, [(d['donor_id'], d['ngo_id'], d['amount'], d['donation_date'], d['payment_method'])
+              for _, d in parsed])
+        dashboard_stats.increment(cursor, 'donation', len(parsed))
+        connection.commit()
+        return []
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
@@ -0,0 +1,167 @@
+import dashboard_stats
+
+
+def like_prefix(text):
+    # LIKE pattern matching names that start with `text`; '!' is the escape
+    # character because backslash escaping differs between databases
+    return text.replace('!', '!!').replace('%', '!%').replace('_', '!_') + '%'
+
+
+def load_donors(cursor, limit, after=None, search=''):
+    # Keyset page of donors, newest first. A search is a name prefix, read in
+    # name order from idx_donor_name (migration 0010), or an exact email.
+    # Fetches limit + 1 rows for split_page().
+    if '@' in search:
+        cursor.execute("""
+            SELECT d.Donor_id, d.Name, d.Address
+            FROM donor_email e
+            JOIN donor d ON d.Donor_id = e.Donor_id
+            WHERE e.Email = %s
+        """, (search.lower(),))
+        return cursor.fetchall()
+
+    if search:
+        keyset = ""
+        params = [like_prefix(search)]
+        if after:
+            keyset = "AND (Name > %s OR (Name = %s AND Donor_id > %s))"
+            params += [after[0], after[0], after[1]]
+        cursor.execute(f"""
+            SELECT Donor_id, Name, Address
+            FROM donor
+            WHERE Name LIKE %s ESCAPE '!' {keyset}
+            ORDER BY Name, Donor_id
+            LIMIT %s
+        """, (*params, limit + 1))
+        return cursor.fetchall()
+
+    keyset = "WHERE Donor_id < %s" if after else ""
+    cursor.execute(f"""
+        SELECT Donor_id, Name, Address
+        FROM donor
+        {keyset}
+        ORDER BY Donor_id DESC
+        LIMIT %s
+    """, (*(after or ()), limit + 1))
+    return cursor.fetchall()
+
+
+def page_key(search):
+    # The keyset split_page() needs for load_donors() with this search
+    if search:
+        return lambda d: (d['Name'], d['Donor_id'])
+    return lambda d: (d['Donor_id'],)
+
+
+def lookup(cursor, prefix, limit=20):
+    # Donor picker on the add donation form
+    cursor.execute("""
+        SELECT Donor_id, Name
+        FROM donor
+        WHERE Name LIKE %s ESCAPE '!'
+        ORDER BY Name, Donor_id
+        LIMIT %s
+    """, (like_prefix(prefix), limit))
+    return cursor.fetchall()
+
+
+def attach_contacts(cursor, donors):
+    # Phones and emails for one page of donors, concatenated per child table
+    if not donors:
+        return donors
+    ids = [d['Donor_id'] for d in donors]
+    placeholders = ', '.join(['%s'] * len(ids))
+    cursor.execute(f"""
+        SELECT
+            d.Donor_id,
+            (SELECT GROUP_CONCAT(dp.Phone) FROM donor_phone dp
+             WHERE dp.Donor_id = d.Donor_id) as phones,
+            (SELECT GROUP_CONCAT(de.Email) FROM donor_email de
+             WHERE de.Donor_id = d.Donor_id) as emails
+        FROM donor d
+        WHERE d.Donor_id IN ({placeholders})
+    """, ids)
+    details = {row['Donor_id']: row for row in cursor.fetchall()}
+    for donor in donors:
+        donor.update(details.get(donor['Donor_id'], {}))
+    return donors
+
+
+def insert_donors(cursor, donors):
+    # Multi-row insert; assumes the ids came out consecutive and verifies it,
+    # since interleaved auto-increment locking does not guarantee that under
+    # concurrent inserts. Returns None when the caller must fall back.
+    cursor.executemany("INSERT INTO donor (Name, Address) VALUES (%s, %s)",
+                       [(d['name'], d['address']) for d in donors])
+    first_id = cursor.lastrowid
+    cursor.execute("SELECT Donor_id, Name FROM donor WHERE Donor_id BETWEEN %s AND %s ORDER BY Donor_id",
+                   (first_id, first_id + len(donors) - 1))
+    inserted = cursor.fetchall()
+    if [name for _, name in inserted] != [d['name'] for d in donors]:
+        return None
+    return [donor_id for donor_id, _ in inserted]
+
+
+def parse_row(row):
+    if not row['name']:
+        raise ValueError("name is required")
+    return {
+        'name': row['name'],
+        'address': row['address'],
+        'phone': row['phone'],
+        'email': row['email'].lower(),
+    }
+
+
+def add_donors(connection, rows):
+    # rows: [(row number, form row)] from the add donors form. Either every
+    # row is written, in one transaction, or none is and the row errors are
+    # returned as [(row number, message)].
+    errors = []
+    parsed = []
+    for number, row in rows:
+        try:
+            parsed.append((number, parse_row(row)))
+        except ValueError as e:
+            errors.append((number, str(e)))
+
+    emails = [d['email'] for _, d in parsed if d['email']]
+    cursor = connection.cursor()
+    try:
+        if emails:
+            placeholders = ', '.join(['%s'] * len(emails))
+            cursor.execute(f"SELECT Email FROM donor_email WHERE Email IN ({placeholders})", emails)
+            taken = {email for (email,) in cursor.fetchall()}
+            seen = set()
+            for number, donor in parsed:
+                if donor['email'] in taken or donor['email'] in seen:
+                    errors.append((number, f"a donor with email {donor['email']} already exists"))
+                if donor['email']:
+                    seen.add(donor['email'])
+        if errors or not parsed:
+            return sorted(errors)
+
+        donors = [d for _, d in parsed]
+        ids = insert_donors(cursor, donors)
+        if ids is None:
+            connection.rollback()
+            ids = []
+            for donor in donors:
+                cursor.execute("INSERT INTO donor (Name, Address) VALUES (%s, %s)",
+                               (donor['name'], donor['address']))
+                ids.append(cursor.lastrowid)
+
+        emails = [(donor_id, d['email']) for donor_id, d in zip(ids, donors) if d['email']]
+        phones = [(donor_id, d['phone']) for donor_id, d in zip(ids, donors) if d['phone']]
+        if emails:
+            cursor.executemany("INSERT INTO donor_email (Donor_id, Email) VALUES (%s, %s)", emails)
+        if phones:
+            cursor.executemany("INSERT INTO donor_phone (Donor_id, Phone) VALUES (%s, %s)", phones)
+        dashboard_stats.increment(cursor, 'donor', len(ids))
+        connection.commit()
+        return []
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
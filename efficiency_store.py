@@ -0,0 +1,62 @@
+import sys
+
+from database_connector import DatabaseConnector
+
+
+def recompute_stale(connection):
+    # CalculateNgoEfficiency() only runs for NGOs the triggers flagged since
+    # the last pass, so the cost follows the write rate, not the NGO count.
+    cursor = connection.cursor()
+    try:
+        cursor.execute("""
+            UPDATE ngo_efficiency
+            SET Efficiency_Score = CalculateNgoEfficiency(Ngo_id),
+                Is_stale = 0,
+                Computed_at = NOW()
+            WHERE Is_stale = 1
+        """)
+        recomputed = cursor.rowcount
+        connection.commit()
+        return recomputed
+    finally:
+        cursor.close()
+
+
+def recompute_all(connection):
+    cursor = connection.cursor()
+    try:
+        cursor.execute("INSERT IGNORE INTO ngo_efficiency (Ngo_id, Is_stale) SELECT Ngo_id, 1 FROM ngo")
+        cursor.execute("UPDATE ngo_efficiency SET Is_stale = 1")
+        connection.commit()
+    finally:
+        cursor.close()
+    return recompute_stale(connection)
+
+
+def load_ngos(connection, recompute=True):
+    if recompute:
+        recompute_stale(connection)
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT n.*, ne.Efficiency_Score
+            FROM ngo n
+            LEFT JOIN ngo_efficiency ne ON ne.Ngo_id = n.Ngo_id
+        """)
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+
+
+if __name__ == '__main__':
+    if sys.argv[1:] not in (['stale'], ['all']):
+        print("Usage: python efficiency_store.py [stale|all]")
+        sys.exit(1)
+    connection = DatabaseConnector().get_connection()
+    if not connection:
+        sys.exit("Could not connect to the database")
+    try:
+        count = recompute_all(connection) if sys.argv[1] == 'all' else recompute_stale(connection)
+        print(f"✅ Recomputed efficiency for {count} NGO(s)")
+    finally:
+        connection.close()
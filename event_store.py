@@ -0,0 +1,93 @@
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+import dashboard_stats
+
+
+def load_events(cursor, limit, after=None, filters=None):
+    # Keyset page of events, latest date first, for /admin/events. Read in
+    # index order from idx_event_date, or idx_event_ngo_date (migration 0010)
+    # when filtered by NGO. Fetches limit + 1 rows for split_page().
+    filters = filters or {}
+    conditions = []
+    params = []
+    if after:
+        conditions.append("(e.Event_date < %s OR (e.Event_date = %s AND e.Event_id < %s))")
+        params += [after[0], after[0], after[1]]
+    for name, condition in (('ngo_id', "e.Ngo_id = %s"),
+                            ('start', "e.Event_date >= %s"), ('end', "e.Event_date <= %s")):
+        if name in filters:
+            conditions.append(condition)
+            params.append(filters[name])
+    where = "WHERE " + " AND ".join(conditions) if conditions else ""
+    cursor.execute(f"""
+        SELECT e.Event_id, e.Event_name, e.Description, e.Venue, e.Event_date, e.Budget,
+               ngo.Ngo_name
+        FROM event e
+        JOIN ngo ON e.Ngo_id = ngo.Ngo_id
+        {where}
+        ORDER BY e.Event_date DESC, e.Event_id DESC
+        LIMIT %s
+    """, (*params, limit + 1))
+    return cursor.fetchall()
+
+
+def parse_row(row, ngo_ids):
+    if not row['ngo_id'].isdigit() or int(row['ngo_id']) not in ngo_ids:
+        raise ValueError("choose an NGO")
+    if not row['event_name']:
+        raise ValueError("event name is required")
+    try:
+        event_date = datetime.strptime(row['event_date'], '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError("event date must be in YYYY-MM-DD format")
+    budget = None
+    if row['budget']:
+        try:
+            budget = Decimal(row['budget'])
+        except InvalidOperation:
+            raise ValueError(f"invalid budget {row['budget']!r}")
+        if budget < 0:
+            raise ValueError("budget cannot be negative")
+    return {
+        'ngo_id': int(row['ngo_id']),
+        'event_name': row['event_name'],
+        'description': row['description'],
+        'venue': row['venue'],
+        'event_date': event_date,
+        'budget': budget,
+    }
+
+
+def add_events(connection, rows):
+    # rows: [(row number, form row)] from the add events form. Either every
+    # row is written with one multi-row INSERT in one transaction, or none is
+    # and the row errors are returned as [(row number, message)].
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT Ngo_id FROM ngo")
+        ngo_ids = {ngo_id for (ngo_id,) in cursor.fetchall()}
+
+        errors = []
+        parsed = []
+        for number, row in rows:
+            try:
+                parsed.append(parse_row(row, ngo_ids))
+            except ValueError as e:
+                errors.append((number, str(e)))
+        if errors or not parsed:
+            return sorted(errors)
+
+        cursor.executemany("""
+            INSERT INTO event (Ngo_id, Event_name, Description, Venue, Event_date, Budget)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """, [(e['ngo_id'], e['event_name'], e['description'], e['venue'], e['event_date'], e['budget'])
+              for e in parsed])
+        dashboard_stats.increment(cursor, 'event', len(parsed))
+        connection.commit()
+        return []
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
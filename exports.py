@@ -0,0 +1,157 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+# dataset -> query, exported columns and the columns the filters apply to
+EXPORTS = {
+    'donations': {
+        'query': """
+            SELECT d.Donation_id, d.Donation_date, don.Donor_id, don.Name AS Donor_Name,
+                   n.Ngo_id, n.Ngo_name, d.Amount, d.Payment_method
+            FROM donation d
+            JOIN donor don ON d.Donor_id = don.Donor_id
+            JOIN ngo n ON d.Ngo_id = n.Ngo_id
+        """,
+        'columns': ['Donation_id', 'Donation_date', 'Donor_id', 'Donor_Name',
+                    'Ngo_id', 'Ngo_name', 'Amount', 'Payment_method'],
+        'date_column': 'd.Donation_date',
+        'ngo_column': 'd.Ngo_id',
+        'order_by': 'd.Donation_id',
+    },
+    'volunteers': {
+        'query': """
+            SELECT ev.Event_id, e.Event_name, e.Event_date, e.Ngo_id,
+                   v.Volunteer_id, v.Name AS Volunteer_Name, ev.Hours_contributed
+            FROM event_volunteer ev
+            JOIN volunteer v ON ev.Volunteer_id = v.Volunteer_id
+            JOIN event e ON ev.Event_id = e.Event_id
+        """,
+        'columns': ['Event_id', 'Event_name', 'Event_date', 'Ngo_id',
+                    'Volunteer_id', 'Volunteer_Name', 'Hours_contributed'],
+        'date_column': 'e.Event_date',
+        'ngo_column': 'e.Ngo_id',
+        'order_by': 'ev.Event_id, ev.Volunteer_id',
+    },
+    'audit': {
+        'query': """
+            SELECT ba.Audit_id, ba.Change_Timestamp, ba.Event_id, ba.Event_name, e.Ngo_id,
+                   ba.Old_Budget, ba.New_Budget, ba.Budget_Change, ba.Updated_By
+            FROM budget_audit ba
+            LEFT JOIN event e ON ba.Event_id = e.Event_id
+        """,
+        'columns': ['Audit_id', 'Change_Timestamp', 'Event_id', 'Event_name', 'Ngo_id',
+                    'Old_Budget', 'New_Budget', 'Budget_Change', 'Updated_By'],
+        'date_column': 'ba.Change_Timestamp',
+        'ngo_column': 'e.Ngo_id',
+        'order_by': 'ba.Change_Timestamp, ba.Audit_id',
+    },
+}
+# Entries moved out of budget_audit by audit_feed.archive()
+EXPORTS['audit_archive'] = dict(EXPORTS['audit'],
+                                query=EXPORTS['audit']['query'].replace('budget_audit ba', 'budget_audit_archive ba'))
+
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def parse_filters(args):
+    # Raises ValueError with a user-facing message for malformed filters
+    filters = {}
+    for name in ('start', 'end'):
+        value = args.get(name)
+        if value:
+            try:
+                filters[name] = datetime.strptime(value, '%Y-%m-%d').date()
+            except ValueError:
+                raise ValueError(f"'{name}' must be a date in YYYY-MM-DD format")
+    ngo_id = args.get('ngo_id')
+    if ngo_id:
+        if not ngo_id.isdigit():
+            raise ValueError("'ngo_id' must be a number")
+        filters['ngo_id'] = int(ngo_id)
+    return filters
+
+
+def build_query(dataset, filters):
+    spec = EXPORTS[dataset]
+    conditions = []
+    params = []
+    if 'start' in filters:
+        conditions.append(f"{spec['date_column']} >= %s")
+        params.append(filters['start'])
+    if 'end' in filters:
+        # Inclusive end date that also works for TIMESTAMP columns
+        conditions.append(f"{spec['date_column']} < %s")
+        params.append(filters['end'] + timedelta(days=1))
+    if 'ngo_id' in filters:
+        conditions.append(f"{spec['ngo_column']} = %s")
+        params.append(filters['ngo_id'])
+
+    sql = spec['query']
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += f" ORDER BY {spec['order_by']}"
+    return sql, params
+
+
+def open_stream(connection, sql, params, batch_size=1000):
+    # Runs the query on an unbuffered cursor, so rows are read off the socket
+    # as the response is written rather than materialized up front. The query
+    # runs before the generator is returned so SQL errors surface as a normal
+    # error response instead of a truncated download.
+    # A stream stopped early (a cancelled download, a failed export job) has
+    # unread rows, and closing its cursor would raise "Unread result found";
+    # its connection is discarded instead of being drained and pooled.
+    cursor = connection.cursor(dictionary=True, buffered=False)
+    try:
+        cursor.execute(sql, params)
+    except Exception:
+        connection.discard()
+        raise
+
+    def rows():
+        finished = False
+        try:
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    finished = True
+                    break
+                yield from batch
+        finally:
+            if not finished:
+                connection.discard()
+            else:
+                try:
+                    cursor.close()
+                finally:
+                    connection.close()
+
+    return rows()
+
+
+def to_csv(columns, rows, rows_per_chunk=500):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for count, row in enumerate(rows, 1):
+        writer.writerow([row[column] for column in columns])
+        if count % rows_per_chunk == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def to_ndjson(columns, rows, rows_per_chunk=500):
+    chunk = []
+    for row in rows:
+        chunk.append(json.dumps({column: row[column] for column in columns}, default=str))
+        if len(chunk) == rows_per_chunk:
+            yield '\n'.join(chunk) + '\n'
+            chunk = []
+    if chunk:
+        yield '\n'.join(chunk) + '\n'
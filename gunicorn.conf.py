@@ -0,0 +1,50 @@
+# gunicorn -c gunicorn.conf.py
+#
+# Preforking production server for app.py (or asgi.py with
+# WEB_WORKER_CLASS=uvicorn). The app is not preloaded: every worker imports
+# it after fork, so its connection pool, caches and job threads are its own,
+# and `kill -HUP <master pid>` rolls new code out one worker at a time.
+# TTIN/TTOU add or remove a worker at runtime.
+import os
+
+from config import Config
+
+
+def usable_cpus():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+bind = Config.WEB_BIND
+workers = Config.WEB_CONCURRENCY or usable_cpus() * 2 + 1
+if Config.WEB_WORKER_CLASS == 'uvicorn':
+    wsgi_app = 'asgi:app'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    wsgi_app = 'app:app'
+    worker_class = 'gthread'
+    threads = Config.WEB_THREADS
+preload_app = False
+timeout = Config.WEB_TIMEOUT
+graceful_timeout = Config.WEB_TIMEOUT
+keepalive = 5
+max_requests = Config.WEB_MAX_REQUESTS
+max_requests_jitter = max_requests // 10
+# Heartbeat files on tmpfs, so a slow disk cannot get workers killed
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+accesslog = '-'
+
+
+def on_starting(server):
+    per_worker = Config.DB_POOL_SIZE + (Config.ASYNC_DB_POOL_SIZE if Config.WEB_WORKER_CLASS == 'uvicorn' else 0)
+    print(f"🚀 Starting {server.cfg.workers} {Config.WEB_WORKER_CLASS} workers on {Config.WEB_BIND} "
+          f"(up to {server.cfg.workers * per_worker} MySQL connections)")
+
+
+def post_worker_init(worker):
+    # The worker has imported the app but is not accepting connections yet
+    if Config.WARM_UP:
+        from app import warm_up
+        warm_up()
@@ -0,0 +1,296 @@
+import hashlib
+import hmac
+import json
+import logging
+import re
+import threading
+import time
+
+from flask import before_render_template, request, template_rendered
+from werkzeug.local import Local, release_local
+
+import db_pool
+
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_PLACEHOLDER = re.compile(r"%s|%\(\w+\)s")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql):
+    # Statement shape without its values, so "WHERE id = 1" and "WHERE id = 2"
+    # (and IN lists of any length) are counted as the same query
+    if isinstance(sql, bytes):
+        sql = sql.decode('utf-8', 'replace')
+    sql = _STRING.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _VALUE_LIST.sub('(?+)', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+def statement_id(shape):
+    return hashlib.sha1(shape.encode('utf-8')).hexdigest()[:10]
+
+
+class Histogram:
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for index, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.buckets[index] += 1
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+class InstrumentedCursor:
+    # Proxy around a mysql.connector cursor that times execute() calls and
+    # counts fetched rows against the statement that produced them
+    def __init__(self, cursor, instrumentation):
+        self._cursor = cursor
+        self._instrumentation = instrumentation
+        self._key = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._cursor.close()
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._rows(1)
+            yield row
+
+    def _timed(self, operation, call):
+        started = time.perf_counter()
+        try:
+            return call()
+        finally:
+            self._key = self._instrumentation.record_query(operation, time.perf_counter() - started)
+
+    def execute(self, operation, params=None, **kwargs):
+        return self._timed(operation, lambda: self._cursor.execute(operation, params, **kwargs))
+
+    def executemany(self, operation, seq_params):
+        return self._timed(operation, lambda: self._cursor.executemany(operation, seq_params))
+
+    def callproc(self, procname, args=()):
+        return self._timed(f'CALL {procname}', lambda: self._cursor.callproc(procname, args))
+
+    def _rows(self, count):
+        if count and self._key:
+            self._instrumentation.record_rows(self._key, count)
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._rows(1)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._rows(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._rows(len(rows))
+        return rows
+
+
+class Instrumentation:
+    # Per-process metrics for requests, template renders and SQL statements,
+    # attributed to the Flask endpoint that ran them (or "background" for
+    # queries from job and queue worker threads).
+    def __init__(self, slow_query_ms=200, slow_query_log=None, n_plus_one_threshold=10):
+        self.slow_query_ms = slow_query_ms
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.collectors = []
+        self._lock = threading.Lock()
+        # Context-local rather than thread-local: the async handlers in asgi.py
+        # serve many requests on one thread
+        self._local = Local()
+        self._requests = {}
+        self._templates = {}
+        self._queries = {}
+        self._rows = {}
+        self._n_plus_one = {}
+        self._statements = {}
+        self.logger = logging.getLogger('ngo.instrumentation')
+        self._slow_log = None
+        if slow_query_log:
+            self._slow_log = logging.getLogger('ngo.slow_queries')
+            self._slow_log.setLevel(logging.INFO)
+            self._slow_log.propagate = False
+            if not self._slow_log.handlers:
+                handler = logging.FileHandler(slow_query_log)
+                handler.setFormatter(logging.Formatter('%(message)s'))
+                self._slow_log.addHandler(handler)
+
+    def init_app(self, app):
+        self.logger = app.logger
+        db_pool.add_cursor_hook(lambda cursor: InstrumentedCursor(cursor, self))
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        before_render_template.connect(self._before_render, app)
+        template_rendered.connect(self._after_render, app)
+
+    # Request and template timing
+
+    def _before_request(self):
+        self._local.endpoint = request.endpoint or 'unknown'
+        self._local.started = time.perf_counter()
+        self._local.statements = {}
+        # Mutated in place so queries from tasks the request spawns
+        # (asyncio.gather in asgi.py) are counted too
+        self._local.totals = {'queries': 0, 'time': 0.0}
+        self._local.renders = []
+
+    def _after_request(self, response):
+        started = getattr(self._local, 'started', None)
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        key = (self._local.endpoint, request.method, str(response.status_code))
+        with self._lock:
+            self._requests.setdefault(key, Histogram()).observe(elapsed)
+        response.headers['Server-Timing'] = (
+            f'db;dur={self._local.totals["time"] * 1000:.1f};desc="{self._local.totals["queries"]} queries", '
+            f'app;dur={elapsed * 1000:.1f}')
+        return response
+
+    def _teardown_request(self, exc=None):
+        release_local(self._local)
+
+    def _before_render(self, sender, template, context, **extra):
+        renders = getattr(self._local, 'renders', None)
+        if renders is not None:
+            renders.append(time.perf_counter())
+
+    def _after_render(self, sender, template, context, **extra):
+        renders = getattr(self._local, 'renders', None)
+        if renders:
+            elapsed = time.perf_counter() - renders.pop()
+            with self._lock:
+                self._templates.setdefault(template.name or 'string', Histogram()).observe(elapsed)
+
+    # SQL
+
+    def record_query(self, operation, elapsed):
+        shape = fingerprint(operation)
+        statement = statement_id(shape)
+        endpoint = getattr(self._local, 'endpoint', None) or 'background'
+        key = (endpoint, statement)
+        with self._lock:
+            self._statements.setdefault(statement, shape)
+            self._queries.setdefault(key, Histogram()).observe(elapsed)
+
+        statements = getattr(self._local, 'statements', None)
+        if statements is not None:
+            self._local.totals['queries'] += 1
+            self._local.totals['time'] += elapsed
+            statements[statement] = statements.get(statement, 0) + 1
+            # The same SELECT shape repeated within one request is almost
+            # always a per-row lookup inside a loop
+            if statements[statement] == self.n_plus_one_threshold and shape[:6].upper() == 'SELECT':
+                with self._lock:
+                    self._n_plus_one[key] = self._n_plus_one.get(key, 0) + 1
+                self.logger.warning('Possible N+1 query in %s: %dx %s',
+                                    endpoint, self.n_plus_one_threshold, shape[:200])
+
+        if self._slow_log and elapsed * 1000 >= self.slow_query_ms:
+            self._slow_log.info(json.dumps({
+                'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'endpoint': endpoint,
+                'ms': round(elapsed * 1000, 3),
+                'statement': statement,
+                'query': shape,
+            }))
+        return key
+
+    def record_rows(self, key, count):
+        with self._lock:
+            self._rows[key] = self._rows.get(key, 0) + count
+
+    # Exposition
+
+    def _histogram_lines(self, name, help_text, series):
+        lines = [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+        for labels, histogram in series:
+            for bound, count in zip(BUCKETS, histogram.buckets):
+                lines.append(f'{name}_bucket{_labels(**labels, le=bound)} {count}')
+            lines.append(f'{name}_bucket{_labels(**labels, le="+Inf")} {histogram.count}')
+            lines.append(f'{name}_sum{_labels(**labels)} {histogram.sum:.6f}')
+            lines.append(f'{name}_count{_labels(**labels)} {histogram.count}')
+        return lines
+
+    def _counter_lines(self, name, help_text, series, kind='counter'):
+        lines = [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+        lines.extend(f'{name}{_labels(**labels)} {value}' for labels, value in series)
+        return lines
+
+    def render(self):
+        with self._lock:
+            requests = sorted(self._requests.items())
+            templates = sorted(self._templates.items())
+            queries = sorted(self._queries.items())
+            rows = sorted(self._rows.items())
+            n_plus_one = sorted(self._n_plus_one.items())
+            statements = sorted(self._statements.items())
+
+        lines = []
+        lines += self._histogram_lines(
+            'ngo_http_request_duration_seconds', 'Time spent handling requests.',
+            [(dict(endpoint=e, method=m, status=s), h) for (e, m, s), h in requests])
+        lines += self._histogram_lines(
+            'ngo_template_render_seconds', 'Time spent rendering templates.',
+            [(dict(template=t), h) for t, h in templates])
+        lines += self._histogram_lines(
+            'ngo_db_query_duration_seconds', 'SQL execute() latency per statement shape.',
+            [(dict(endpoint=e, statement=s), h) for (e, s), h in queries])
+        lines += self._counter_lines(
+            'ngo_db_query_rows_total', 'Rows fetched per statement shape.',
+            [(dict(endpoint=e, statement=s), v) for (e, s), v in rows])
+        lines += self._counter_lines(
+            'ngo_db_n_plus_one_total', 'Requests that repeated one SELECT shape past the N+1 threshold.',
+            [(dict(endpoint=e, statement=s), v) for (e, s), v in n_plus_one])
+        lines += self._counter_lines(
+            'ngo_db_statement_info', 'Normalized SQL for each statement id.',
+            [(dict(statement=s, query=shape[:300]), 1) for s, shape in statements], kind='gauge')
+
+        for name, pool in db_pool.pool_stats().items():
+            for state in ('open', 'idle', 'in_use', 'waiting'):
+                lines.append(f'ngo_db_pool_connections{_labels(pool=name, state=state)} {pool[state]}')
+            lines.append(f'ngo_db_pool_checkouts_total{_labels(pool=name)} {pool["checkouts"]}')
+            lines.append(f'ngo_db_pool_timeouts_total{_labels(pool=name)} {pool["timeouts"]}')
+
+        for collect in self.collectors:
+            lines.extend(collect())
+        return '\n'.join(lines) + '\n'
+
+    def authorized(self, token):
+        # With no token configured no request is authorized by token
+        if not token:
+            return False
+        header = request.headers.get('Authorization', '')
+        return hmac.compare_digest(header, f'Bearer {token}')
@@ -0,0 +1,256 @@
+import json
+import os
+import socket
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+SCHEDULE_LOCK = 'background_job_schedule'
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    # Handed to task functions. progress() is also the cancellation
+    # checkpoint: it raises JobCancelled once an admin asked to stop the job.
+    def __init__(self, runner, job_id, kind, params):
+        self.runner = runner
+        self.id = job_id
+        self.kind = kind
+        self.params = params
+        self._last_write = 0.0
+
+    def progress(self, percent=None, message=None):
+        now = time.monotonic()
+        if percent != 100 and now - self._last_write < 0.5:
+            return
+        self._last_write = now
+        if self.runner._report(self.id, percent, message):
+            raise JobCancelled()
+
+    def get_connection(self):
+        return self.runner.get_connection()
+
+
+class JobRunner:
+    # Jobs are rows in background_job (migration 0008) executed by a thread
+    # pool in the process that submitted them. A heartbeat keeps Updated_at
+    # fresh for this process's jobs; queued/running rows whose heartbeat
+    # stopped (the worker died) are marked failed by sweep().
+    def __init__(self, get_connection, workers=2, tick=30, stale_after=300, scheduler=True):
+        self.get_connection = get_connection
+        self.workers = workers
+        self.tick = tick
+        self.stale_after = stale_after
+        self.scheduler = scheduler
+        self.tasks = {}
+        self.schedules = []
+        self._lock = threading.Lock()
+        self._started_pid = None
+        self._executor = None
+        self._active = set()
+        self._worker_name = f"{socket.gethostname()}:{os.getpid()}"
+
+    def task(self, kind):
+        def decorator(fn):
+            self.tasks[kind] = fn
+            return fn
+        return decorator
+
+    def every(self, name, interval, kind, params=None):
+        if interval > 0:
+            self.schedules.append((name, interval, kind, params or {}))
+
+    def ensure_started(self):
+        if self._started_pid == os.getpid():
+            return
+        with self._lock:
+            if self._started_pid == os.getpid():
+                return
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='job')
+            self._active = set()
+            self._worker_name = f"{socket.gethostname()}:{os.getpid()}"
+            threading.Thread(target=self._tick_loop, name='job-scheduler', daemon=True).start()
+            self._started_pid = os.getpid()
+
+    def _execute(self, sql, params=(), fetch=False):
+        connection = self.get_connection()
+        if not connection:
+            raise RuntimeError('Database connection error')
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute(sql, params)
+            result = cursor.fetchall() if fetch else cursor.rowcount
+            if not fetch:
+                connection.commit()
+            return result
+        finally:
+            cursor.close()
+            connection.close()
+
+    def submit(self, kind, params=None, created_by=None):
+        if kind not in self.tasks:
+            raise ValueError(f"Unknown job kind '{kind}'")
+        params = params or {}
+        self.ensure_started()
+        connection = self.get_connection()
+        if not connection:
+            raise RuntimeError('Database connection error')
+        cursor = connection.cursor()
+        try:
+            cursor.execute("""
+                INSERT INTO background_job (Kind, Params, Created_by, Worker)
+                VALUES (%s, %s, %s, %s)
+            """, (kind, json.dumps(params, default=str), created_by, self._worker_name))
+            job_id = cursor.lastrowid
+            connection.commit()
+        finally:
+            cursor.close()
+            connection.close()
+        self._active.add(job_id)
+        self._executor.submit(self._run, job_id, kind, params)
+        return job_id
+
+    def _run(self, job_id, kind, params):
+        try:
+            claimed = self._execute("""
+                UPDATE background_job
+                SET Status = 'running', Started_at = NOW(), Updated_at = NOW()
+                WHERE Job_id = %s AND Status = 'queued'
+            """, (job_id,))
+            if not claimed:
+                return  # cancelled while queued
+
+            job = Job(self, job_id, kind, params)
+            try:
+                result = self.tasks[kind](job, params)
+            except JobCancelled:
+                self._finish(job_id, 'cancelled')
+            except Exception as e:
+                print(f"Job {job_id} ({kind}) failed: {e}")
+                traceback.print_exc()
+                self._finish(job_id, 'failed', error=str(e))
+            else:
+                self._finish(job_id, 'succeeded', result=result)
+        except Exception as e:
+            print(f"Job runner error for job {job_id}: {e}")
+        finally:
+            self._active.discard(job_id)
+
+    def _finish(self, job_id, status, result=None, error=None):
+        self._execute("""
+            UPDATE background_job
+            SET Status = %s, Result = %s, Error = %s, Progress = COALESCE(%s, Progress),
+                Finished_at = NOW(), Updated_at = NOW()
+            WHERE Job_id = %s
+        """, (status, json.dumps(result, default=str) if result is not None else None,
+              error, 100 if status == 'succeeded' else None, job_id))
+
+    def _report(self, job_id, percent, message):
+        rows = self._execute("""
+            SELECT Cancel_requested FROM background_job WHERE Job_id = %s
+        """, (job_id,), fetch=True)
+        self._execute("""
+            UPDATE background_job
+            SET Progress = COALESCE(%s, Progress), Message = COALESCE(%s, Message), Updated_at = NOW()
+            WHERE Job_id = %s
+        """, (percent, message, job_id))
+        return bool(rows and rows[0]['Cancel_requested'])
+
+    def cancel(self, job_id):
+        # Queued jobs are cancelled outright; running ones stop at their next
+        # progress() call
+        if self._execute("""
+            UPDATE background_job SET Status = 'cancelled', Finished_at = NOW(), Updated_at = NOW()
+            WHERE Job_id = %s AND Status = 'queued'
+        """, (job_id,)):
+            return True
+        return bool(self._execute("""
+            UPDATE background_job SET Cancel_requested = 1
+            WHERE Job_id = %s AND Status = 'running'
+        """, (job_id,)))
+
+    def get(self, job_id):
+        rows = self._execute("SELECT * FROM background_job WHERE Job_id = %s", (job_id,), fetch=True)
+        if not rows:
+            return None
+        job = rows[0]
+        job['Params'] = json.loads(job['Params']) if job['Params'] else {}
+        job['Result'] = json.loads(job['Result']) if job['Result'] else None
+        return job
+
+    def recent(self, limit=50):
+        return self._execute("""
+            SELECT Job_id, Kind, Status, Progress, Message, Error, Created_by,
+                   Created_at, Started_at, Finished_at
+            FROM background_job
+            ORDER BY Job_id DESC
+            LIMIT %s
+        """, (limit,), fetch=True)
+
+    def _tick_loop(self):
+        while True:
+            try:
+                self.heartbeat()
+                self.sweep()
+                if self.scheduler:
+                    self.run_due_schedules()
+            except Exception as e:
+                print(f"Job scheduler error: {e}")
+            time.sleep(self.tick)
+
+    def heartbeat(self):
+        active = list(self._active)
+        if active:
+            placeholders = ', '.join(['%s'] * len(active))
+            self._execute(f"""
+                UPDATE background_job SET Updated_at = NOW()
+                WHERE Job_id IN ({placeholders}) AND Status IN ('queued', 'running')
+            """, active)
+
+    def sweep(self):
+        return self._execute("""
+            UPDATE background_job
+            SET Status = 'failed', Error = 'Worker stopped before the job finished',
+                Finished_at = NOW()
+            WHERE Status IN ('queued', 'running')
+              AND Updated_at < NOW() - INTERVAL %s SECOND
+        """, (self.stale_after,))
+
+    def run_due_schedules(self):
+        # One process at a time decides which recurring jobs are due, so each
+        # schedule fires once per interval no matter how many workers run
+        if not self.schedules:
+            return []
+        connection = self.get_connection()
+        if not connection:
+            return []
+        submitted = []
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute("SELECT GET_LOCK(%s, 0) AS locked", (SCHEDULE_LOCK,))
+            if cursor.fetchall()[0]['locked'] != 1:
+                return []
+            try:
+                for name, interval, kind, params in self.schedules:
+                    cursor.execute("INSERT IGNORE INTO job_schedule (Name, Next_run_at) VALUES (%s, NOW())",
+                                   (name,))
+                    cursor.execute("""
+                        UPDATE job_schedule
+                        SET Last_run_at = NOW(), Next_run_at = NOW() + INTERVAL %s SECOND
+                        WHERE Name = %s AND Next_run_at <= NOW()
+                    """, (interval, name))
+                    due = cursor.rowcount == 1
+                    connection.commit()
+                    if due:
+                        submitted.append(self.submit(kind, params, created_by=f'schedule:{name}'))
+            finally:
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (SCHEDULE_LOCK,))
+                cursor.fetchall()
+        finally:
+            cursor.close()
+            connection.close()
+        return submitted
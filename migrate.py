@@ -0,0 +1,134 @@
+import os
+import re
+import sys
+
+import mysql.connector
+
+from database_connector import DatabaseConnector
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+# Errors that mean "this object is already in the state the migration wants",
+# e.g. when an index was created by hand before the migration existed.
+ALREADY_APPLIED_ERRORS = {
+    1050,  # table already exists
+    1060,  # duplicate column name
+    1061,  # duplicate key name
+    1304,  # routine already exists
+    1359,  # trigger already exists
+}
+
+MIGRATION_FILE = re.compile(r'^(\d{4})_[\w-]+\.sql$')
+
+
+def split_statements(sql):
+    # Understands the mysql client's DELIMITER directive so that routines and
+    # triggers with BEGIN ... END bodies can live in plain .sql files.
+    statements = []
+    delimiter = ';'
+    buffer = []
+    for line in sql.splitlines():
+        stripped = line.strip()
+        if stripped.upper().startswith('DELIMITER '):
+            delimiter = stripped.split(None, 1)[1]
+            continue
+        if not buffer and (not stripped or stripped.startswith('--')):
+            continue
+        buffer.append(line)
+        if stripped.endswith(delimiter):
+            statement = '\n'.join(buffer).rstrip()[:-len(delimiter)].strip()
+            if statement:
+                statements.append(statement)
+            buffer = []
+    tail = '\n'.join(buffer).strip()
+    if tail:
+        statements.append(tail)
+    return statements
+
+
+def discover():
+    migrations = []
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        match = MIGRATION_FILE.match(filename)
+        if match:
+            migrations.append((filename[:-4], os.path.join(MIGRATIONS_DIR, filename)))
+    return migrations
+
+
+def applied_versions(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            Version VARCHAR(128) PRIMARY KEY,
+            Applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("SELECT Version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def apply_migration(connection, version, path):
+    cursor = connection.cursor()
+    try:
+        with open(path, encoding='utf-8') as f:
+            statements = split_statements(f.read())
+        for statement in statements:
+            try:
+                cursor.execute(statement)
+                if cursor.with_rows:
+                    cursor.fetchall()
+            except mysql.connector.Error as e:
+                if e.errno not in ALREADY_APPLIED_ERRORS:
+                    raise
+                print(f"   ↷ skipped ({e.msg})")
+        cursor.execute("INSERT INTO schema_migrations (Version) VALUES (%s)", (version,))
+        connection.commit()
+    finally:
+        cursor.close()
+
+
+def migrate(connection=None):
+    own_connection = connection is None
+    connection = connection or DatabaseConnector().get_connection()
+    if not connection:
+        raise RuntimeError("Could not connect to the database")
+
+    try:
+        cursor = connection.cursor()
+        applied = applied_versions(cursor)
+        cursor.close()
+
+        pending = [(v, p) for v, p in discover() if v not in applied]
+        for version, path in pending:
+            print(f"▶ Applying {version}")
+            apply_migration(connection, version, path)
+        return [version for version, _ in pending]
+    finally:
+        if own_connection:
+            connection.close()
+
+
+def status():
+    connection = DatabaseConnector().get_connection()
+    if not connection:
+        raise RuntimeError("Could not connect to the database")
+    try:
+        cursor = connection.cursor()
+        applied = applied_versions(cursor)
+        cursor.close()
+    finally:
+        connection.close()
+
+    for version, _ in discover():
+        print(f"{'✅' if version in applied else '⏳'} {version}")
+
+
+if __name__ == '__main__':
+    command = sys.argv[1] if len(sys.argv) > 1 else 'up'
+    if command == 'status':
+        status()
+    elif command == 'up':
+        applied = migrate()
+        print(f"🎉 Applied {len(applied)} migration(s)" if applied else "✅ Database is up to date")
+    else:
+        print("Usage: python migrate.py [up|status]")
+        sys.exit(1)
@@ -0,0 +1,222 @@
+-- The original schema the app was built on: core tables, the budget audit
+-- trigger and the CalculateNgoEfficiency / RedistributeExcessDonations
+-- routines. Everything is IF NOT EXISTS or skipped by migrate.py when it
+-- already exists, so databases created before this file only get it
+-- recorded in schema_migrations. Indexes added later live in their own
+-- migrations.
+CREATE TABLE IF NOT EXISTS ngo (
+    Ngo_id INT AUTO_INCREMENT PRIMARY KEY,
+    Ngo_name VARCHAR(255) NOT NULL,
+    Address VARCHAR(255),
+    Phone VARCHAR(32),
+    Email VARCHAR(255),
+    Description TEXT
+);
+
+CREATE TABLE IF NOT EXISTS donor (
+    Donor_id INT AUTO_INCREMENT PRIMARY KEY,
+    Name VARCHAR(255) NOT NULL,
+    Address VARCHAR(255)
+);
+
+CREATE TABLE IF NOT EXISTS donor_phone (
+    Donor_id INT NOT NULL,
+    Phone VARCHAR(32) NOT NULL,
+    PRIMARY KEY (Donor_id, Phone),
+    FOREIGN KEY (Donor_id) REFERENCES donor (Donor_id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS donor_email (
+    Donor_id INT NOT NULL,
+    Email VARCHAR(255) NOT NULL,
+    PRIMARY KEY (Donor_id, Email),
+    FOREIGN KEY (Donor_id) REFERENCES donor (Donor_id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS donation (
+    Donation_id INT AUTO_INCREMENT PRIMARY KEY,
+    Donor_id INT NOT NULL,
+    Ngo_id INT NOT NULL,
+    Amount DECIMAL(12, 2) NOT NULL,
+    Donation_date DATE NOT NULL,
+    Payment_method VARCHAR(50),
+    FOREIGN KEY (Donor_id) REFERENCES donor (Donor_id),
+    FOREIGN KEY (Ngo_id) REFERENCES ngo (Ngo_id)
+);
+
+CREATE TABLE IF NOT EXISTS event (
+    Event_id INT AUTO_INCREMENT PRIMARY KEY,
+    Ngo_id INT NOT NULL,
+    Event_name VARCHAR(255) NOT NULL,
+    Description TEXT,
+    Venue VARCHAR(255),
+    Event_date DATE NOT NULL,
+    Budget DECIMAL(12, 2),
+    FOREIGN KEY (Ngo_id) REFERENCES ngo (Ngo_id)
+);
+
+CREATE TABLE IF NOT EXISTS beneficiary (
+    Beneficiary_id INT AUTO_INCREMENT PRIMARY KEY,
+    Ngo_id INT NOT NULL,
+    Name VARCHAR(255) NOT NULL,
+    FOREIGN KEY (Ngo_id) REFERENCES ngo (Ngo_id)
+);
+
+CREATE TABLE IF NOT EXISTS volunteer (
+    Volunteer_id INT AUTO_INCREMENT PRIMARY KEY,
+    Name VARCHAR(255) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS volunteer_email (
+    Volunteer_id INT NOT NULL,
+    Email VARCHAR(255) NOT NULL,
+    FOREIGN KEY (Volunteer_id) REFERENCES volunteer (Volunteer_id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS volunteer_phone (
+    Volunteer_id INT NOT NULL,
+    Phone VARCHAR(32) NOT NULL,
+    FOREIGN KEY (Volunteer_id) REFERENCES volunteer (Volunteer_id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS volunteer_skill (
+    Volunteer_id INT NOT NULL,
+    Skill VARCHAR(64) NOT NULL,
+    FOREIGN KEY (Volunteer_id) REFERENCES volunteer (Volunteer_id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS event_volunteer (
+    Event_id INT NOT NULL,
+    Volunteer_id INT NOT NULL,
+    Hours_contributed DECIMAL(6, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (Event_id, Volunteer_id),
+    FOREIGN KEY (Event_id) REFERENCES event (Event_id) ON DELETE CASCADE,
+    FOREIGN KEY (Volunteer_id) REFERENCES volunteer (Volunteer_id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS fund_redistribution (
+    Redistribution_id INT AUTO_INCREMENT PRIMARY KEY,
+    Source_Ngo_id INT NOT NULL,
+    Target_Ngo_id INT NOT NULL,
+    Amount DECIMAL(12, 2) NOT NULL,
+    Redistribution_date TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (Source_Ngo_id) REFERENCES ngo (Ngo_id),
+    FOREIGN KEY (Target_Ngo_id) REFERENCES ngo (Ngo_id)
+);
+
+CREATE TABLE IF NOT EXISTS budget_audit (
+    Audit_id INT AUTO_INCREMENT PRIMARY KEY,
+    Event_id INT NOT NULL,
+    Event_name VARCHAR(255),
+    Old_Budget DECIMAL(12, 2),
+    New_Budget DECIMAL(12, 2),
+    Budget_Change DECIMAL(12, 2),
+    Updated_By VARCHAR(255),
+    Change_Timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS website_settings (
+    id INT PRIMARY KEY,
+    hero_image LONGBLOB
+);
+
+-- Shown on /admin/budget-audit
+DELIMITER $$
+CREATE TRIGGER after_event_budget_update AFTER UPDATE ON event FOR EACH ROW
+BEGIN
+    IF NOT (OLD.Budget <=> NEW.Budget) THEN
+        INSERT INTO budget_audit (Event_id, Event_name, Old_Budget, New_Budget,
+                                  Budget_Change, Updated_By, Change_Timestamp)
+        VALUES (NEW.Event_id, NEW.Event_name, OLD.Budget, NEW.Budget,
+                NEW.Budget - OLD.Budget, CURRENT_USER(), NOW());
+    END IF;
+END$$
+DELIMITER ;
+
+-- Label on the /ngos cards (cached in ngo_efficiency, see 0002): donations
+-- received per beneficiary served, with NGOs that run events ranked higher.
+DELIMITER $$
+CREATE FUNCTION CalculateNgoEfficiency(p_ngo_id INT)
+RETURNS VARCHAR(64)
+READS SQL DATA
+BEGIN
+    DECLARE v_total DECIMAL(14, 2) DEFAULT 0;
+    DECLARE v_beneficiaries INT DEFAULT 0;
+    DECLARE v_events INT DEFAULT 0;
+
+    SELECT COALESCE(SUM(Amount), 0) INTO v_total FROM donation WHERE Ngo_id = p_ngo_id;
+    SELECT COUNT(*) INTO v_beneficiaries FROM beneficiary WHERE Ngo_id = p_ngo_id;
+    SELECT COUNT(*) INTO v_events FROM event WHERE Ngo_id = p_ngo_id;
+
+    IF v_beneficiaries > 0 AND v_events > 0 AND v_total / v_beneficiaries <= 5000 THEN
+        RETURN 'High Impact';
+    ELSEIF v_beneficiaries > 0 OR v_events > 0 THEN
+        RETURN 'Growing Impact';
+    END IF;
+    RETURN 'Needs Support';
+END$$
+DELIMITER ;
+
+-- REDISTRIBUTION_ENGINE=procedure: every NGO above the average balance
+-- (donations plus earlier transfers) gives its excess, capped at the
+-- recipient's shortfall, to the NGO that is currently furthest below it.
+DELIMITER $$
+CREATE PROCEDURE RedistributeExcessDonations()
+BEGIN
+    DECLARE v_average DECIMAL(14, 2);
+    DECLARE v_source INT;
+    DECLARE v_excess DECIMAL(14, 2);
+    DECLARE v_target INT;
+    DECLARE v_target_balance DECIMAL(14, 2);
+    DECLARE v_amount DECIMAL(14, 2);
+    DECLARE v_done TINYINT DEFAULT 0;
+    DECLARE surplus CURSOR FOR SELECT Ngo_id, Excess FROM tmp_ngo_surplus ORDER BY Excess DESC;
+    DECLARE CONTINUE HANDLER FOR NOT FOUND SET v_done = 1;
+
+    DROP TEMPORARY TABLE IF EXISTS tmp_ngo_balance;
+    CREATE TEMPORARY TABLE tmp_ngo_balance (
+        Ngo_id INT PRIMARY KEY,
+        Balance DECIMAL(14, 2) NOT NULL,
+        INDEX (Balance)
+    );
+    INSERT INTO tmp_ngo_balance (Ngo_id, Balance)
+    SELECT n.Ngo_id, COALESCE(d.total, 0) + COALESCE(i.moved, 0) - COALESCE(o.moved, 0)
+    FROM ngo n
+    LEFT JOIN (SELECT Ngo_id, SUM(Amount) AS total FROM donation GROUP BY Ngo_id) d ON d.Ngo_id = n.Ngo_id
+    LEFT JOIN (SELECT Target_Ngo_id, SUM(Amount) AS moved FROM fund_redistribution GROUP BY Target_Ngo_id) i
+        ON i.Target_Ngo_id = n.Ngo_id
+    LEFT JOIN (SELECT Source_Ngo_id, SUM(Amount) AS moved FROM fund_redistribution GROUP BY Source_Ngo_id) o
+        ON o.Source_Ngo_id = n.Ngo_id;
+
+    SELECT AVG(Balance) INTO v_average FROM tmp_ngo_balance;
+
+    DROP TEMPORARY TABLE IF EXISTS tmp_ngo_surplus;
+    CREATE TEMPORARY TABLE tmp_ngo_surplus AS
+    SELECT Ngo_id, Balance - v_average AS Excess FROM tmp_ngo_balance WHERE Balance > v_average;
+
+    START TRANSACTION;
+    OPEN surplus;
+    transfers: LOOP
+        FETCH surplus INTO v_source, v_excess;
+        IF v_done THEN
+            LEAVE transfers;
+        END IF;
+
+        SELECT Ngo_id, Balance INTO v_target, v_target_balance
+        FROM tmp_ngo_balance ORDER BY Balance ASC LIMIT 1;
+
+        SET v_amount = LEAST(v_excess, v_average - v_target_balance);
+        IF v_amount > 0 THEN
+            INSERT INTO fund_redistribution (Source_Ngo_id, Target_Ngo_id, Amount, Redistribution_date)
+            VALUES (v_source, v_target, v_amount, NOW());
+            UPDATE tmp_ngo_balance SET Balance = Balance - v_amount WHERE Ngo_id = v_source;
+            UPDATE tmp_ngo_balance SET Balance = Balance + v_amount WHERE Ngo_id = v_target;
+        END IF;
+    END LOOP;
+    CLOSE surplus;
+    COMMIT;
+
+    DROP TEMPORARY TABLE tmp_ngo_surplus;
+    DROP TEMPORARY TABLE tmp_ngo_balance;
+END$$
+DELIMITER ;
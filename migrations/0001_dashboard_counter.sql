@@ -0,0 +1,7 @@
+-- Row counts for the admin dashboard. The write paths in app.py keep them
+-- current; dashboard_stats.refresh() fills and reconciles them.
+CREATE TABLE IF NOT EXISTS dashboard_counter (
+    Counter_name VARCHAR(32) PRIMARY KEY,
+    Counter_value BIGINT NOT NULL DEFAULT 0,
+    Refreshed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
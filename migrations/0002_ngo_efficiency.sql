@@ -0,0 +1,48 @@
+-- Precomputed CalculateNgoEfficiency() results. Triggers flag an NGO as stale
+-- whenever its donations, beneficiaries or events change, and
+-- efficiency_store.recompute_stale() recomputes only the flagged rows.
+CREATE TABLE IF NOT EXISTS ngo_efficiency (
+    Ngo_id INT PRIMARY KEY,
+    Efficiency_Score VARCHAR(64),
+    Is_stale TINYINT(1) NOT NULL DEFAULT 1,
+    Computed_at TIMESTAMP NULL
+);
+
+INSERT IGNORE INTO ngo_efficiency (Ngo_id, Is_stale)
+SELECT Ngo_id, 1 FROM ngo;
+
+CREATE TRIGGER ngo_efficiency_ngo_insert AFTER INSERT ON ngo FOR EACH ROW
+    INSERT IGNORE INTO ngo_efficiency (Ngo_id, Is_stale) VALUES (NEW.Ngo_id, 1);
+
+CREATE TRIGGER ngo_efficiency_ngo_delete AFTER DELETE ON ngo FOR EACH ROW
+    DELETE FROM ngo_efficiency WHERE Ngo_id = OLD.Ngo_id;
+
+CREATE TRIGGER ngo_efficiency_donation_insert AFTER INSERT ON donation FOR EACH ROW
+    INSERT INTO ngo_efficiency (Ngo_id, Is_stale) VALUES (NEW.Ngo_id, 1)
+    ON DUPLICATE KEY UPDATE Is_stale = 1;
+
+CREATE TRIGGER ngo_efficiency_donation_delete AFTER DELETE ON donation FOR EACH ROW
+    UPDATE ngo_efficiency SET Is_stale = 1 WHERE Ngo_id = OLD.Ngo_id;
+
+CREATE TRIGGER ngo_efficiency_donation_update AFTER UPDATE ON donation FOR EACH ROW
+    UPDATE ngo_efficiency SET Is_stale = 1 WHERE Ngo_id IN (OLD.Ngo_id, NEW.Ngo_id);
+
+CREATE TRIGGER ngo_efficiency_beneficiary_insert AFTER INSERT ON beneficiary FOR EACH ROW
+    INSERT INTO ngo_efficiency (Ngo_id, Is_stale) VALUES (NEW.Ngo_id, 1)
+    ON DUPLICATE KEY UPDATE Is_stale = 1;
+
+CREATE TRIGGER ngo_efficiency_beneficiary_delete AFTER DELETE ON beneficiary FOR EACH ROW
+    UPDATE ngo_efficiency SET Is_stale = 1 WHERE Ngo_id = OLD.Ngo_id;
+
+CREATE TRIGGER ngo_efficiency_beneficiary_update AFTER UPDATE ON beneficiary FOR EACH ROW
+    UPDATE ngo_efficiency SET Is_stale = 1 WHERE Ngo_id IN (OLD.Ngo_id, NEW.Ngo_id);
+
+CREATE TRIGGER ngo_efficiency_event_insert AFTER INSERT ON event FOR EACH ROW
+    INSERT INTO ngo_efficiency (Ngo_id, Is_stale) VALUES (NEW.Ngo_id, 1)
+    ON DUPLICATE KEY UPDATE Is_stale = 1;
+
+CREATE TRIGGER ngo_efficiency_event_delete AFTER DELETE ON event FOR EACH ROW
+    UPDATE ngo_efficiency SET Is_stale = 1 WHERE Ngo_id = OLD.Ngo_id;
+
+CREATE TRIGGER ngo_efficiency_event_update AFTER UPDATE ON event FOR EACH ROW
+    UPDATE ngo_efficiency SET Is_stale = 1 WHERE Ngo_id IN (OLD.Ngo_id, NEW.Ngo_id);
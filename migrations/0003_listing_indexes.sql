@@ -0,0 +1,10 @@
+-- Indexes behind the keyset-paginated admin listings.
+
+-- budget_audit(): ORDER BY Change_Timestamp DESC, Audit_id DESC with a keyset seek
+CREATE INDEX idx_budget_audit_timestamp ON budget_audit (Change_Timestamp, Audit_id);
+
+-- donation_impact(): grouped beneficiary count for the NGOs on the page
+CREATE INDEX idx_beneficiary_ngo ON beneficiary (Ngo_id);
+
+-- admin_volunteers(): per-volunteer hour totals read from the index alone
+CREATE INDEX idx_event_volunteer_hours ON event_volunteer (Volunteer_id, Hours_contributed, Event_id);
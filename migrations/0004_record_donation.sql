@@ -0,0 +1,76 @@
+-- Donors are matched on email (then phone) instead of name, so the lookup
+-- keys need indexes. Email becomes unique; existing duplicates keep the
+-- oldest donor.
+DELETE newer FROM donor_email newer
+JOIN donor_email older ON older.Email = newer.Email AND older.Donor_id < newer.Donor_id;
+
+CREATE UNIQUE INDEX uq_donor_email_email ON donor_email (Email);
+
+-- Households may share a phone number, so this one is not unique
+CREATE INDEX idx_donor_phone_phone ON donor_phone (Phone);
+
+-- The whole donate() write path in one CALL: donor match/upsert, contact
+-- rows, the donation itself and the dashboard counters, committed together.
+-- Two first-time donations racing on the same email can still create two
+-- donor rows; the unique index keeps the email attached to the first one.
+DELIMITER $$
+CREATE PROCEDURE RecordDonation(
+    IN p_name VARCHAR(255),
+    IN p_email VARCHAR(255),
+    IN p_phone VARCHAR(32),
+    IN p_address VARCHAR(255),
+    IN p_ngo_id INT,
+    IN p_amount DECIMAL(12, 2),
+    IN p_payment_method VARCHAR(50)
+)
+BEGIN
+    DECLARE v_donor_id INT DEFAULT NULL;
+    DECLARE v_donation_id INT DEFAULT NULL;
+    DECLARE v_new_donor TINYINT DEFAULT 0;
+
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        RESIGNAL;
+    END;
+
+    START TRANSACTION;
+
+    IF p_email IS NOT NULL AND p_email <> '' THEN
+        SELECT Donor_id INTO v_donor_id FROM donor_email WHERE Email = p_email;
+    END IF;
+
+    IF v_donor_id IS NULL AND p_phone IS NOT NULL AND p_phone <> '' THEN
+        SELECT Donor_id INTO v_donor_id FROM donor_phone
+        WHERE Phone = p_phone ORDER BY Donor_id LIMIT 1;
+    END IF;
+
+    IF v_donor_id IS NULL THEN
+        INSERT INTO donor (Name, Address) VALUES (p_name, p_address);
+        SET v_donor_id = LAST_INSERT_ID();
+        SET v_new_donor = 1;
+    ELSEIF p_address IS NOT NULL AND p_address <> '' THEN
+        UPDATE donor SET Address = p_address WHERE Donor_id = v_donor_id;
+    END IF;
+
+    IF p_email IS NOT NULL AND p_email <> '' THEN
+        INSERT IGNORE INTO donor_email (Donor_id, Email) VALUES (v_donor_id, p_email);
+    END IF;
+
+    IF p_phone IS NOT NULL AND p_phone <> '' THEN
+        INSERT IGNORE INTO donor_phone (Donor_id, Phone) VALUES (v_donor_id, p_phone);
+    END IF;
+
+    INSERT INTO donation (Donor_id, Ngo_id, Amount, Donation_date, Payment_method)
+    VALUES (v_donor_id, p_ngo_id, p_amount, CURDATE(), p_payment_method);
+    SET v_donation_id = LAST_INSERT_ID();
+
+    UPDATE dashboard_counter
+    SET Counter_value = Counter_value + 1
+    WHERE Counter_name = 'donation' OR (v_new_donor = 1 AND Counter_name = 'donor');
+
+    COMMIT;
+
+    SELECT v_donor_id AS Donor_id, v_donation_id AS Donation_id, v_new_donor AS New_donor;
+END$$
+DELIMITER ;
@@ -0,0 +1,58 @@
+-- Read model behind admin_volunteers(): one row per volunteer with the event
+-- count and hour total, kept current by triggers on event_volunteer. The
+-- listing seeks on (Total_hours, Volunteer_id) instead of aggregating the
+-- whole event_volunteer table for every page.
+CREATE TABLE IF NOT EXISTS volunteer_profile (
+    Volunteer_id INT PRIMARY KEY,
+    Events_count INT NOT NULL DEFAULT 0,
+    Total_hours DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    Updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_volunteer_profile_hours (Total_hours, Volunteer_id)
+);
+
+INSERT IGNORE INTO volunteer_profile (Volunteer_id, Events_count, Total_hours)
+SELECT v.Volunteer_id, COUNT(DISTINCT ev.Event_id), COALESCE(SUM(ev.Hours_contributed), 0)
+FROM volunteer v
+LEFT JOIN event_volunteer ev ON ev.Volunteer_id = v.Volunteer_id
+GROUP BY v.Volunteer_id;
+
+-- Contact details are read per page with one subquery per child table
+CREATE INDEX idx_volunteer_skill_volunteer ON volunteer_skill (Volunteer_id);
+CREATE INDEX idx_volunteer_email_volunteer ON volunteer_email (Volunteer_id);
+CREATE INDEX idx_volunteer_phone_volunteer ON volunteer_phone (Volunteer_id);
+
+-- Recounts a single volunteer from idx_event_volunteer_hours (migration 0003)
+DELIMITER $$
+CREATE PROCEDURE RefreshVolunteerProfile(IN p_volunteer_id INT)
+BEGIN
+    INSERT INTO volunteer_profile (Volunteer_id, Events_count, Total_hours)
+    SELECT p_volunteer_id, COUNT(DISTINCT Event_id), COALESCE(SUM(Hours_contributed), 0)
+    FROM event_volunteer
+    WHERE Volunteer_id = p_volunteer_id
+    ON DUPLICATE KEY UPDATE
+        Events_count = VALUES(Events_count),
+        Total_hours = VALUES(Total_hours);
+END$$
+DELIMITER ;
+
+CREATE TRIGGER volunteer_profile_volunteer_insert AFTER INSERT ON volunteer FOR EACH ROW
+    INSERT IGNORE INTO volunteer_profile (Volunteer_id) VALUES (NEW.Volunteer_id);
+
+CREATE TRIGGER volunteer_profile_volunteer_delete AFTER DELETE ON volunteer FOR EACH ROW
+    DELETE FROM volunteer_profile WHERE Volunteer_id = OLD.Volunteer_id;
+
+CREATE TRIGGER volunteer_profile_hours_insert AFTER INSERT ON event_volunteer FOR EACH ROW
+    CALL RefreshVolunteerProfile(NEW.Volunteer_id);
+
+CREATE TRIGGER volunteer_profile_hours_delete AFTER DELETE ON event_volunteer FOR EACH ROW
+    CALL RefreshVolunteerProfile(OLD.Volunteer_id);
+
+DELIMITER $$
+CREATE TRIGGER volunteer_profile_hours_update AFTER UPDATE ON event_volunteer FOR EACH ROW
+BEGIN
+    CALL RefreshVolunteerProfile(NEW.Volunteer_id);
+    IF OLD.Volunteer_id <> NEW.Volunteer_id THEN
+        CALL RefreshVolunteerProfile(OLD.Volunteer_id);
+    END IF;
+END$$
+DELIMITER ;
@@ -0,0 +1,19 @@
+-- One row per redistribution applied by redistribution_planner.apply_plan(),
+-- with its size and timings; transfers point back to their run.
+CREATE TABLE IF NOT EXISTS redistribution_run (
+    Run_id INT AUTO_INCREMENT PRIMARY KEY,
+    Started_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    Ngo_count INT NOT NULL,
+    Transfer_count INT NOT NULL,
+    Total_amount DECIMAL(14, 2) NOT NULL,
+    Target_balance DECIMAL(14, 2) NOT NULL,
+    Planning_ms DECIMAL(10, 3) NOT NULL,
+    Apply_ms DECIMAL(10, 3) NULL
+);
+
+ALTER TABLE fund_redistribution ADD COLUMN Run_id INT NULL;
+
+CREATE INDEX idx_fund_redistribution_run ON fund_redistribution (Run_id);
+
+-- redistribute_funds() lists the most recent transfers only
+CREATE INDEX idx_fund_redistribution_date ON fund_redistribution (Redistribution_date);
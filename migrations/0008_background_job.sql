@@ -0,0 +1,27 @@
+-- Long admin operations run as jobs (jobs.JobRunner) instead of inside the
+-- request; the admin UI polls these rows for progress and results.
+CREATE TABLE IF NOT EXISTS background_job (
+    Job_id INT AUTO_INCREMENT PRIMARY KEY,
+    Kind VARCHAR(64) NOT NULL,
+    Status ENUM('queued', 'running', 'succeeded', 'failed', 'cancelled') NOT NULL DEFAULT 'queued',
+    Params TEXT,
+    Progress TINYINT UNSIGNED NOT NULL DEFAULT 0,
+    Message VARCHAR(255),
+    Result MEDIUMTEXT,
+    Error TEXT,
+    Cancel_requested TINYINT(1) NOT NULL DEFAULT 0,
+    Created_by VARCHAR(64),
+    Worker VARCHAR(128),
+    Created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    Started_at TIMESTAMP NULL,
+    Finished_at TIMESTAMP NULL,
+    Updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_background_job_status (Status, Updated_at)
+);
+
+-- Last/next run of each recurring job, shared by all worker processes
+CREATE TABLE IF NOT EXISTS job_schedule (
+    Name VARCHAR(64) PRIMARY KEY,
+    Last_run_at TIMESTAMP NULL,
+    Next_run_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
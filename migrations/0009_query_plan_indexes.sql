@@ -0,0 +1,14 @@
+-- Indexes the route queries need to avoid full scans and sorts; checked by
+-- benchmarks/explain_check.py.
+
+-- public_events(), the dashboard's upcoming events and /admin/staffing:
+-- WHERE Event_date >= CURDATE() ORDER BY Event_date
+CREATE INDEX idx_event_date ON event (Event_date);
+
+-- redistribution_planner.load_balances() sums every NGO's donations and
+-- transfers from these covering indexes instead of the tables. Donation_id
+-- keeps per-NGO exports in primary key order. They also serve the foreign
+-- keys, so InnoDB drops its own single-column indexes.
+CREATE INDEX idx_donation_ngo_amount ON donation (Ngo_id, Donation_id, Amount);
+CREATE INDEX idx_fund_redistribution_source ON fund_redistribution (Source_Ngo_id, Amount);
+CREATE INDEX idx_fund_redistribution_target ON fund_redistribution (Target_Ngo_id, Amount);
@@ -0,0 +1,9 @@
+-- Indexes behind the /admin/donors and /admin/events listings.
+
+-- Donor search: Name LIKE 'prefix%' read in (Name, Donor_id) order, for the
+-- listing's keyset and the add donation form's donor picker
+CREATE INDEX idx_donor_name ON donor (Name);
+
+-- /admin/events?ngo_id=: one NGO's events in date order. Also serves the
+-- Ngo_id foreign key, so InnoDB drops its own index on it.
+CREATE INDEX idx_event_ngo_date ON event (Ngo_id, Event_date);
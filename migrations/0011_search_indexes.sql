@@ -0,0 +1,11 @@
+-- Donor and volunteer search (search_index.py).
+
+-- search_database() answers name searches from these while the in-memory
+-- index is still loading: MATCH(Name) AGAINST ('+word*' IN BOOLEAN MODE)
+CREATE FULLTEXT INDEX ft_donor_name ON donor (Name);
+CREATE FULLTEXT INDEX ft_volunteer_name ON volunteer (Name);
+
+-- Email and phone prefix searches on volunteers, and the exact email check
+-- in volunteers.register_volunteer(), which read the whole table before
+CREATE INDEX idx_volunteer_email_email ON volunteer_email (Email);
+CREATE INDEX idx_volunteer_phone_phone ON volunteer_phone (Phone);
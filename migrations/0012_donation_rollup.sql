@@ -0,0 +1,25 @@
+-- Donation totals per day and per month, by NGO and payment method, kept by
+-- donation_analytics.update() from donations past the watermark below.
+-- Period is 'day' or 'month'; a month's Bucket is its first day. A missing
+-- payment method is stored as ''.
+CREATE TABLE IF NOT EXISTS donation_rollup (
+    Period VARCHAR(8) NOT NULL,
+    Bucket DATE NOT NULL,
+    Ngo_id INT NOT NULL,
+    Payment_method VARCHAR(50) NOT NULL,
+    Donation_count INT NOT NULL DEFAULT 0,
+    Amount_total DECIMAL(16, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (Period, Bucket, Ngo_id, Payment_method)
+);
+
+-- Last_id: donations up to here are in the rollup. Seen_id: the highest
+-- Donation_id at the previous update, rolled up on the next one, so a
+-- transaction that took a lower id but committed late is not skipped.
+CREATE TABLE IF NOT EXISTS donation_rollup_state (
+    Id TINYINT PRIMARY KEY,
+    Last_id INT NOT NULL DEFAULT 0,
+    Seen_id INT NOT NULL DEFAULT 0,
+    Updated_at TIMESTAMP NULL
+);
+
+INSERT IGNORE INTO donation_rollup_state (Id) VALUES (1);
@@ -0,0 +1,15 @@
+-- Budget audit entries older than AUDIT_RETENTION_DAYS, moved here by the
+-- audit_archive job (audit_feed.archive()) so budget_audit stays small.
+-- Shown on /admin/budget-audit?archived=1 and in the audit_archive export.
+CREATE TABLE IF NOT EXISTS budget_audit_archive (
+    Audit_id INT PRIMARY KEY,
+    Event_id INT NOT NULL,
+    Event_name VARCHAR(255),
+    Old_Budget DECIMAL(12, 2),
+    New_Budget DECIMAL(12, 2),
+    Budget_Change DECIMAL(12, 2),
+    Updated_By VARCHAR(255),
+    Change_Timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_budget_audit_archive_timestamp ON budget_audit_archive (Change_Timestamp, Audit_id);
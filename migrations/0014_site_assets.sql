@@ -0,0 +1,11 @@
+-- Images live in the content-addressed store under ASSET_DIR (assets.py);
+-- the database only keeps their SHA-256 digests. site_asset names the
+-- site-wide ones ('hero'). website_settings.hero_image is no longer read:
+-- run `python assets.py import-blob` once to move an existing hero image.
+CREATE TABLE IF NOT EXISTS site_asset (
+    Name VARCHAR(64) PRIMARY KEY,
+    Digest CHAR(64) NOT NULL,
+    Updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+ALTER TABLE ngo ADD COLUMN Image_digest CHAR(64) NULL;
@@ -0,0 +1,81 @@
+DROP PROCEDURE IF EXISTS RecordDonation;
+
+-- Same as 0005, except that a donor is only matched on phone when the
+-- donation carries no email, and then only if the name matches too. Before,
+-- a household member with their own email was merged into whoever first
+-- gave the shared number, and their email attached to that donor.
+DELIMITER $$
+CREATE PROCEDURE RecordDonation(
+    IN p_name VARCHAR(255),
+    IN p_email VARCHAR(255),
+    IN p_phone VARCHAR(32),
+    IN p_address VARCHAR(255),
+    IN p_ngo_id INT,
+    IN p_amount DECIMAL(12, 2),
+    IN p_payment_method VARCHAR(50),
+    IN p_request_key VARCHAR(64)
+)
+BEGIN
+    DECLARE v_donor_id INT DEFAULT NULL;
+    DECLARE v_donation_id INT DEFAULT NULL;
+    DECLARE v_new_donor TINYINT DEFAULT 0;
+
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        RESIGNAL;
+    END;
+
+    START TRANSACTION;
+
+    IF p_request_key IS NOT NULL THEN
+        INSERT INTO submission_receipt (Idempotency_key, Kind) VALUES (p_request_key, 'donation');
+    END IF;
+
+    IF p_email IS NOT NULL AND p_email <> '' THEN
+        SELECT Donor_id INTO v_donor_id FROM donor_email WHERE Email = p_email;
+    END IF;
+
+    -- Households share phone numbers, so a phone alone never identifies a
+    -- donor: it is only used when no email was given, and the name must match
+    IF v_donor_id IS NULL AND (p_email IS NULL OR p_email = '') AND p_phone IS NOT NULL AND p_phone <> '' THEN
+        SELECT dp.Donor_id INTO v_donor_id
+        FROM donor_phone dp
+        JOIN donor d ON d.Donor_id = dp.Donor_id
+        WHERE dp.Phone = p_phone AND d.Name = p_name
+        ORDER BY dp.Donor_id LIMIT 1;
+    END IF;
+
+    IF v_donor_id IS NULL THEN
+        INSERT INTO donor (Name, Address) VALUES (p_name, p_address);
+        SET v_donor_id = LAST_INSERT_ID();
+        SET v_new_donor = 1;
+    ELSEIF p_address IS NOT NULL AND p_address <> '' THEN
+        UPDATE donor SET Address = p_address WHERE Donor_id = v_donor_id;
+    END IF;
+
+    IF p_email IS NOT NULL AND p_email <> '' THEN
+        INSERT IGNORE INTO donor_email (Donor_id, Email) VALUES (v_donor_id, p_email);
+    END IF;
+
+    IF p_phone IS NOT NULL AND p_phone <> '' THEN
+        INSERT IGNORE INTO donor_phone (Donor_id, Phone) VALUES (v_donor_id, p_phone);
+    END IF;
+
+    INSERT INTO donation (Donor_id, Ngo_id, Amount, Donation_date, Payment_method)
+    VALUES (v_donor_id, p_ngo_id, p_amount, CURDATE(), p_payment_method);
+    SET v_donation_id = LAST_INSERT_ID();
+
+    IF p_request_key IS NOT NULL THEN
+        UPDATE submission_receipt SET Record_id = v_donation_id WHERE Idempotency_key = p_request_key;
+    END IF;
+
+    UPDATE dashboard_counter
+    SET Counter_value = Counter_value + 1
+    WHERE Counter_name = 'donation' OR (v_new_donor = 1 AND Counter_name = 'donor');
+
+    COMMIT;
+
+    SELECT v_donor_id AS Donor_id, v_donation_id AS Donation_id, v_new_donor AS New_donor;
+END$$
+DELIMITER ;
@@ -0,0 +1,46 @@
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat(sep=' ') if isinstance(value, datetime) else value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def encode_cursor(*values):
+    payload = json.dumps([_plain(v) for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, size):
+    # Returns the keyset values from a ?after= token, or None for the first
+    # page. Tampered or truncated tokens also fall back to the first page.
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(values, list) or len(values) != size:
+        return None
+    return values
+
+
+def page_size(requested, default, maximum):
+    if not requested or requested < 1:
+        return default
+    return min(requested, maximum)
+
+
+def split_page(rows, limit, key):
+    # Queries fetch limit + 1 rows; the extra row only tells us a next page exists
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(*key(rows[-1]))
+    return rows, None
@@ -0,0 +1,191 @@
+import hashlib
+import sys
+import time
+from decimal import Decimal
+
+import numpy as np
+
+from database_connector import DatabaseConnector
+
+RUN_LOCK = 'ngo_fund_redistribution'
+
+
+class PlanChangedError(RuntimeError):
+    pass
+
+
+class RedistributionPlan:
+    def __init__(self, ngos, transfers, target, planning_ms):
+        self.ngos = ngos
+        self.transfers = transfers
+        self.target = target
+        self.planning_ms = planning_ms
+
+    @property
+    def total(self):
+        return sum((t['Amount'] for t in self.transfers), Decimal('0.00'))
+
+    @property
+    def fingerprint(self):
+        # Lets apply_plan() check it is writing the plan the admin previewed
+        digest = hashlib.sha1()
+        for t in self.transfers:
+            digest.update(f"{t['Source_Ngo_id']}>{t['Target_Ngo_id']}:{t['Amount']};".encode())
+        return digest.hexdigest()
+
+
+def load_balances(cursor):
+    # One round trip: donations received plus/minus earlier transfers, per NGO
+    cursor.execute("""
+        SELECT
+            n.Ngo_id,
+            n.Ngo_name,
+            COALESCE(d.received, 0) + COALESCE(r_in.moved, 0) - COALESCE(r_out.moved, 0) as balance
+        FROM ngo n
+        LEFT JOIN (
+            SELECT Ngo_id, SUM(Amount) as received FROM donation GROUP BY Ngo_id
+        ) d ON d.Ngo_id = n.Ngo_id
+        LEFT JOIN (
+            SELECT Target_Ngo_id, SUM(Amount) as moved FROM fund_redistribution GROUP BY Target_Ngo_id
+        ) r_in ON r_in.Target_Ngo_id = n.Ngo_id
+        LEFT JOIN (
+            SELECT Source_Ngo_id, SUM(Amount) as moved FROM fund_redistribution GROUP BY Source_Ngo_id
+        ) r_out ON r_out.Source_Ngo_id = n.Ngo_id
+        ORDER BY n.Ngo_id
+    """)
+    return cursor.fetchall()
+
+
+def allocate(balances, min_transfer=0):
+    # Balances are integer cents. Every NGO is brought towards the average:
+    # NGOs above it give their excess, NGOs below it receive their shortfall.
+    # Sources (largest excess first) and targets (largest shortfall first)
+    # are laid end to end on a line of cumulative amounts; each segment
+    # between two consecutive breakpoints is one transfer. That gives at most
+    # sources + targets - 1 transfers and needs no Python-level loop.
+    balances = np.asarray(balances, dtype=np.int64)
+    if balances.size == 0:
+        return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.int64), 0
+
+    target = int(balances.sum() // balances.size)
+    excess = balances - target
+    sources = np.flatnonzero(excess > 0)
+    targets = np.flatnonzero(excess < 0)
+    sources = sources[np.argsort(-excess[sources], kind='stable')]
+    targets = targets[np.argsort(excess[targets], kind='stable')]
+
+    source_cum = np.cumsum(excess[sources])
+    target_cum = np.cumsum(-excess[targets])
+    movable = min(int(source_cum[-1]) if source_cum.size else 0,
+                  int(target_cum[-1]) if target_cum.size else 0)
+    if movable <= 0:
+        return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.int64), target
+
+    points = np.unique(np.concatenate(([0], source_cum, target_cum)))
+    points = points[points <= movable]
+    starts, amounts = points[:-1], np.diff(points)
+    source_index = sources[np.searchsorted(source_cum, starts, side='right')]
+    target_index = targets[np.searchsorted(target_cum, starts, side='right')]
+
+    keep = amounts >= max(min_transfer, 1)
+    return source_index[keep], target_index[keep], amounts[keep], target
+
+
+def plan(connection, min_transfer=Decimal('1.00')):
+    started = time.perf_counter()
+    cursor = connection.cursor(dictionary=True)
+    try:
+        ngos = load_balances(cursor)
+    finally:
+        cursor.close()
+
+    cents = [int(Decimal(str(ngo['balance'])) * 100) for ngo in ngos]
+    sources, targets, amounts, target = allocate(cents, int(Decimal(str(min_transfer)) * 100))
+    transfers = [
+        {
+            'Source_Ngo_id': ngos[s]['Ngo_id'],
+            'from_ngo': ngos[s]['Ngo_name'],
+            'Target_Ngo_id': ngos[t]['Ngo_id'],
+            'to_ngo': ngos[t]['Ngo_name'],
+            'Amount': Decimal(amount).scaleb(-2),
+        }
+        for s, t, amount in zip(sources.tolist(), targets.tolist(), amounts.tolist())
+    ]
+    planning_ms = (time.perf_counter() - started) * 1000
+    return RedistributionPlan(ngos, transfers, Decimal(target).scaleb(-2), planning_ms)
+
+
+def apply_plan(connection, min_transfer=Decimal('1.00'), expected_fingerprint=None):
+    # Re-plans under a named lock and writes every transfer plus the run
+    # record in one transaction. Raises PlanChangedError when balances moved
+    # since the preview, so the admin never applies a plan they did not see.
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute("SELECT GET_LOCK(%s, 0) AS locked", (RUN_LOCK,))
+        if cursor.fetchall()[0]['locked'] != 1:
+            raise RuntimeError('Another redistribution is already running')
+        try:
+            proposed = plan(connection, min_transfer)
+            if expected_fingerprint and proposed.fingerprint != expected_fingerprint:
+                raise PlanChangedError('Balances changed since the preview; please review the new plan')
+
+            started = time.perf_counter()
+            cursor.execute("""
+                INSERT INTO redistribution_run
+                    (Ngo_count, Transfer_count, Total_amount, Target_balance, Planning_ms)
+                VALUES (%s, %s, %s, %s, %s)
+            """, (len(proposed.ngos), len(proposed.transfers), proposed.total,
+                  proposed.target, round(proposed.planning_ms, 3)))
+            run_id = cursor.lastrowid
+            if proposed.transfers:
+                cursor.executemany("""
+                    INSERT INTO fund_redistribution
+                        (Source_Ngo_id, Target_Ngo_id, Amount, Redistribution_date, Run_id)
+                    VALUES (%s, %s, %s, NOW(), %s)
+                """, [(t['Source_Ngo_id'], t['Target_Ngo_id'], t['Amount'], run_id)
+                      for t in proposed.transfers])
+            apply_ms = (time.perf_counter() - started) * 1000
+            cursor.execute("UPDATE redistribution_run SET Apply_ms = %s WHERE Run_id = %s",
+                           (round(apply_ms, 3), run_id))
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (RUN_LOCK,))
+            cursor.fetchall()
+    finally:
+        cursor.close()
+    return run_id, proposed
+
+
+def recent_runs(cursor, limit=10):
+    cursor.execute("""
+        SELECT Run_id, Started_at, Ngo_count, Transfer_count, Total_amount,
+               Target_balance, Planning_ms, Apply_ms
+        FROM redistribution_run
+        ORDER BY Run_id DESC
+        LIMIT %s
+    """, (limit,))
+    return cursor.fetchall()
+
+
+if __name__ == '__main__':
+    if sys.argv[1:] not in (['preview'], ['apply']):
+        print("Usage: python redistribution_planner.py [preview|apply]")
+        sys.exit(1)
+    connection = DatabaseConnector().get_connection()
+    if not connection:
+        sys.exit("Could not connect to the database")
+    try:
+        if sys.argv[1] == 'apply':
+            run_id, result = apply_plan(connection)
+            print(f"✅ Run {run_id}: {len(result.transfers)} transfer(s), ₹{result.total} moved")
+        else:
+            result = plan(connection)
+            for t in result.transfers:
+                print(f"{t['from_ngo']} -> {t['to_ngo']}: ₹{t['Amount']}")
+            print(f"📋 {len(result.transfers)} transfer(s), ₹{result.total} total, "
+                  f"target balance ₹{result.target} ({result.planning_ms:.1f} ms)")
+    finally:
+        connection.close()
@@ -0,0 +1,394 @@
+import bisect
+import itertools
+import re
+import threading
+import time
+import unicodedata
+from array import array
+
+from donors import like_prefix
+
+# kind -> (table, id column, email table, phone table)
+SOURCES = {
+    'donor': ('donor', 'Donor_id', 'donor_email', 'donor_phone'),
+    'volunteer': ('volunteer', 'Volunteer_id', 'volunteer_email', 'volunteer_phone'),
+}
+KINDS = tuple(SOURCES)
+
+_WORD = re.compile(r'[^\W_]+')
+_NON_DIGIT = re.compile(r'\D')
+_PHONE = re.compile(r'^\+?[\d\s().-]+$')
+_FIELD = '\x1f'  # separates name, email and phone in a stored record
+
+
+def _fold(text):
+    # Lowercase with accents stripped, so "José" is found by "jose"
+    if text.isascii():
+        return text.lower()
+    text = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def _phone_keys(phone):
+    digits = _NON_DIGIT.sub('', phone or '')
+    if not digits:
+        return []
+    # The national number too, so a search without the country code matches
+    return [digits, digits[-10:]] if len(digits) > 10 else [digits]
+
+
+def record_tokens(name, emails, phones):
+    # Words of the name, whole emails and phone digits; none contain spaces
+    tokens = _WORD.findall(_fold(name or ''))
+    tokens.extend(email.lower() for email in emails)
+    for phone in phones:
+        tokens.extend(_phone_keys(phone))
+    return list(dict.fromkeys(tokens))
+
+
+def query_terms(query):
+    # Each term must prefix-match one of a record's tokens. An email or a
+    # phone number is kept whole; anything else is split into words.
+    terms = []
+    for part in (query or '').split():
+        if '@' in part:
+            terms.append(part.lower())
+        elif _PHONE.match(part) and any(c.isdigit() for c in part):
+            terms.append(_NON_DIGIT.sub('', part))
+        else:
+            terms.extend(_WORD.findall(_fold(part)))
+    if len(terms) > 1 and all(term.isdigit() for term in terms):
+        # "98765 43210" is one phone number typed with a space
+        terms = [''.join(terms)]
+    return list(dict.fromkeys(terms))
+
+
+def fetch_records(cursor, kind, after=0):
+    # [(id, name, emails, phones)] for this kind's records with ids above
+    # `after`: everything on a full load, only new records on a catch-up.
+    # Ids only grow, so each query is a range on the primary key (or the
+    # Volunteer_id index).
+    table, id_column, email_table, phone_table = SOURCES[kind]
+    cursor.execute(f"SELECT {id_column}, Name FROM {table} WHERE {id_column} > %s", (after,))
+    records = cursor.fetchall()
+    if not records:
+        return []
+    contacts = {}
+    for contact_table, column, position in ((email_table, 'Email', 0), (phone_table, 'Phone', 1)):
+        cursor.execute(f"SELECT {id_column}, {column} FROM {contact_table} WHERE {id_column} > %s", (after,))
+        for record_id, value in cursor.fetchall():
+            contacts.setdefault(record_id, ([], []))[position].append(value)
+    return [(record_id, name, *contacts.get(record_id, ((), ()))) for record_id, name in records]
+
+
+class _Packed:
+    # Sorted (token, slot) pairs without a Python object per pair: the tokens
+    # concatenated into one string, with each one's start offset and slot in
+    # parallel arrays. Every token starting with a prefix is one contiguous
+    # range, found by binary search.
+    def __init__(self, pairs):
+        pairs.sort()
+        self.text = ''.join(token for token, _ in pairs)
+        self.starts = array('I', [0])
+        position = 0
+        for token, _ in pairs:
+            position += len(token)
+            self.starts.append(position)
+        self.slots = array('I', [slot for _, slot in pairs])
+
+    def __len__(self):
+        return len(self.slots)
+
+    def token(self, i):
+        return self.text[self.starts[i]:self.starts[i + 1]]
+
+    def _bisect(self, value, low=0):
+        high = len(self.slots)
+        while low < high:
+            middle = (low + high) // 2
+            if self.token(middle) < value:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def prefix_range(self, prefix):
+        start = self._bisect(prefix)
+        return start, self._bisect(prefix + '\uffff', start)
+
+
+class _Entries:
+    # One generation of the index: the records, the packed tokens from the
+    # last full load, and a small sorted list of (token, slot) pairs added
+    # since. A full rebuild fills a new generation while searches keep
+    # reading the current one, then swaps it in.
+    def __init__(self):
+        self.kinds = bytearray()  # slot -> position in KINDS
+        self.ids = array('I')     # slot -> record id
+        self.records = []         # slot -> "name<_FIELD>email<_FIELD>phone" for results
+        self.texts = []           # slot -> " token token ... " for matching further terms
+        self.by_id = {kind: (array('I'), array('I')) for kind in KINDS}  # sorted ids, their slots
+        self.high_water = dict.fromkeys(KINDS, 0)  # highest id loaded per kind
+        self.packed = _Packed([])
+        self.delta = []
+
+    def find(self, kind, record_id):
+        ids, slots = self.by_id[kind]
+        i = bisect.bisect_left(ids, record_id)
+        return slots[i] if i < len(ids) and ids[i] == record_id else None
+
+    def add(self, kind, record_id, name=None, emails=(), phones=(), pairs=None):
+        # New tokens go to `pairs` during a full load, else to the delta
+        slot = self.find(kind, record_id)
+        if slot is None:
+            if name is None:
+                return
+            slot = len(self.ids)
+            self.kinds.append(KINDS.index(kind))
+            self.ids.append(record_id)
+            self.records.append(_FIELD.join((name, emails[0] if emails else '', phones[0] if phones else '')))
+            self.texts.append(' ')
+            ids, slots = self.by_id[kind]
+            i = bisect.bisect_left(ids, record_id)
+            ids.insert(i, record_id)
+            slots.insert(i, slot)
+            self.high_water[kind] = max(self.high_water[kind], record_id)
+        else:
+            name = None
+            fields = self.records[slot].split(_FIELD)
+            fields[1] = fields[1] or (emails[0] if emails else '')
+            fields[2] = fields[2] or (phones[0] if phones else '')
+            self.records[slot] = _FIELD.join(fields)
+
+        text = self.texts[slot]
+        tokens = [token for token in record_tokens(name, emails, phones) if f' {token} ' not in text]
+        if not tokens:
+            return
+        self.texts[slot] = text + ' '.join(tokens) + ' '
+        if pairs is not None:
+            pairs.extend((token, slot) for token in tokens)
+        else:
+            for token in tokens:
+                bisect.insort(self.delta, (token, slot))
+
+    def candidates(self, term):
+        # (packed range, delta range) of the tokens starting with `term`
+        packed = self.packed.prefix_range(term)
+        delta = (bisect.bisect_left(self.delta, (term,)), bisect.bisect_left(self.delta, (term + '\uffff',)))
+        return packed, delta
+
+    def result(self, slot):
+        name, email, phone = self.records[slot].split(_FIELD)
+        return {
+            'kind': KINDS[self.kinds[slot]],
+            'id': self.ids[slot],
+            'name': name,
+            'email': email or None,
+            'phone': phone or None,
+        }
+
+
+class SearchIndex:
+    # In-memory prefix index over donor and volunteer names, emails and
+    # phones. A query takes the range of tokens starting with its narrowest
+    # term and checks the other terms against each candidate's tokens,
+    # stopping at `limit`, so typeahead stays in the low milliseconds at
+    # hundreds of thousands of records. A query whose narrowest term still
+    # matches more than `max_candidates` tokens (e.g. "a b") gives up after
+    # that many.
+    #
+    # The first search starts a background load and is answered from MySQL
+    # (search_database) until it finishes. Writes in this process are added
+    # directly; records created by other workers are picked up by a cheap
+    # catch-up every `refresh` seconds, and a full rebuild every `ttl`
+    # seconds picks up contacts added to existing records elsewhere.
+    def __init__(self, ttl=21600, refresh=30, max_candidates=5000):
+        self.ttl = ttl
+        self.refresh = refresh
+        self.max_candidates = max_candidates
+        self._lock = threading.Lock()
+        self._entries = None
+        self._loaded_at = None
+        self._refreshed_at = None
+        self._loader = None
+        self.load_seconds = None
+
+    def _build(self, get_connection):
+        started = time.perf_counter()
+        connection = get_connection()
+        if not connection:
+            return
+        entries = _Entries()
+        pairs = []
+        cursor = connection.cursor()
+        try:
+            for kind in KINDS:
+                for record in fetch_records(cursor, kind):
+                    entries.add(kind, *record, pairs=pairs)
+        except Exception as e:
+            print(f"❌ Search index load failed: {e}")
+            return
+        finally:
+            cursor.close()
+            connection.close()
+        entries.packed = _Packed(pairs)
+        del pairs
+        with self._lock:
+            self._entries = entries
+            self._loaded_at = self._refreshed_at = time.monotonic()
+        self.load_seconds = time.perf_counter() - started
+
+    def start_loading(self, get_connection):
+        with self._lock:
+            if self._loader is not None and self._loader.is_alive():
+                return
+            self._loader = threading.Thread(target=self._build, args=(get_connection,),
+                                            name='search-index-load', daemon=True)
+            self._loader.start()
+
+    def catch_up(self, get_connection, force=False):
+        # Adds records created since the last load or catch-up; force=True
+        # after a write in this process that add() cannot describe (e.g. a
+        # multi-row insert)
+        with self._lock:
+            if self._entries is None:
+                return
+            if not force and time.monotonic() - self._refreshed_at < self.refresh:
+                return  # another request got here first
+            self._refreshed_at = time.monotonic()
+            entries = self._entries
+        connection = get_connection()
+        if not connection:
+            return
+        cursor = connection.cursor()
+        try:
+            fetched = {kind: fetch_records(cursor, kind, entries.high_water[kind]) for kind in KINDS}
+        except Exception as e:
+            print(f"⚠️  Search index catch-up failed: {e}")
+            return
+        finally:
+            cursor.close()
+            connection.close()
+        with self._lock:
+            for kind, records in fetched.items():
+                for record in records:
+                    entries.add(kind, *record)
+
+    def ensure_loaded(self, get_connection):
+        # True when search() can answer; False while the index is cold
+        if self._entries is None:
+            self.start_loading(get_connection)
+            return False
+        now = time.monotonic()
+        if now - self._loaded_at >= self.ttl:
+            self.start_loading(get_connection)
+        elif now - self._refreshed_at >= self.refresh:
+            self.catch_up(get_connection)
+        return True
+
+    def add(self, kind, record_id, name=None, emails=(), phones=()):
+        # Called after a write commits. Without a name only contacts are added,
+        # and only to a record the index already has.
+        if self._entries is None:
+            return
+        with self._lock:
+            self._entries.add(kind, record_id, name,
+                              [e.strip().lower() for e in emails if e and e.strip()],
+                              [p.strip() for p in phones if p and p.strip()])
+
+    def search(self, query, kind=None, limit=10):
+        terms = query_terms(query)
+        if not terms:
+            return []
+        wanted_kind = KINDS.index(kind) if kind else None
+        with self._lock:
+            entries = self._entries
+            ranges = []
+            for term in terms:
+                packed, delta = entries.candidates(term)
+                size = packed[1] - packed[0] + delta[1] - delta[0]
+                if not size:
+                    return []
+                ranges.append((size, packed, delta, term))
+            ranges.sort()
+            _, packed, delta, _ = ranges[0]
+            others = [' ' + term for _, _, _, term in ranges[1:]]
+
+            # Tokens equal to the term sort first in its range, so exact
+            # word matches come before longer words that merely start with it
+            budget = self.max_candidates
+            slots = itertools.chain(
+                entries.packed.slots[packed[0]:min(packed[1], packed[0] + budget)],
+                [slot for _, slot in entries.delta[delta[0]:min(delta[1], delta[0] + budget)]])
+            results = []
+            seen = set()
+            for slot in itertools.islice(slots, budget):
+                if slot in seen or (wanted_kind is not None and entries.kinds[slot] != wanted_kind):
+                    continue
+                seen.add(slot)
+                text = entries.texts[slot]
+                if all(term in text for term in others):
+                    results.append(entries.result(slot))
+                    if len(results) >= limit:
+                        break
+            return results
+
+    def stats(self):
+        entries = self._entries
+        return {
+            'records': len(entries.ids) if entries else 0,
+            'tokens': len(entries.packed) + len(entries.delta) if entries else 0,
+            'loading': self._loader is not None and self._loader.is_alive(),
+            'load_seconds': round(self.load_seconds, 2) if self.load_seconds else None,
+            'age_seconds': round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None,
+        }
+
+
+def search_database(cursor, query, kind=None, limit=10):
+    # Fallback while the index is cold (dictionary cursor). Names go through
+    # the FULLTEXT indexes from migration 0011 in boolean mode, every word as
+    # a required prefix. A query with an email, or made only of a phone
+    # number, reads that contact index in order from the prefix instead.
+    terms = query_terms(query)
+    if not terms:
+        return []
+    email = next((term for term in terms if '@' in term), None)
+    words = [term for term in terms if '@' not in term]
+
+    results = []
+    for source_kind, (table, id_column, email_table, phone_table) in SOURCES.items():
+        if (kind and kind != source_kind) or len(results) >= limit:
+            continue
+        if email or all(word.isdigit() for word in words):
+            contact_table, column = (email_table, 'Email') if email else (phone_table, 'Phone')
+            other_table, other_column = (phone_table, 'Phone') if email else (email_table, 'Email')
+            cursor.execute(f"""
+                SELECT
+                    r.{id_column} as id,
+                    r.Name as name,
+                    c.{column} as {column.lower()},
+                    (SELECT MIN(o.{other_column}) FROM {other_table} o
+                     WHERE o.{id_column} = r.{id_column}) as {other_column.lower()}
+                FROM {contact_table} c
+                JOIN {table} r ON r.{id_column} = c.{id_column}
+                WHERE c.{column} LIKE %s ESCAPE '!'
+                ORDER BY c.{column}
+                LIMIT %s
+            """, (like_prefix(email or words[0]), limit - len(results)))
+        else:
+            cursor.execute(f"""
+                SELECT
+                    r.{id_column} as id,
+                    r.Name as name,
+                    (SELECT MIN(e.Email) FROM {email_table} e WHERE e.{id_column} = r.{id_column}) as email,
+                    (SELECT MIN(p.Phone) FROM {phone_table} p WHERE p.{id_column} = r.{id_column}) as phone
+                FROM {table} r
+                WHERE MATCH(Name) AGAINST (%s IN BOOLEAN MODE)
+                LIMIT %s
+            """, (' '.join(f'+{word}*' for word in words), limit - len(results)))
+        seen = {result['id'] for result in results if result['kind'] == source_kind}
+        for row in cursor.fetchall():
+            if row['id'] not in seen:
+                seen.add(row['id'])
+                results.append(dict(row, kind=source_kind))
+    return results
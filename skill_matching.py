@@ -0,0 +1,172 @@
+import heapq
+import threading
+import time
+
+# Positions of the set bits in every byte value, used to decode bitsets
+_BYTE_BITS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+
+
+def _members(bits):
+    if not bits:
+        return
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+    for offset, byte in enumerate(data):
+        if byte:
+            base = offset * 8
+            for bit in _BYTE_BITS[byte]:
+                yield base + bit
+
+
+def _skill_key(skill):
+    return ' '.join(skill.split()).lower()
+
+
+class SkillIndex:
+    # In-memory inverted index: skill -> bitset of volunteer slots, where a
+    # bitset is a plain Python int and each volunteer owns one bit. Matching
+    # an event is a handful of AND/OR operations over those ints, so it stays
+    # in the millisecond range for tens of thousands of volunteers.
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # Held across a reload's queries; matches keep using the old index
+        self._load_lock = threading.Lock()
+        self._loaded_at = None
+        self._reset()
+
+    def _reset(self):
+        self.slots = {}          # Volunteer_id -> slot
+        self.volunteer_ids = []  # slot -> Volunteer_id
+        self.names = []
+        self.hours = []
+        self.skill_bits = {}     # skill key -> bitset
+        self.skill_labels = {}   # skill key -> label as first registered
+        self.event_bits = {}     # Event_id -> bitset of volunteers already on it
+
+    def load(self, connection):
+        cursor = connection.cursor()
+        try:
+            cursor.execute("""
+                SELECT v.Volunteer_id, v.Name, COALESCE(p.Total_hours, 0)
+                FROM volunteer v
+                LEFT JOIN volunteer_profile p ON p.Volunteer_id = v.Volunteer_id
+                ORDER BY v.Volunteer_id
+            """)
+            volunteers = cursor.fetchall()
+            cursor.execute("SELECT Volunteer_id, Skill FROM volunteer_skill")
+            skills = cursor.fetchall()
+            cursor.execute("SELECT Event_id, Volunteer_id FROM event_volunteer")
+            assignments = cursor.fetchall()
+        finally:
+            cursor.close()
+
+        with self._lock:
+            self._reset()
+            for volunteer_id, name, hours in volunteers:
+                self._add(volunteer_id, name, float(hours))
+            for volunteer_id, skill in skills:
+                self._add_skill(volunteer_id, skill)
+            for event_id, volunteer_id in assignments:
+                slot = self.slots.get(volunteer_id)
+                if slot is not None:
+                    self.event_bits[event_id] = self.event_bits.get(event_id, 0) | (1 << slot)
+            self._loaded_at = time.monotonic()
+
+    def _fresh(self):
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl
+
+    def ensure_loaded(self, get_connection):
+        # Full rebuild every `ttl` seconds picks up hours logged since the last
+        # load and volunteers registered through other worker processes. One
+        # thread rebuilds; the others wait for it instead of loading too.
+        if self._fresh():
+            return True
+        with self._load_lock:
+            if self._fresh():
+                return True
+            connection = get_connection()
+            if not connection:
+                return self._loaded_at is not None
+            try:
+                self.load(connection)
+            finally:
+                connection.close()
+            return True
+
+    def _add(self, volunteer_id, name, hours=0.0):
+        slot = self.slots.get(volunteer_id)
+        if slot is None:
+            slot = len(self.volunteer_ids)
+            self.slots[volunteer_id] = slot
+            self.volunteer_ids.append(volunteer_id)
+            self.names.append(name)
+            self.hours.append(hours)
+        return slot
+
+    def _add_skill(self, volunteer_id, skill):
+        slot = self.slots.get(volunteer_id)
+        key = _skill_key(skill or '')
+        if slot is None or not key:
+            return
+        self.skill_bits[key] = self.skill_bits.get(key, 0) | (1 << slot)
+        self.skill_labels.setdefault(key, skill.strip())
+
+    def add_volunteer(self, volunteer_id, name, skills):
+        # Called after a registration commits, so the new volunteer can be
+        # matched without waiting for the next full rebuild
+        if self._loaded_at is None:
+            return
+        with self._lock:
+            self._add(volunteer_id, name)
+            for skill in skills:
+                self._add_skill(volunteer_id, skill)
+
+    def skills(self):
+        return sorted(self.skill_labels.values(), key=str.lower)
+
+    def match(self, skills, event_id=None, limit=20):
+        # Ranks volunteers by how many of the requested skills they cover,
+        # then by hours already contributed. Volunteers already on the event
+        # are left out.
+        keys = list(dict.fromkeys(_skill_key(s) for s in skills if s and s.strip()))
+        with self._lock:
+            wanted = [self.skill_bits.get(key, 0) for key in keys]
+            excluded = self.event_bits.get(event_id, 0) if event_id is not None else 0
+
+            # at_least[k] = volunteers covering at least k of the requested skills
+            at_least = [(1 << len(self.volunteer_ids)) - 1]
+            for bits in wanted:
+                at_least.append(0)
+                for k in range(len(at_least) - 1, 0, -1):
+                    at_least[k] |= at_least[k - 1] & bits
+
+            results = []
+            for coverage in range(len(wanted), 0, -1):
+                tier = at_least[coverage] & ~excluded
+                if coverage < len(wanted):
+                    tier &= ~at_least[coverage + 1]
+                if not tier:
+                    continue
+                best = heapq.nlargest(limit - len(results), _members(tier),
+                                      key=lambda slot: (self.hours[slot], -slot))
+                for slot in best:
+                    bit = 1 << slot
+                    results.append({
+                        'Volunteer_id': self.volunteer_ids[slot],
+                        'Name': self.names[slot],
+                        'coverage': coverage,
+                        'matched_skills': [self.skill_labels.get(key, key)
+                                           for key, bits in zip(keys, wanted) if bits & bit],
+                        'total_hours': self.hours[slot],
+                    })
+                if len(results) >= limit:
+                    break
+            return results
+
+    def stats(self):
+        return {
+            'volunteers': len(self.volunteer_ids),
+            'skills': len(self.skill_bits),
+            'events': len(self.event_bits),
+            'age_seconds': round(time.monotonic() - self._loaded_at, 1) if self._loaded_at else None,
+        }
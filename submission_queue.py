@@ -0,0 +1,206 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import mysql.connector
+
+ER_DUP_ENTRY = 1062
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS submission (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_submission_due ON submission (status, next_attempt_at);
+"""
+
+
+class SubmissionQueue:
+    # Append-only SQLite (WAL) file shared by every worker process on the host.
+    # Rows move pending -> processing -> confirmed | failed; a processing row
+    # whose lease expired (its worker died) becomes claimable again.
+    def __init__(self, path, lease_seconds=300):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db().executescript(SCHEMA)
+
+    def _db(self):
+        db = getattr(self._local, 'db', None)
+        if db is None or self._local.pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=FULL")
+            self._local.db = db
+            self._local.pid = os.getpid()
+        return db
+
+    def enqueue(self, kind, key, payload):
+        # Re-submitting the same key (double click, browser retry) returns the
+        # original entry instead of queueing a second one.
+        now = time.time()
+        db = self._db()
+        db.execute("""
+            INSERT OR IGNORE INTO submission
+                (idempotency_key, kind, payload, next_attempt_at, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (key, kind, json.dumps(payload), now, now, now))
+        return self.status(key)
+
+    def status(self, key):
+        row = self._db().execute(
+            "SELECT idempotency_key, kind, status, attempts, error, created_at, updated_at "
+            "FROM submission WHERE idempotency_key = ?", (key,)).fetchone()
+        return dict(row) if row else None
+
+    def claim(self, limit):
+        now = time.time()
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            rows = db.execute("""
+                SELECT id, idempotency_key, kind, payload, attempts FROM submission
+                WHERE (status = 'pending' AND next_attempt_at <= ?)
+                   OR (status = 'processing' AND updated_at <= ?)
+                ORDER BY id
+                LIMIT ?
+            """, (now, now - self.lease_seconds, limit)).fetchall()
+            db.executemany(
+                "UPDATE submission SET status = 'processing', attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                [(now, row['id']) for row in rows])
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        return [dict(row, payload=json.loads(row['payload']), attempts=row['attempts'] + 1) for row in rows]
+
+    def _finish(self, submission_id, status, error=None, next_attempt_at=None):
+        now = time.time()
+        self._db().execute(
+            "UPDATE submission SET status = ?, error = ?, next_attempt_at = COALESCE(?, next_attempt_at), "
+            "updated_at = ? WHERE id = ?",
+            (status, error, next_attempt_at, now, submission_id))
+
+    def confirm(self, submission_id):
+        self._finish(submission_id, 'confirmed')
+
+    def fail(self, submission_id, error):
+        self._finish(submission_id, 'failed', error)
+
+    def retry(self, submission_id, error, delay):
+        self._finish(submission_id, 'pending', error, time.time() + delay)
+
+    def counts(self):
+        rows = self._db().execute("SELECT status, COUNT(*) AS total FROM submission GROUP BY status").fetchall()
+        return {row['status']: row['total'] for row in rows}
+
+
+class SubmissionWorkers:
+    # Background threads that drain the queue into MySQL. Each handler gets a
+    # pooled connection, the payload and the idempotency key, and must record
+    # the key in MySQL in the same transaction as its writes. A duplicate-key
+    # error therefore means "already applied" and is treated as success.
+    def __init__(self, queue, get_connection, handlers, threads=2, batch_size=50,
+                 max_attempts=5, poll_interval=0.5):
+        self.queue = queue
+        self.get_connection = get_connection
+        self.handlers = handlers
+        self.threads = threads
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._started_pid = None
+        self._wake = threading.Event()
+
+    def ensure_started(self):
+        if self._started_pid == os.getpid():
+            return
+        with self._lock:
+            if self._started_pid == os.getpid():
+                return
+            for number in range(self.threads):
+                thread = threading.Thread(target=self._run, name=f'submission-worker-{number}', daemon=True)
+                thread.start()
+            self._started_pid = os.getpid()
+
+    def notify(self):
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            try:
+                processed = self.drain_once()
+            except Exception as e:
+                print(f"Submission worker error: {e}")
+                processed = 0
+            if not processed:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def drain_once(self):
+        batch = self.queue.claim(self.batch_size)
+        if not batch:
+            return 0
+
+        connection = self.get_connection()
+        if not connection:
+            for item in batch:
+                self._retry_or_fail(item, 'Database connection error')
+            return 0
+
+        try:
+            for item in batch:
+                self._process(connection, item)
+        finally:
+            connection.close()
+        return len(batch)
+
+    def _process(self, connection, item):
+        handler = self.handlers[item['kind']]
+        try:
+            handler(connection, item['payload'], item['idempotency_key'])
+        except mysql.connector.Error as e:
+            if e.errno == ER_DUP_ENTRY and self._receipt_exists(connection, item):
+                self.queue.confirm(item['id'])
+            else:
+                self._retry_or_fail(item, str(e))
+            return
+        except ValueError as e:
+            # Validation problems (e.g. duplicate volunteer) will not fix themselves
+            self.queue.fail(item['id'], str(e))
+            return
+        except Exception as e:
+            self._retry_or_fail(item, str(e))
+            return
+        self.queue.confirm(item['id'])
+
+    def _receipt_exists(self, connection, item):
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SELECT 1 FROM submission_receipt WHERE Idempotency_key = %s",
+                           (item['idempotency_key'],))
+            return cursor.fetchone() is not None
+        finally:
+            cursor.close()
+
+    def _retry_or_fail(self, item, error):
+        if item['attempts'] >= self.max_attempts:
+            self.queue.fail(item['id'], error)
+        else:
+            # Exponential backoff: 2, 4, 8, ... seconds, capped at five minutes
+            self.queue.retry(item['id'], error, min(2 ** item['attempts'], 300))
@@ -0,0 +1,72 @@
+import time
+
+from cache import Cache, MemoryBackend
+
+
+def test_least_recently_used_entry_is_evicted_first():
+    backend = MemoryBackend(max_bytes=30)
+    backend.set('a', b'x' * 10, ttl=60)
+    backend.set('b', b'x' * 10, ttl=60)
+    backend.set('c', b'x' * 10, ttl=60)
+    assert backend.get('a') is not None  # 'b' is now the oldest
+
+    backend.set('d', b'x' * 10, ttl=60)
+    assert backend.get('b') is None
+    assert [backend.get(key) is not None for key in 'acd'] == [True, True, True]
+    assert backend.stats()['bytes'] == 30
+    assert backend.evictions == 1
+
+
+def test_value_larger_than_the_cache_is_not_stored():
+    backend = MemoryBackend(max_bytes=10)
+    backend.set('small', b'x' * 5, ttl=60)
+    backend.set('big', b'x' * 11, ttl=60)
+    assert backend.get('big') is None
+    assert backend.get('small') == b'x' * 5
+
+
+def test_replacing_a_key_does_not_double_count_its_size():
+    backend = MemoryBackend(max_bytes=100)
+    backend.set('a', b'x' * 40, ttl=60)
+    backend.set('a', b'x' * 60, ttl=60)
+    assert backend.stats()['bytes'] == 60
+
+
+def test_expired_entries_are_misses(monkeypatch):
+    backend = MemoryBackend()
+    backend.set('a', 'value', ttl=5)
+    now = time.monotonic()
+    monkeypatch.setattr(time, 'monotonic', lambda: now + 6)
+    assert backend.get('a') is None
+    assert backend.stats()['entries'] == 0
+
+
+def test_invalidating_a_tag_drops_only_its_entries():
+    backend = MemoryBackend()
+    backend.set('page:/ngos', 'ngos', ttl=60, tags=('ngo',))
+    backend.set('page:/events', 'events', ttl=60, tags=('event', 'ngo'))
+    backend.set('page:/', 'home', ttl=60, tags=('hero',))
+
+    backend.invalidate_tags(['event'])
+    assert backend.get('page:/events') is None
+    assert backend.get('page:/ngos') == 'ngos'
+
+    backend.invalidate_tags(['ngo'])
+    assert backend.get('page:/ngos') is None
+    assert backend.get('page:/') == 'home'
+    assert backend.stats()['entries'] == 1
+
+
+def test_cache_counts_hits_and_misses_and_builds_once():
+    cache = Cache(MemoryBackend())
+    builds = []
+
+    def build():
+        builds.append(1)
+        return 'page'
+
+    assert cache.get_or_set('k', build, ttl=60) == 'page'
+    assert cache.get_or_set('k', build, ttl=60) == 'page'
+    assert len(builds) == 1
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['hit_ratio']) == (1, 1, 0.5)
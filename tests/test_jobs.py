@@ -0,0 +1,82 @@
+import threading
+import time
+
+import pytest
+
+from benchmarks import sqlite_backend
+from jobs import JobRunner
+
+
+@pytest.fixture
+def runner(tmp_path):
+    # background_job on the benchmarks' SQLite stand-in for MySQL
+    path = str(tmp_path / 'jobs.db')
+    sqlite_backend.create_schema(path)
+    return JobRunner(lambda: sqlite_backend.Connection(path), workers=1, tick=3600, scheduler=False)
+
+
+def wait_for(runner, job_id, *statuses):
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        job = runner.get(job_id)
+        if job['Status'] in statuses:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} stayed {job['Status']}")
+
+
+def test_running_job_stops_at_its_next_progress_call(runner):
+    steps = []
+
+    @runner.task('count')
+    def count(job, params):
+        for step in range(1000):
+            steps.append(step)
+            job.progress(step // 10, f'step {step}')
+            time.sleep(0.01)
+        return {'steps': len(steps)}
+
+    job_id = runner.submit('count', created_by='admin')
+    wait_for(runner, job_id, 'running')
+    assert runner.cancel(job_id)
+
+    job = wait_for(runner, job_id, 'cancelled', 'succeeded', 'failed')
+    assert job['Status'] == 'cancelled'
+    assert job['Result'] is None and job['Finished_at'] is not None
+    assert len(steps) < 1000
+
+
+def test_queued_job_is_cancelled_before_it_starts(runner):
+    release = threading.Event()
+    ran = []
+
+    @runner.task('block')
+    def block(job, params):
+        release.wait(10)
+
+    @runner.task('record')
+    def record(job, params):
+        ran.append(params)
+
+    blocking = runner.submit('block')
+    wait_for(runner, blocking, 'running')
+    queued = runner.submit('record', {'n': 1})  # waits for the only worker
+    assert runner.cancel(queued)
+    release.set()
+
+    assert wait_for(runner, blocking, 'succeeded')['Status'] == 'succeeded'
+    runner._executor.shutdown(wait=True)
+    assert runner.get(queued)['Status'] == 'cancelled'
+    assert ran == []
+
+
+def test_finished_jobs_cannot_be_cancelled(runner):
+    @runner.task('noop')
+    def noop(job, params):
+        return 'done'
+
+    job_id = runner.submit('noop')
+    job = wait_for(runner, job_id, 'succeeded')
+    assert job['Result'] == 'done' and job['Progress'] == 100
+    assert not runner.cancel(job_id)
+    assert runner.get(job_id)['Status'] == 'succeeded'
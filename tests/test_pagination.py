@@ -0,0 +1,40 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+from pagination import decode_cursor, encode_cursor, page_size, split_page
+
+
+def test_cursor_round_trips_keyset_values():
+    token = encode_cursor(datetime(2024, 3, 1, 9, 30), 42)
+    assert '=' not in token
+    assert decode_cursor(token, 2) == ['2024-03-01 09:30:00', 42]
+
+    token = encode_cursor(date(2024, 3, 1), Decimal('1250.50'), 'Asha')
+    assert decode_cursor(token, 3) == ['2024-03-01', '1250.50', 'Asha']
+
+
+def test_missing_or_bad_cursors_mean_the_first_page():
+    assert decode_cursor(None, 1) is None
+    assert decode_cursor('', 1) is None
+    assert decode_cursor('not a cursor!', 1) is None
+    assert decode_cursor(encode_cursor(1, 2)[:-3], 2) is None
+    # A cursor for another listing has the wrong number of values
+    assert decode_cursor(encode_cursor(7), 2) is None
+
+
+def test_page_size_defaults_and_caps():
+    assert page_size(None, 50, 500) == 50
+    assert page_size(0, 50, 500) == 50
+    assert page_size(-5, 50, 500) == 50
+    assert page_size(20, 50, 500) == 20
+    assert page_size(10000, 50, 500) == 500
+
+
+def test_split_page_uses_the_extra_row_only_to_detect_a_next_page():
+    rows = [{'Donation_id': i} for i in (9, 8, 7)]
+    page, cursor = split_page(rows, 2, lambda row: (row['Donation_id'],))
+    assert page == rows[:2]
+    assert decode_cursor(cursor, 1) == [8]
+
+    page, cursor = split_page(rows, 3, lambda row: (row['Donation_id'],))
+    assert page == rows and cursor is None
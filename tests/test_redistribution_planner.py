@@ -0,0 +1,60 @@
+import numpy as np
+
+from redistribution_planner import allocate
+
+
+def apply(balances, sources, targets, amounts):
+    after = np.array(balances, dtype=np.int64)
+    np.subtract.at(after, sources, amounts)
+    np.add.at(after, targets, amounts)
+    return after
+
+
+def test_empty_and_balanced_inputs_need_no_transfers():
+    sources, targets, amounts, target = allocate([])
+    assert amounts.size == 0 and target == 0
+
+    sources, targets, amounts, target = allocate([500, 500, 500])
+    assert amounts.size == 0 and target == 500
+
+
+def test_every_ngo_below_the_average_is_brought_up_to_it():
+    balances = [10000, 0, 2500, 7500, 0]
+    sources, targets, amounts, target = allocate(balances)
+
+    assert target == 4000
+    after = apply(balances, sources, targets, amounts)
+    assert after.sum() == sum(balances)
+    assert (after >= target).all()
+    assert set(sources.tolist()) <= {0, 3}
+    assert set(targets.tolist()) <= {1, 2, 4}
+
+
+def test_uneven_total_leaves_the_remainder_with_the_sources():
+    balances = [1001, 0]
+    sources, targets, amounts, target = allocate(balances)
+
+    assert target == 500
+    assert amounts.tolist() == [500]
+    assert apply(balances, sources, targets, amounts).tolist() == [501, 500]
+
+
+def test_transfer_count_is_at_most_sources_plus_targets_minus_one():
+    rng = np.random.default_rng(7)
+    balances = rng.integers(0, 1_000_000, size=200)
+    sources, targets, amounts, target = allocate(balances)
+
+    giving = int((balances > target).sum())
+    receiving = int((balances < target).sum())
+    assert 0 < amounts.size <= giving + receiving - 1
+    assert (amounts > 0).all()
+    assert (apply(balances, sources, targets, amounts) >= target).all()
+
+
+def test_transfers_below_the_minimum_are_dropped():
+    balances = [1050, 950, 1000, 1000]
+    sources, targets, amounts, target = allocate(balances, min_transfer=100)
+    assert amounts.size == 0
+
+    sources, targets, amounts, target = allocate(balances, min_transfer=50)
+    assert amounts.tolist() == [50]
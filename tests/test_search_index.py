@@ -0,0 +1,99 @@
+import sqlite3
+
+import pytest
+
+from benchmarks import sqlite_backend
+from search_index import SearchIndex, query_terms, record_tokens
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'search.db')
+    sqlite_backend.create_schema(path)
+    db = sqlite3.connect(path)
+    db.executescript("""
+        INSERT INTO donor (Donor_id, Name) VALUES (1, 'Asha Rao'), (2, 'José Fernandes'), (3, 'Ashok Kumar'),
+            (4, 'Ravindra Shah');
+        INSERT INTO donor_email VALUES (1, 'asha@example.org'), (3, 'ashok.k@example.org');
+        INSERT INTO donor_phone VALUES (1, '+91 98765 43210'), (2, '022-2345-6789');
+        INSERT INTO volunteer (Volunteer_id, Name) VALUES (1, 'Asha Menon'), (2, 'Ravi Rao');
+        INSERT INTO volunteer_email VALUES (2, 'ravi@example.org');
+    """)
+    db.commit()
+    db.close()
+    return path
+
+
+@pytest.fixture
+def index(db_path):
+    index = SearchIndex()
+    get_connection = lambda: sqlite_backend.Connection(db_path)
+    assert not index.ensure_loaded(get_connection)  # cold: loads in the background
+    index._loader.join(10)
+    assert index.ensure_loaded(get_connection)
+    return index
+
+
+def found(results):
+    return [(result['kind'], result['id']) for result in results]
+
+
+def test_query_terms():
+    assert query_terms('  José  RAO ') == ['jose', 'rao']
+    assert query_terms('Asha@Example.org') == ['asha@example.org']
+    assert query_terms('98765 43210') == ['9876543210']
+    assert query_terms('+91-98765-43210') == ['919876543210']
+    assert query_terms('') == []
+
+
+def test_record_tokens_keep_the_national_number():
+    assert record_tokens('Asha Rao', ['asha@example.org'], ['+91 98765 43210']) == [
+        'asha', 'rao', 'asha@example.org', '919876543210', '9876543210']
+
+
+def test_every_term_must_prefix_match(index):
+    assert found(index.search('asha rao')) == [('donor', 1)]
+    assert found(index.search('rao')) == [('donor', 1), ('volunteer', 2)]
+    assert found(index.search('jose fern')) == [('donor', 2)]
+    assert index.search('asha kumar') == []
+
+
+def test_exact_words_rank_before_longer_ones(index):
+    # Donors are loaded first, so Ravindra has the lower slot
+    assert found(index.search('ravi')) == [('volunteer', 2), ('donor', 4)]
+    assert found(index.search('ash')) == [('donor', 1), ('volunteer', 1), ('donor', 3)]
+
+
+def test_contacts_kind_and_limit(index):
+    assert found(index.search('ashok.k@')) == [('donor', 3)]
+    assert found(index.search('98765 43210')) == [('donor', 1)]
+    assert found(index.search('0222345')) == [('donor', 2)]
+    assert found(index.search('asha', kind='volunteer')) == [('volunteer', 1)]
+    assert len(index.search('a', limit=2)) == 2
+
+    result = index.search('asha rao')[0]
+    assert (result['name'], result['email'], result['phone']) == ('Asha Rao', 'asha@example.org', '+91 98765 43210')
+
+
+def test_writes_in_this_process_are_searchable_at_once(index):
+    index.add('volunteer', 3, 'Priya Shah', ['Priya@Example.org'], [])
+    assert found(index.search('priya')) == [('volunteer', 3)]
+    assert found(index.search('priya@example')) == [('volunteer', 3)]
+
+    index.add('donor', 2, emails=['jose@example.org'])  # contact for a known record
+    assert found(index.search('jose@')) == [('donor', 2)]
+    index.add('donor', 99, emails=['ghost@example.org'])  # unknown record without a name
+    assert index.search('ghost') == []
+
+
+def test_catch_up_adds_records_created_elsewhere(index, db_path):
+    db = sqlite3.connect(db_path)
+    db.execute("INSERT INTO donor (Donor_id, Name) VALUES (5, 'Meena Iyer')")
+    db.execute("INSERT INTO donor_email VALUES (5, 'meena@example.org')")
+    db.commit()
+    db.close()
+
+    assert index.search('meena') == []
+    index.catch_up(lambda: sqlite_backend.Connection(db_path), force=True)
+    assert found(index.search('meena iyer')) == [('donor', 5)]
+    assert found(index.search('meena@')) == [('donor', 5)]
@@ -0,0 +1,83 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from skill_matching import SkillIndex
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'skills.db')
+    db = sqlite3.connect(path)
+    db.executescript("""
+        CREATE TABLE volunteer (Volunteer_id INTEGER PRIMARY KEY, Name TEXT);
+        CREATE TABLE volunteer_profile (Volunteer_id INTEGER PRIMARY KEY, Total_hours REAL);
+        CREATE TABLE volunteer_skill (Volunteer_id INT, Skill TEXT);
+        CREATE TABLE event_volunteer (Event_id INT, Volunteer_id INT);
+        INSERT INTO volunteer VALUES (1, 'Asha'), (2, 'Ravi'), (3, 'Meena'), (4, 'Kiran');
+        INSERT INTO volunteer_profile VALUES (1, 5), (2, 40), (3, 12);
+        INSERT INTO volunteer_skill VALUES
+            (1, 'First Aid'), (1, 'Cooking'),
+            (2, 'first  aid'),
+            (3, 'First Aid'), (3, 'cooking'),
+            (4, 'Driving');
+        INSERT INTO event_volunteer VALUES (9, 3);
+    """)
+    db.commit()
+    db.close()
+    return path
+
+
+@pytest.fixture
+def index(db_path):
+    index = SkillIndex(ttl=300)
+    index.ensure_loaded(lambda: sqlite3.connect(db_path))
+    return index
+
+
+def test_ranks_by_skills_covered_then_hours(index):
+    matches = index.match(['first aid', 'COOKING'])
+    assert [(m['Volunteer_id'], m['coverage']) for m in matches] == [(3, 2), (1, 2), (2, 1)]
+    assert matches[0]['matched_skills'] == ['First Aid', 'Cooking']
+    assert matches[0]['total_hours'] == 12.0
+
+
+def test_volunteers_already_on_the_event_are_left_out(index):
+    matches = index.match(['First Aid', 'Cooking'], event_id=9)
+    assert [m['Volunteer_id'] for m in matches] == [1, 2]
+
+
+def test_limit_and_unknown_skills(index):
+    assert [m['Volunteer_id'] for m in index.match(['first aid'], limit=2)] == [2, 3]
+    assert index.match(['Welding']) == []
+    assert index.match([]) == []
+
+
+def test_skill_labels_are_deduplicated_case_insensitively(index):
+    assert index.skills() == ['Cooking', 'Driving', 'First Aid']
+
+
+def test_registered_volunteer_is_matched_before_the_next_rebuild(index):
+    index.add_volunteer(5, 'Devi', ['Driving', 'Cooking'])
+    matches = index.match(['driving', 'cooking'])
+    assert (matches[0]['Volunteer_id'], matches[0]['coverage']) == (5, 2)
+
+
+def test_concurrent_callers_share_one_reload(db_path):
+    index = SkillIndex(ttl=300)
+    loads = []
+
+    def get_connection():
+        loads.append(1)
+        time.sleep(0.05)
+        return sqlite3.connect(db_path, check_same_thread=False)
+
+    threads = [threading.Thread(target=index.ensure_loaded, args=(get_connection,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(loads) == 1
+    assert index.stats()['volunteers'] == 4
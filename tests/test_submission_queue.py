@@ -0,0 +1,140 @@
+import time
+
+import mysql.connector
+import pytest
+
+from submission_queue import ER_DUP_ENTRY, SubmissionQueue, SubmissionWorkers
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock(1_000_000.0)
+    monkeypatch.setattr(time, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    return SubmissionQueue(str(tmp_path / 'submissions.db'), lease_seconds=60)
+
+
+class FakeCursor:
+    def __init__(self, receipts):
+        self.receipts = receipts
+        self.row = None
+
+    def execute(self, sql, params):
+        self.row = (1,) if params[0] in self.receipts else None
+
+    def fetchone(self):
+        return self.row
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, receipts=()):
+        self.receipts = set(receipts)
+        self.closed = False
+
+    def cursor(self):
+        return FakeCursor(self.receipts)
+
+    def close(self):
+        self.closed = True
+
+
+def workers(queue, handler, connection=None, max_attempts=3):
+    return SubmissionWorkers(queue, lambda: connection or FakeConnection(), {'donation': handler},
+                             max_attempts=max_attempts)
+
+
+def test_same_idempotency_key_is_queued_once(queue):
+    first = queue.enqueue('donation', 'key-1', {'amount': '100.00'})
+    second = queue.enqueue('donation', 'key-1', {'amount': '999.00'})
+    assert first == second
+    assert queue.counts() == {'pending': 1}
+    assert queue.claim(10)[0]['payload'] == {'amount': '100.00'}
+
+
+def test_claimed_rows_are_leased_until_the_lease_expires(queue, clock):
+    queue.enqueue('donation', 'key-1', {})
+    [item] = queue.claim(10)
+    assert item['attempts'] == 1
+    assert queue.claim(10) == []
+
+    clock.now += 59
+    assert queue.claim(10) == []
+    clock.now += 2  # the worker holding it died
+    [again] = queue.claim(10)
+    assert (again['id'], again['attempts']) == (item['id'], 2)
+
+
+def test_claim_respects_order_and_limit(queue):
+    for number in range(5):
+        queue.enqueue('donation', f'key-{number}', {'n': number})
+    assert [item['payload']['n'] for item in queue.claim(3)] == [0, 1, 2]
+    assert [item['payload']['n'] for item in queue.claim(3)] == [3, 4]
+
+
+def test_failures_back_off_exponentially_then_fail(queue, clock):
+    def handler(connection, payload, key):
+        raise RuntimeError('MySQL went away')
+
+    pool = workers(queue, handler, max_attempts=3)
+    queue.enqueue('donation', 'key-1', {})
+
+    assert pool.drain_once() == 1
+    assert queue.status('key-1')['status'] == 'pending'
+    clock.now += 1.9
+    assert pool.drain_once() == 0  # 2 s backoff after the first attempt
+    clock.now += 0.1
+    assert pool.drain_once() == 1
+    clock.now += 3.9
+    assert pool.drain_once() == 0  # then 4 s
+    clock.now += 0.1
+    assert pool.drain_once() == 1
+
+    status = queue.status('key-1')
+    assert (status['status'], status['attempts'], status['error']) == ('failed', 3, 'MySQL went away')
+
+
+def test_validation_errors_fail_without_retrying(queue):
+    def handler(connection, payload, key):
+        raise ValueError('volunteer already registered')
+
+    queue.enqueue('donation', 'key-1', {})
+    workers(queue, handler).drain_once()
+    status = queue.status('key-1')
+    assert (status['status'], status['attempts']) == ('failed', 1)
+
+
+def test_duplicate_key_with_a_receipt_counts_as_applied(queue):
+    def handler(connection, payload, key):
+        raise mysql.connector.Error(msg='Duplicate entry', errno=ER_DUP_ENTRY)
+
+    queue.enqueue('donation', 'applied', {})
+    queue.enqueue('donation', 'not-applied', {})
+    connection = FakeConnection(receipts={'applied'})
+    workers(queue, handler, connection).drain_once()
+
+    assert queue.status('applied')['status'] == 'confirmed'
+    assert queue.status('not-applied')['status'] == 'pending'
+    assert connection.closed
+
+
+def test_successful_submissions_are_confirmed(queue):
+    seen = []
+    queue.enqueue('donation', 'key-1', {'amount': '50.00'})
+    workers(queue, lambda connection, payload, key: seen.append((payload, key))).drain_once()
+    assert seen == [({'amount': '50.00'}, 'key-1')]
+    assert queue.counts() == {'confirmed': 1}
@@ -0,0 +1,101 @@
+import dashboard_stats
+
+
+class DuplicateVolunteerError(ValueError):
+    pass
+
+
+def register_volunteer(connection, name, email, phone, skills, request_key=None):
+    cursor = connection.cursor()
+    try:
+        if request_key is not None:
+            # Fails with a duplicate-key error if this submission was already applied
+            cursor.execute("INSERT INTO submission_receipt (Idempotency_key, Kind) VALUES (%s, 'volunteer')",
+                           (request_key,))
+
+        # Check if volunteer already exists with this email
+        cursor.execute("""
+            SELECT v.Volunteer_id
+            FROM volunteer v
+            JOIN volunteer_email ve ON v.Volunteer_id = ve.Volunteer_id
+            WHERE ve.Email = %s
+        """, (email,))
+        if cursor.fetchone():
+            raise DuplicateVolunteerError('A volunteer with this email already exists!')
+
+        # Insert new volunteer - ONLY Name column
+        cursor.execute("INSERT INTO volunteer (Name) VALUES (%s)", (name,))
+        volunteer_id = cursor.lastrowid
+
+        cursor.execute("INSERT INTO volunteer_email (Volunteer_id, Email) VALUES (%s, %s)",
+                     (volunteer_id, email))
+        cursor.execute("INSERT INTO volunteer_phone (Volunteer_id, Phone) VALUES (%s, %s)",
+                     (volunteer_id, phone))
+        if skills:
+            cursor.executemany("INSERT INTO volunteer_skill (Volunteer_id, Skill) VALUES (%s, %s)",
+                             [(volunteer_id, skill) for skill in skills])
+
+        if request_key is not None:
+            cursor.execute("UPDATE submission_receipt SET Record_id = %s WHERE Idempotency_key = %s",
+                           (volunteer_id, request_key))
+        dashboard_stats.increment(cursor, 'volunteer')
+
+        connection.commit()
+        return volunteer_id
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def load_profiles(cursor, limit, after=None):
+    # Keyset page over volunteer_profile (migration 0006), highest hours first.
+    # Fetches limit + 1 rows for split_page().
+    keyset = ""
+    params = []
+    if after:
+        keyset = """
+            WHERE p.Total_hours < %s
+               OR (p.Total_hours = %s AND p.Volunteer_id < %s)
+        """
+        params = [after[0], after[0], after[1]]
+    cursor.execute(f"""
+        SELECT 
+            v.Volunteer_id,
+            v.Name,
+            p.Events_count as events_count,
+            p.Total_hours as total_hours
+        FROM volunteer_profile p
+        JOIN volunteer v ON v.Volunteer_id = p.Volunteer_id
+        {keyset}
+        ORDER BY p.Total_hours DESC, p.Volunteer_id DESC
+        LIMIT %s
+    """, (*params, limit + 1))
+    return cursor.fetchall()
+
+
+def attach_contacts(cursor, volunteers):
+    # One subquery per child table, so a volunteer's skills, emails and phones
+    # are concatenated independently instead of as a skills x emails x phones
+    # cross product.
+    if not volunteers:
+        return volunteers
+    ids = [v['Volunteer_id'] for v in volunteers]
+    placeholders = ', '.join(['%s'] * len(ids))
+    cursor.execute(f"""
+        SELECT 
+            v.Volunteer_id,
+            (SELECT GROUP_CONCAT(vs.Skill) FROM volunteer_skill vs
+             WHERE vs.Volunteer_id = v.Volunteer_id) as skills,
+            (SELECT GROUP_CONCAT(ve.Email) FROM volunteer_email ve
+             WHERE ve.Volunteer_id = v.Volunteer_id) as emails,
+            (SELECT GROUP_CONCAT(vp.Phone) FROM volunteer_phone vp
+             WHERE vp.Volunteer_id = v.Volunteer_id) as phones
+        FROM volunteer v
+        WHERE v.Volunteer_id IN ({placeholders})
+    """, ids)
+    details = {row['Volunteer_id']: row for row in cursor.fetchall()}
+    for volunteer in volunteers:
+        volunteer.update(details.get(volunteer['Volunteer_id'], {}))
+    return volunteers